@@ -0,0 +1,61 @@
+"""Micro-benchmark da formatação de moeda (BRL).
+
+Compara `format_currency_br` aplicado célula a célula (`Series.apply`, como
+nas tabelas do dashboard) com `format_currency_br_array`, nos modos com
+centavos e compacto (K/M), e confere que o texto gerado é idêntico.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_formatting
+    python -m benchmarks.bench_formatting --valores 1000000 --repeticoes 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from obras.formatting import format_currency_br, format_currency_br_array
+
+
+def make_values(n, seed=0):
+    """Valores monetários com duas casas, alguns negativos, zeros e nulos"""
+    rng = np.random.default_rng(seed)
+    valores = rng.uniform(-1e5, 2e7, n).round(2)
+    valores[rng.random(n) < 0.02] = 0.0
+    valores[rng.random(n) < 0.02] = np.nan
+    return pd.Series(valores)
+
+
+def melhor_tempo(func, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark da formatação de moeda.")
+    parser.add_argument("--valores", type=int, default=100_000, help="Quantidade de valores")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    serie = make_values(args.valores)
+    for show_cents in (True, False):
+        modo = "centavos" if show_cents else "compacto"
+        t_apply, esperado = melhor_tempo(lambda: serie.apply(lambda x: format_currency_br(x, show_cents)), args.repeticoes)
+        t_array, obtido = melhor_tempo(lambda: format_currency_br_array(serie, show_cents), args.repeticoes)
+        iguais = esperado.tolist() == obtido.tolist()
+        print(
+            f"{modo:<9} {args.valores} valores  apply {t_apply * 1000:8.1f}ms  "
+            f"vetorizado {t_array * 1000:8.1f}ms  ({t_apply / t_array:4.1f}x)  saída idêntica: {'sim' if iguais else 'NÃO'}",
+            flush=True,
+        )
+        if not iguais:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Teste de carga do dashboard com sessões simultâneas.
+
+Abre N sessões do `dashboard_obras.py` (AppTest do Streamlit, uma thread
+por sessão, no mesmo processo e com os mesmos caches, como no servidor) e
+faz cada uma executar uma sequência aleatória de ações de usuário: busca e
+seleção de obras, filtro de cidades, ordenação e paginação da tabela e
+exportações PDF/Excel. Cada ação é um rerun; registra a latência de cada
+rerun e informa p50/p95/p99, vazão (reruns por segundo), pico de RSS do
+processo e erros (exceções e mensagens st.error) para cada número de
+sessões.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_load
+    python -m benchmarks.bench_load --sessoes 1 5 10 20 --acoes 30 --obras 500
+    python -m benchmarks.bench_load --sem-graficos --json carga.json   # sem Chrome/kaleido
+
+O pico de RSS é o do processo inteiro desde o início (ru_maxrss), então só
+cresce de um nível de sessões para o próximo.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from obras import reports
+from obras.data import EXCEL_PATH
+from obras.synthetic import write_workbook
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# Peso de cada ação no sorteio (exportações são raras)
+ACOES = {
+    "buscar_obra": 4,
+    "selecionar_encontradas": 2,
+    "remover_encontradas": 1,
+    "todas_obras": 1,
+    "cidades": 2,
+    "ordenar_tabela": 2,
+    "pagina_tabela": 2,
+    "pdf": 0.5,
+    "excel": 0.5,
+}
+
+TERMOS_BUSCA = ["resid", "loteamento", "1", "2", "00", "residencial 01", "jardim", "3"]
+
+
+def _por_label(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(label)
+
+
+def executar_acao(at, acao, rng):
+    """Aplica `acao` à sessão e roda o rerun; sem o widget na tela, só roda o rerun"""
+    try:
+        if acao == "buscar_obra":
+            _por_label(at.text_input, "🏗️ Filtrar por Obra").input(rng.choice(TERMOS_BUSCA))
+        elif acao == "selecionar_encontradas":
+            _por_label(at.button, "✅ Selecionar encontradas").click()
+        elif acao == "remover_encontradas":
+            _por_label(at.button, "❌ Remover encontradas").click()
+        elif acao == "todas_obras":
+            _por_label(at.button, "Todas").click()
+        elif acao == "cidades":
+            cidades = at.multiselect[0]
+            opcoes = list(cidades.options)
+            cidades.set_value(rng.sample(opcoes, k=rng.randint(1, len(opcoes))) if opcoes else [])
+        elif acao == "ordenar_tabela":
+            ordem = at.selectbox(key="tabela_ordem")
+            ordem.set_value(rng.choice(list(ordem.options)))
+        elif acao == "pagina_tabela":
+            pagina = at.number_input(key="tabela_pagina")
+            pagina.set_value(rng.randint(int(pagina.min), int(pagina.max)))
+        elif acao == "pdf":
+            _por_label(at.button, "📄 Gerar Relatório PDF").click()
+        elif acao == "excel":
+            _por_label(at.button, "📊 Gerar Planilha Excel").click()
+    except (LookupError, IndexError):
+        pass
+    at.run()
+
+
+def sessao(indice, n_acoes, seed, barreira, resultados, timeout):
+    rng = random.Random(seed + indice)
+    nomes, pesos = list(ACOES), list(ACOES.values())
+    latencias = []
+    erros = 0
+    barreira.wait()
+    at = AppTest.from_file(str(RAIZ / "dashboard_obras.py"), default_timeout=timeout)
+    inicio = time.perf_counter()
+    at.run()
+    latencias.append(("inicial", time.perf_counter() - inicio))
+    for _ in range(n_acoes):
+        acao = rng.choices(nomes, pesos)[0]
+        inicio = time.perf_counter()
+        executar_acao(at, acao, rng)
+        latencias.append((acao, time.perf_counter() - inicio))
+        erros += len(at.exception) + len(at.error)
+    resultados[indice] = {"latencias": latencias, "erros": erros}
+
+
+def rodar_nivel(n_sessoes, n_acoes, seed, timeout):
+    resultados = [None] * n_sessoes
+    barreira = threading.Barrier(n_sessoes + 1)
+    threads = [
+        threading.Thread(target=sessao, args=(i, n_acoes, seed, barreira, resultados, timeout), daemon=True)
+        for i in range(n_sessoes)
+    ]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - inicio
+
+    latencias = [tempo for r in resultados if r for _, tempo in r["latencias"]]
+    por_acao = {}
+    for r in resultados:
+        for acao, tempo in r["latencias"] if r else []:
+            por_acao.setdefault(acao, []).append(tempo)
+    ms = np.array(latencias) * 1000
+    return {
+        "sessoes": n_sessoes,
+        "reruns": len(latencias),
+        "wall": wall,
+        "vazao": len(latencias) / wall,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "pico_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "erros": sum(r["erros"] for r in resultados if r),
+        "sessoes_com_falha": sum(1 for r in resultados if r is None),
+        "p50_por_acao_ms": {acao: float(np.percentile(tempos, 50)) * 1000 for acao, tempos in sorted(por_acao.items())},
+    }
+
+
+def print_result(r):
+    print(
+        f"{r['sessoes']:>4} sessões  {r['reruns']:>5} reruns em {r['wall']:7.1f}s  {r['vazao']:6.2f} reruns/s  "
+        f"p50 {r['p50_ms']:7.0f}ms  p95 {r['p95_ms']:7.0f}ms  p99 {r['p99_ms']:7.0f}ms  "
+        f"RSS {r['pico_rss_mb']:7.0f} MB  erros {r['erros']}",
+        flush=True,
+    )
+    print("    p50 por ação: " + "  ".join(f"{acao}={tempo:.0f}ms" for acao, tempo in r["p50_por_acao_ms"].items()), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard com sessões simultâneas.")
+    parser.add_argument("--sessoes", nargs="+", type=int, default=[1, 5, 10], help="Sessões simultâneas (um nível por valor)")
+    parser.add_argument("--acoes", type=int, default=20, help="Ações por sessão")
+    parser.add_argument("--obras", type=int, default=200, help="Obras da planilha sintética")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300, help="Tempo máximo de um rerun (s)")
+    parser.add_argument("--sem-graficos", action="store_true", help="PDF sem gráficos Plotly (kaleido)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    if args.sem_graficos:
+        reports.KALEIDO_AVAILABLE = False
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        # O dashboard lê a planilha a partir do diretório atual
+        write_workbook(os.path.join(pasta, os.path.basename(EXCEL_PATH)), args.obras)
+        cwd = os.getcwd()
+        os.chdir(pasta)
+        try:
+            for n_sessoes in args.sessoes:
+                resultado = rodar_nivel(n_sessoes, args.acoes, args.seed, args.timeout)
+                resultados.append(resultado)
+                print_result(resultado)
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
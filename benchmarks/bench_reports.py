@@ -0,0 +1,121 @@
+"""Benchmark dos três geradores de relatório PDF.
+
+Roda cada gerador sem Streamlit contra carteiras sintéticas de tamanho
+crescente (todas as obras selecionadas) e registra tempo total, pico de
+memória (tracemalloc, numa execução separada), tamanho do PDF e tempo por
+seção.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_reports
+    python -m benchmarks.bench_reports --tamanhos 10 100 1000 --repeticoes 3 --json bench.json
+    python -m benchmarks.bench_reports --sem-graficos   # sem Chrome/kaleido
+    python -m benchmarks.bench_reports --builders complete --perfis screen print email
+    python -m benchmarks.bench_reports --builders matplotlib --workers 8
+    python -m benchmarks.bench_reports --com-cache --repeticoes 2
+
+Por padrão os geradores rodam sem o cache de seções (tempos "a frio"); com
+`--com-cache` cada gerador usa um cache novo e, com `--repeticoes` > 1, a
+melhor execução mostra o tempo com todas as seções em cache.
+
+O pico de memória cobre apenas alocações do Python; a renderização das
+imagens Plotly acontece no processo do Chrome usado pelo kaleido.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from obras import reports
+from obras.cache import SectionCache
+from obras.model import build_view
+from obras.reports_matplotlib import create_pdf_report
+from obras.synthetic import make_snapshot
+
+BUILDERS = {
+    "complete": reports.create_complete_dashboard_pdf,
+    "professional": reports.create_professional_pdf_report,
+    "matplotlib": create_pdf_report,
+}
+
+# Geradores ReportLab, que aceitam os perfis de saída (obras.reports.OUTPUT_PROFILES)
+PROFILE_BUILDERS = {"complete", "professional"}
+
+# Geradores que guardam as seções no cache (obras.cache)
+CACHE_BUILDERS = {"complete", "matplotlib"}
+
+
+def run_once(builder, view, df_sheet2, **kwargs):
+    timings = {}
+    inicio = time.perf_counter()
+    buffer = builder(view, df_sheet2, timings=timings, **kwargs)
+    wall = time.perf_counter() - inicio
+    return {"wall": wall, "size_kb": len(buffer.getvalue()) / 1024, "sections": timings}
+
+
+def peak_memory(builder, view, df_sheet2, **kwargs):
+    """Pico de memória em MB; roda à parte porque o tracemalloc distorce os tempos"""
+    tracemalloc.start()
+    builder(view, df_sheet2, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def bench(sizes, builders, repeticoes, medir_memoria=True, perfis=(reports.DEFAULT_PROFILE,), workers=1, com_cache=False):
+    resultados = []
+    for n_obras in sizes:
+        snapshot = make_snapshot(n_obras)
+        obras = snapshot.df_projetos["Projeto"].tolist()
+        view = build_view(snapshot, obras)
+        for nome in builders:
+            builder = BUILDERS[nome]
+            for perfil in perfis if nome in PROFILE_BUILDERS else [None]:
+                kwargs = {"profile": perfil} if perfil else {"workers": workers}
+                if nome in CACHE_BUILDERS:
+                    kwargs["cache"] = SectionCache() if com_cache else None
+                runs = [run_once(builder, view, snapshot.df_sheet2, **kwargs) for _ in range(repeticoes)]
+                # Mantém a execução mais rápida (menos ruído de aquecimento)
+                melhor = min(runs, key=lambda r: r["wall"])
+                melhor.update({"builder": nome, "perfil": perfil, "obras": n_obras})
+                melhor["peak_mb"] = peak_memory(builder, view, snapshot.df_sheet2, **kwargs) if medir_memoria else None
+                resultados.append(melhor)
+                print_result(melhor)
+    return resultados
+
+
+def print_result(r):
+    pico = f"{r['peak_mb']:8.1f} MB" if r["peak_mb"] is not None else "       - MB"
+    print(
+        f"{r['builder']:<13} {r['perfil'] or '-':<7} {r['obras']:>6} obras  {r['wall']:8.3f}s  pico {pico}  PDF {r['size_kb']:9.1f} KB",
+        flush=True,
+    )
+    secoes = sorted(r["sections"].items(), key=lambda item: item[1], reverse=True)
+    print("    " + "  ".join(f"{nome}={tempo * 1000:.0f}ms" for nome, tempo in secoes), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos geradores de relatório PDF.")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[10, 50, 200], help="Número de obras")
+    parser.add_argument("--builders", nargs="+", choices=sorted(BUILDERS), default=list(BUILDERS))
+    parser.add_argument("--perfis", nargs="+", choices=list(reports.OUTPUT_PROFILES), default=[reports.DEFAULT_PROFILE])
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="Processos para o gerador matplotlib")
+    parser.add_argument("--sem-graficos", action="store_true", help="Não exporta gráficos Plotly (kaleido)")
+    parser.add_argument("--com-cache", action="store_true", help="Usa o cache de seções entre as repetições")
+    parser.add_argument("--sem-memoria", action="store_true", help="Pula a medição de pico de memória")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    if args.sem_graficos:
+        reports.KALEIDO_AVAILABLE = False
+
+    resultados = bench(args.tamanhos, args.builders, args.repeticoes, not args.sem_memoria, args.perfis, args.workers,
+                       args.com_cache)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Memória por sessão do dashboard.
+
+Abre várias sessões do `dashboard_obras.py` no mesmo processo (AppTest do
+Streamlit, que compartilha os caches como o servidor real), mantendo todas
+vivas, e mede com tracemalloc quanto cada uma aloca durante a primeira
+execução (pico) e quanto continua retido depois dela. A primeira sessão
+inclui a leitura da planilha e o preenchimento dos caches.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_sessions
+    python -m benchmarks.bench_sessions --sessoes 20 --obras 1000
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from obras.data import EXCEL_PATH
+from obras.synthetic import write_workbook
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def medir_sessoes(script, sessoes, timeout=120):
+    """[(pico_mb, retido_mb)] de cada sessão, na ordem em que foram abertas"""
+    abertas = []
+    medidas = []
+    tracemalloc.start()
+    for _ in range(sessoes):
+        gc.collect()
+        antes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        at = AppTest.from_file(str(RAIZ / script), default_timeout=timeout)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        _, pico = tracemalloc.get_traced_memory()
+        gc.collect()
+        depois, _ = tracemalloc.get_traced_memory()
+        abertas.append(at)
+        medidas.append(((pico - antes) / 1024 / 1024, (depois - antes) / 1024 / 1024))
+    tracemalloc.stop()
+    return medidas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória por sessão do dashboard.")
+    parser.add_argument("--sessoes", type=int, default=10)
+    parser.add_argument("--obras", type=int, default=200, help="Obras da planilha sintética")
+    parser.add_argument("--script", default="dashboard_obras.py")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # O dashboard lê a planilha a partir do diretório atual
+        write_workbook(os.path.join(pasta, os.path.basename(EXCEL_PATH)), args.obras)
+        cwd = os.getcwd()
+        os.chdir(pasta)
+        try:
+            medidas = medir_sessoes(args.script, args.sessoes)
+        finally:
+            os.chdir(cwd)
+
+    for i, (pico, retido) in enumerate(medidas, start=1):
+        print(f"sessão {i:>3}  pico {pico:8.2f} MB  retido {retido:8.2f} MB", flush=True)
+    demais = medidas[1:]
+    if demais:
+        pico_medio = sum(p for p, _ in demais) / len(demais)
+        retido_medio = sum(r for _, r in demais) / len(demais)
+        print(f"média sem a primeira sessão: pico {pico_medio:.2f} MB  retido {retido_medio:.2f} MB", flush=True)
+
+
+if __name__ == "__main__":
+    main()
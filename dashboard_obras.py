@@ -3,140 +3,240 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import base64
-from io import BytesIO
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-import matplotlib
-matplotlib.use("Agg")  # Use non-interactive backend
-
-# Imports para nova geração de PDF com ReportLab
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-    from reportlab.platypus.frames import Frame
-    from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
-    from reportlab.graphics.shapes import Drawing
-    from reportlab.graphics.charts.barcharts import VerticalBarChart
-    from reportlab.graphics.charts.piecharts import Pie
-    from reportlab.graphics.charts.linecharts import HorizontalLineChart
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
-# Imports para versão premium com Plotly
-try:
-    import kaleido
-    KALEIDO_AVAILABLE = True
-except ImportError:
-    KALEIDO_AVAILABLE = False
+import time
+import uuid
+
+from obras.data import EXCEL_PATH, NUMERIC_COLS_SHEET2, freeze_snapshot, shared_snapshot, snapshot_version
+from obras.excel import XLSXWRITER_AVAILABLE, create_excel_export
+from obras.filters import (
+    CATEGORY_COLUMNS, PERIOD_MODES, RANGE_COLUMNS, FilterIndex, decode_filters, encode_filters, filters_key,
+)
+from obras.history import HistoryStore, diff_versions
+from obras.materialize import load_materialized
+from obras.formatting import format_currency_br
+from obras.metrics import (
+    DATA_CACHE, LOAD_DATA_SECONDS, exporter_config, observe_rerun, start_http_exporter, touch_session,
+    track_export, write_textfile,
+)
+from obras.money import allocate, to_centavos, to_reais
+from obras.model import build_view, cidades_options, get_aggregates
+from obras.picker import GROUP_COLUMNS, ProjectIndex, ProjectSelection
+from obras.policies import DEFAULT_POLICY, POLICIES
+from obras.reports import OUTPUT_PROFILES, REPORTLAB_AVAILABLE, create_complete_dashboard_pdf
+from obras.table import PAGE_SIZES, TableIndex, page_count
+from obras.theme import ALL_GANTT_COLORS, COLORS
+from obras.timing import PERF_LOG_PATH, SectionTimer, accumulate, append_jsonl
+from obras.warmup import WARMUP_OBRAS, Warmup, obra_usage, record_usage, warmup_order
+from obras.workload import workload_curve
 
 st.set_page_config(page_title="Dashboard de Obras", layout="wide")
 
-# Cores da identidade visual
-COLORS = {
-    "primary": "#00497A",
-    "secondary": "#FFD700",
-    "support1": "#008DDE",
-    "support2": "#00609B",
-    "support3": "#FFB81C",
-    "support4": "#C99900",
-    "support5": "#00BF6F",
-    "support6": "#A9BE00",
-    "support7": "#F2913D",
-    "support8": "#EB634C",
-    "support9": "#5B2D82",
-    "support10": "#806EAF",
+# Limite de obras listadas (com caixa de seleção) no seletor de obras
+MAX_OBRAS_LISTADAS = 50
+
+# Rótulos dos filtros por valor (em cascata)
+CATEGORY_LABELS = {
+    "Tipologia": "🏷️ Tipologia",
+    "Etapa": "🚧 Etapa",
+    "Empresa desenvolvedora": "🏢 Empresa",
+    "UF": "🗺️ UF",
+    "Sócia": "🤝 Sócia",
 }
 
-# Adicionando mais 10 cores para o gráfico de Gantt
-ADDITIONAL_COLORS = [
-    "#FF6347",
-    "#4682B4",
-    "#DAA520",
-    "#8A2BE2",
-    "#3CB371",
-    "#FFDAB9",
-    "#CD5C5C",
-    "#40E0D0",
-    "#EE82EE",
-    "#7B68EE",
-]
-
-ALL_GANTT_COLORS = list(COLORS.values()) + ADDITIONAL_COLORS
-
-
-# Função para formatar valores como moeda brasileira
-def format_currency_br(value, show_cents=True):
-    if pd.isna(value):
-        return "R$ 0,00"
-
-    if show_cents:
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    else:
-        # Formatação simplificada para valores gerais (sem centavos)
-        if value >= 1000000:
-            return f"R$ {value/1000000:.1f}M".replace(".", ",")
-        elif value >= 1000:
-            return f"R$ {value/1000:.0f}K"
-        else:
-            return f"R$ {value:,.0f}".replace(",", ".")
+# Formato e passo dos sliders de faixa de valores
+RANGE_SLIDER_FORMATS = {
+    "Saldo": ("R$ %.0f", 1000.0),
+    "Lotes": ("%.0f", 1.0),
+    "% Avanço Físico": ("%.1f%%", 0.1),
+    "Índice Ômega": ("%.3f", 0.001),
+    "Custo Fluxo": ("R$ %.0f", 1000.0),
+}
+
+# --- Painel de desempenho (opcional) ---
+# Cada perf.lap() registra o tempo desde a marcação anterior; com o painel
+# desligado o SectionTimer não tem timings e as marcações não fazem nada.
+with st.sidebar:
+    perf_ativo = st.toggle("⏱️ Performance", key="perf_ativo", help=f"Mede o tempo de cada etapa do rerun e grava em {PERF_LOG_PATH}")
+    perf_painel = st.container()
+
+
+# Exportador de métricas Prometheus (OBRAS_METRICS_PORT / OBRAS_METRICS_FILE), iniciado uma vez por processo
+@st.cache_resource
+def start_metrics_exporter():
+    porta, arquivo = exporter_config()
+    if porta:
+        start_http_exporter(porta)
+    return porta, arquivo
+
+
+metricas_porta, metricas_arquivo = start_metrics_exporter()
+metricas_ativas = bool(metricas_porta or metricas_arquivo)
+inicio_rerun = time.perf_counter()
+perf = SectionTimer({} if perf_ativo or metricas_ativas else None)
+
+
+def plot(fig, nome):
+    """st.plotly_chart medindo a montagem da figura (até aqui) e a serialização"""
+    perf.lap(f"figura: {nome}")
+    st.plotly_chart(fig, use_container_width=True)
+    perf.lap(f"plotly_chart: {nome}")
 
 
 # --- Carregamento dos dados ---
-@st.cache_data
-def load_data():
-    df = pd.read_excel("./cadastro_obras_simplificado.xlsx", sheet_name="Sheet1")
-    df_sheet2 = pd.read_excel("./cadastro_obras_simplificado.xlsx", sheet_name="Sheet2")
+# Um único snapshot por processo, somente leitura, referenciado por todas as
+# sessões sem cópia (st.cache_data devolveria uma cópia a cada rerun) e pelos
+# outros dashboards do mesmo servidor (obras.data.shared_snapshot). A
+# conversão de tipos acontece uma vez, na leitura da planilha.
+@st.cache_resource
+def load_shared_snapshot():
+    inicio = time.perf_counter()
+    snapshot = shared_snapshot(EXCEL_PATH)
+    DATA_CACHE.misses += 1
+    LOAD_DATA_SECONDS.observe(time.perf_counter() - inicio)
+    return snapshot
+
+
+# Histórico das versões da planilha: a versão carregada é guardada (uma vez por processo)
+@st.cache_resource
+def load_history():
+    store = HistoryStore()
+    try:
+        store.ingest(load_shared_snapshot(), EXCEL_PATH)
+    except OSError:
+        # Sem permissão de escrita: mostra só as versões já guardadas
+        pass
+    return store
+
+
+@st.cache_resource
+def load_history_version(nome):
+    return freeze_snapshot(load_history().load(nome))
+
+
+@st.cache_data(max_entries=16)
+def compare_versions(nome_a, nome_b, selected_obras, selected_cidades):
+    return diff_versions(load_history_version(nome_a), load_history_version(nome_b), selected_obras, selected_cidades)
+
+
+@st.cache_resource
+def load_data_version():
+    return snapshot_version(load_shared_snapshot())
+
+
+# Visões pré-calculadas por `python -m obras.materialize` para esta versão dos dados
+@st.cache_resource
+def load_materialized_views():
+    return load_materialized(load_data_version())
+
+
+# Visões calculadas, por versão dos dados e forma canônica do filtro (a mesma dos links),
+# compartilhadas entre as sessões: um link recebido cai numa visão já calculada
+@st.cache_resource(max_entries=64 + WARMUP_OBRAS)
+def load_view(versao, chave_filtro, _selected_obras, _selected_cidades, _politica, _filtros, _timings=None):
+    return build_view(
+        load_shared_snapshot(), _selected_obras, _selected_cidades, timings=_timings, policy=_politica,
+        mask=load_filter_index().mask(**_filtros),
+    )
 
-    # Preencher valores nulos para colunas numéricas e de data
-    numeric_cols = [
-        "Custo Raso Meta",
-        "Custo Fluxo",
-        "Percentual Incorrido do Fluxo%",
-        "ago/25",
-        "set/25",
-        "out/25",
-        "Média dos Próximos Meses",
-        "Saldo",
-        "Índice Ômega",
-        "% Avanço Físico",
-        "%Avanço Financeiro",
-        "Tempo de Obra",
-        "Lotes",
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
-    date_cols = ["Início Obra", "Fim Obra"]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
+# Curva de carga por versão dos dados e filtro (o DataFrame fica fora da chave do cache)
+@st.cache_data(max_entries=64 + WARMUP_OBRAS)
+def load_workload(versao, chave_filtro, _df_filtered_projetos, _centavos=None):
+    return workload_curve(_df_filtered_projetos, _centavos)
 
-    # Separar custos gerais (IDs 900 e 901) - Manter para compatibilidade, mas usaremos valores fixos
-    df_custos_gerais_from_excel = df[df["ID"].isin([900, 901])].copy()
-    df_projetos = df[~df["ID"].isin([900, 901])].copy()
 
-    return df_projetos, df_custos_gerais_from_excel, df_sheet2
+@st.cache_resource
+def load_project_index():
+    return ProjectIndex(load_shared_snapshot().df_projetos)
 
 
-df_projetos, df_custos_gerais_from_excel, df_sheet2 = load_data()
+# Índices dos demais filtros (período, faixas de valores, categorias), montados uma vez por processo
+@st.cache_resource
+def load_filter_index():
+    return FilterIndex(load_shared_snapshot().df_projetos)
+
+
+faltas_dados = DATA_CACHE.misses
+snapshot = load_shared_snapshot()
+if DATA_CACHE.misses == faltas_dados:
+    DATA_CACHE.hits += 1
+df_projetos, df_custos_gerais, df_sheet2 = snapshot
+materializado = load_materialized_views()
+project_index = load_project_index()
+filter_index = load_filter_index()
+
+
+def aquecer_visao(selected_obras):
+    """Calcula e guarda nos caches a visão (com agregados) e a curva de carga de `selected_obras`, sem outros filtros"""
+    versao = load_data_version()
+    selected_cidades = cidades_options(df_projetos, selected_obras)
+    chave = filters_key(encode_filters(selected_obras, project_index.names))
+    view = materializado.view(selected_obras, selected_cidades) if materializado is not None else None
+    if view is None:
+        view = load_view(versao, chave, selected_obras, selected_cidades, DEFAULT_POLICY, {})
+        get_aggregates(view)
+    load_workload(versao, chave, view["df_filtered_projetos"], view.get("centavos_projetos"))
 
-# Despesas fixas hardcoded
-despesas_fixas = pd.DataFrame(
-    {
-        "ID": [900, 901],
-        "Projeto": ["Diesel dos Equipamentos", "Custo de Operação da Mecanica"],
-        "Custo Fluxo": [779000 * 12 / 13, 641891 * 12 / 13],  # Valores diluídos por 13 meses
-    }
-)
 
-# Concatenar despesas fixas com os custos gerais lidos do excel, se houver
-df_custos_gerais = pd.concat([df_custos_gerais_from_excel, despesas_fixas], ignore_index=True)
+# Aquecimento opcional (OBRAS_WARMUP_OBRAS), uma vez por processo: visão padrão e as
+# das obras mais escolhidas recentemente, em segundo plano
+@st.cache_resource
+def start_view_warmup():
+    if not WARMUP_OBRAS:
+        return None
+    obras = warmup_order(project_index.names, obra_usage())[:WARMUP_OBRAS]
+    return Warmup(aquecer_visao, [project_index.names, *([obra] for obra in obras)]).start()
+
+
+aquecimento = start_view_warmup()
+perf.lap("load_data")
+
+
+def multiselect_cascata(label, opcoes, key, **kwargs):
+    """Multiselect de filtro em cascata: quando as opções mudam, volta a marcar todas.
+
+    Na primeira vez, mantém os valores pré-carregados (do link) que ainda são opções.
+    """
+    chave_opcoes = f"{key}_opcoes"
+    if st.session_state.get(chave_opcoes) != opcoes:
+        if chave_opcoes in st.session_state or key not in st.session_state:
+            st.session_state[key] = opcoes
+        else:
+            st.session_state[key] = [v for v in st.session_state[key] if v in opcoes]
+        st.session_state[chave_opcoes] = opcoes
+    return st.multiselect(label, options=opcoes, key=key, **kwargs)
+
+
+def _entre(valor, minimo, maximo):
+    return min(max(valor, minimo), maximo)
+
+
+# Filtros do link (query string da página), aplicados ao estado dos widgets uma vez por sessão
+if not st.session_state.get("filtros_da_url"):
+    st.session_state["filtros_da_url"] = True
+    estado_url = decode_filters({nome: st.query_params.get_all(nome) for nome in st.query_params})
+    if estado_url["obra"] is not None:
+        selecao_url = ProjectSelection(len(project_index), todas=False)
+        selecao_url.add(project_index.positions_of(estado_url["obra"]))
+        st.session_state["obras_selecao"] = selecao_url
+    elif estado_url["sem_obra"] is not None:
+        selecao_url = ProjectSelection(len(project_index))
+        selecao_url.remove(project_index.positions_of(estado_url["sem_obra"]))
+        st.session_state["obras_selecao"] = selecao_url
+    if estado_url["cidades"] is not None:
+        st.session_state["cidades"] = estado_url["cidades"]
+    st.session_state["politica"] = estado_url["politica"]
+    filtros_url = estado_url["filtros"]
+    if "periodo" in filtros_url and filter_index.periodo.min is not None:
+        limites = filter_index.periodo.min.date(), filter_index.periodo.max.date()
+        st.session_state["periodo"] = tuple(sorted(_entre(data, *limites) for data in filtros_url["periodo"]))
+        st.session_state["periodo_modo"] = filtros_url["periodo_modo"]
+    for coluna, (de, ate) in filtros_url.get("faixas", {}).items():
+        indice = filter_index.faixas.get(coluna)
+        if indice is not None and indice.min is not None:
+            st.session_state[f"faixa_{coluna}"] = tuple(sorted(_entre(v, indice.min, indice.max) for v in (de, ate)))
+    for coluna, valores in filtros_url.get("categorias", {}).items():
+        st.session_state[f"categoria_{coluna}"] = list(valores)
 
 st.title("📊 Dashboard de Obras - Abecker Loteamentos")
 
@@ -161,729 +261,218 @@ with st.sidebar:
     10. A diferença entre o custo meta e o custo do fluxo corresponde ao BDI e Permutas da Abecker.
     """
     )
+    politica = st.selectbox(
+        "Rateio das despesas fixas",
+        options=list(POLICIES),
+        format_func=lambda nome: POLICIES[nome].label,
+        key="politica",
+        help="Base de lotes usada para ratear diesel e mecânica entre as obras",
+    )
+    if aquecimento is not None and aquecimento.running():
+        st.caption(f"🔥 Preparando visões por obra: {aquecimento.done} de {aquecimento.total}")
+    if aquecimento is not None and aquecimento.errors:
+        st.caption(f"⚠️ Aquecimento: {aquecimento.errors} falha(s) · última: {aquecimento.last_error}")
 
 # --- Melhoria 3: Filtros com prioridade para obras ---
 st.header("⚙️ Filtros")
 col1, col2 = st.columns(2)
 
 with col1:
-    # Filtro principal: Obras
-    obras_options = df_projetos["Projeto"].dropna().unique().tolist()
-    selected_obras = st.multiselect(
+    # Filtro principal: Obras (busca por nome; a seleção guarda só as exceções)
+    selecao = st.session_state.get("obras_selecao")
+    if selecao is None or selecao.total != len(project_index):
+        selecao = st.session_state["obras_selecao"] = ProjectSelection(len(project_index))
+
+    busca_obra = st.text_input(
         "🏗️ Filtrar por Obra",
-        options=obras_options,
-        default=obras_options,
-        help="Selecione uma ou mais obras específicas - Filtro Principal",
+        placeholder="Buscar pelo nome (ex.: resid 12)",
+        help="Digite parte do nome e selecione os resultados - Filtro Principal",
     )
+    agrupar_obras = st.radio("Agrupar por", ["Nenhum", *GROUP_COLUMNS], horizontal=True)
+    obras_encontradas = project_index.search(busca_obra)
+
+    col_add, col_remove, col_todas, col_nenhuma = st.columns(4)
+    col_add.button("✅ Selecionar encontradas", on_click=selecao.add, args=(obras_encontradas,))
+    col_remove.button("❌ Remover encontradas", on_click=selecao.remove, args=(obras_encontradas,))
+    col_todas.button("Todas", on_click=selecao.select_all)
+    col_nenhuma.button("Nenhuma", on_click=selecao.clear)
+    st.caption(
+        f"{len(selecao)} de {len(project_index)} obras selecionadas · {len(obras_encontradas)} encontradas na busca"
+    )
+
+    with st.expander("Obras encontradas", expanded=bool(busca_obra)):
+        if agrupar_obras == "Nenhum":
+            grupos_obras = [(None, obras_encontradas)]
+        else:
+            grupos_obras = project_index.group(obras_encontradas, GROUP_COLUMNS[agrupar_obras])
+        mostradas = 0
+        for grupo, posicoes in grupos_obras:
+            if mostradas >= MAX_OBRAS_LISTADAS:
+                break
+            if grupo is not None:
+                col_grupo, col_grupo_add, col_grupo_remove = st.columns([3, 1, 1])
+                col_grupo.markdown(f"**{grupo}** ({len(posicoes)})")
+                col_grupo_add.button("✅", key=f"grupo_add_{agrupar_obras}_{grupo}", on_click=selecao.add, args=(posicoes,),
+                                     help=f"Selecionar as obras encontradas de {grupo}")
+                col_grupo_remove.button("❌", key=f"grupo_remove_{agrupar_obras}_{grupo}", on_click=selecao.remove,
+                                        args=(posicoes,), help=f"Remover as obras encontradas de {grupo}")
+            for pos in posicoes[:MAX_OBRAS_LISTADAS - mostradas]:
+                st.checkbox(project_index.names[pos], value=pos in selecao, on_change=selecao.toggle, args=(int(pos),))
+                mostradas += 1
+        if len(obras_encontradas) > mostradas:
+            st.caption(f"Mostrando {mostradas} de {len(obras_encontradas)}; refine a busca para ver as demais.")
+
+    selected_obras = project_index.names_at(selecao.positions())
 
 with col2:
     # Filtrar cidades com base nas obras selecionadas
-    if selected_obras:
-        cidades_options_filtered_by_obra = df_projetos[
-            df_projetos["Projeto"].isin(selected_obras)
-        ]["Cidade"].dropna().unique().tolist()
-    else:
-        cidades_options_filtered_by_obra = df_projetos["Cidade"].dropna().unique().tolist()
+    cidades_options_filtered_by_obra = cidades_options(df_projetos, selected_obras)
 
-    selected_cidades = st.multiselect(
+    selected_cidades = multiselect_cascata(
         "🏙️ Cidade das Obras (Preenchido Automaticamente)",
-        options=cidades_options_filtered_by_obra,
-        default=cidades_options_filtered_by_obra,
+        cidades_options_filtered_by_obra,
+        key="cidades",
         help="Selecione uma ou mais cidades",
     )
 
-# Aplicar filtros
-df_filtered_projetos = df_projetos[
-    df_projetos["Projeto"].isin(selected_obras)
-    & df_projetos["Cidade"].isin(selected_cidades)
-]
-
-# Determinar se deve mostrar centavos (quando obra específica é selecionada)
-show_cents = len(selected_obras) == 1
-
-# --- Cálculo proporcional do custo geral executado por lote ---
-total_lotes_geral = df_projetos["Lotes"].sum()  # Total de lotes de todas as obras
-total_lotes_filtrado = df_filtered_projetos["Lotes"].sum()  # Total de lotes das obras filtradas
-
-# Custo geral executado total
-custo_geral_exec_total = df_custos_gerais["Custo Fluxo"].sum()
-
-# Custo geral executado proporcional baseado nos lotes
-if total_lotes_geral > 0:
-    proporcao_lotes = total_lotes_filtrado / total_lotes_geral
-    custo_geral_exec_proporcional = custo_geral_exec_total * proporcao_lotes
-else:
-    custo_geral_exec_proporcional = 0
-
-# --- KPIs de Projetos ---
-total_obras = len(df_filtered_projetos)
-investimento_exec_projetos = df_filtered_projetos["Custo Fluxo"].sum()
-media_proximos_meses_projetos = df_filtered_projetos["Média dos Próximos Meses"].sum()
-saldo_projetos = df_filtered_projetos["Saldo"].sum()
-total_lotes = df_filtered_projetos["Lotes"].sum()
-
-# --- Novos Indicadores Solicitados ---
-custo_total_fluxo_obras = investimento_exec_projetos + custo_geral_exec_proporcional
-custo_ago_25 = df_filtered_projetos["ago/25"].sum()
-custo_set_25 = df_filtered_projetos["set/25"].sum()
-custo_out_25 = df_filtered_projetos["out/25"].sum()
-valor_restante_pagar_media = media_proximos_meses_projetos
-saldo_total_acumulado = saldo_projetos
+# Demais filtros, respondidos pelos índices montados na carga; só os ativos entram em `filtros`
+filtros = {}
+col_periodo, col_periodo_modo = st.columns([2, 1])
+if filter_index.periodo.min is not None:
+    st.session_state.setdefault("periodo", ())
+    with col_periodo:
+        periodo = st.date_input(
+            "📅 Período da Obra",
+            key="periodo",
+            min_value=filter_index.periodo.min.date(),
+            max_value=filter_index.periodo.max.date(),
+            format="DD/MM/YYYY",
+            help="Escolha a data inicial e a final; vazio não filtra",
+        )
+    with col_periodo_modo:
+        periodo_modo = st.selectbox(
+            "Obras que", list(PERIOD_MODES), format_func=PERIOD_MODES.get, key="periodo_modo",
+            help="Relação entre o período escolhido e o intervalo Início Obra - Fim Obra",
+        )
+    if len(periodo) == 2:
+        filtros["periodo"] = tuple(periodo)
+        filtros["periodo_modo"] = periodo_modo
+
+# Faixas de valores: limites dos sliders vêm do índice (calculados uma vez na carga)
+with st.expander("🎚️ Faixas de Valores"):
+    faixas = {}
+    colunas_faixas = st.columns(len(RANGE_COLUMNS))
+    for col_faixa, coluna in zip(colunas_faixas, RANGE_COLUMNS):
+        indice = filter_index.faixas.get(coluna)
+        if indice is None or indice.min is None or indice.min == indice.max:
+            continue
+        formato, passo = RANGE_SLIDER_FORMATS[coluna]
+        st.session_state.setdefault(f"faixa_{coluna}", (indice.min, indice.max))
+        with col_faixa:
+            de, ate = st.slider(
+                coluna, min_value=indice.min, max_value=indice.max, step=passo, format=formato, key=f"faixa_{coluna}",
+            )
+        # Só filtra quando a faixa foi estreitada
+        if de > indice.min or ate < indice.max:
+            faixas[coluna] = (de, ate)
+    if faixas:
+        filtros["faixas"] = faixas
+
+# Filtros em cascata, como o de cidade: as opções de cada um são os valores das
+# obras que passam pelos filtros anteriores, tirados do índice por valor
+mascara_cascata = filter_index.mask(categorias={"Projeto": selected_obras, "Cidade": selected_cidades}, **filtros)
+categorias = {}
+for col_categoria, coluna in zip(st.columns(len(CATEGORY_COLUMNS)), CATEGORY_COLUMNS):
+    indice = filter_index.categorias.get(coluna)
+    if indice is None:
+        continue
+    opcoes = indice.options(mascara_cascata)
+    with col_categoria:
+        escolhidas = multiselect_cascata(CATEGORY_LABELS[coluna], opcoes, key=f"categoria_{coluna}")
+    # Todas as opções marcadas não restringem nada
+    if len(escolhidas) < len(opcoes):
+        categorias[coluna] = tuple(escolhidas)
+        mascara_cascata = mascara_cascata & indice.mask(escolhidas)
+if categorias:
+    filtros["categorias"] = categorias
+
+# Forma canônica dos filtros: vai para a URL (link compartilhável) e é a chave dos caches
+params_filtro = encode_filters(
+    selected_obras, project_index.names,
+    selected_cidades if len(selected_cidades) < len(cidades_options_filtered_by_obra) else None,
+    politica, filtros,
+)
+chave_filtro = filters_key(params_filtro)
+# Log de uso só com o aquecimento ligado (é a única coisa que o lê)
+if WARMUP_OBRAS and st.session_state.get("ultimo_filtro") != chave_filtro:
+    st.session_state["ultimo_filtro"] = chave_filtro
+    try:
+        record_usage(params_filtro)
+    except OSError:
+        # Sem permissão de escrita: o aquecimento segue a ordem da planilha
+        pass
+if {nome: st.query_params.get_all(nome) for nome in st.query_params} != params_filtro:
+    st.query_params.from_dict(params_filtro)
+st.caption("🔗 O endereço da página guarda estes filtros: copie-o para compartilhar esta visão.")
+
+perf.lap("widgets_filtros")
+
+# Aplicar filtros e calcular os KPIs
+view = None
+if materializado is not None and politica == DEFAULT_POLICY and not filtros:
+    view = materializado.view(selected_obras, selected_cidades)
+if view is None:
+    view = load_view(
+        load_data_version(), chave_filtro, selected_obras, selected_cidades, politica, filtros, perf.timings
+    )
+    perf.mark()
+df_filtered_projetos = view["df_filtered_projetos"]
+show_cents = view["show_cents"]
+kpis = view["kpis"]
+aggregates = get_aggregates(view)
+perf.lap("agregados")
+
+total_obras = kpis["total_obras"]
+investimento_exec_projetos = kpis["investimento_exec_projetos"]
+media_proximos_meses_projetos = kpis["media_proximos_meses_projetos"]
+saldo_projetos = kpis["saldo_projetos"]
+total_lotes = kpis["total_lotes"]
+proporcao_lotes = kpis["proporcao_lotes"]
+custo_geral_exec_proporcional = kpis["custo_geral_exec_proporcional"]
+custo_total_fluxo_obras = kpis["custo_total_fluxo_obras"]
+custo_ago_25 = kpis["custo_ago_25"]
+custo_set_25 = kpis["custo_set_25"]
+custo_out_25 = kpis["custo_out_25"]
+valor_restante_pagar_media = kpis["valor_restante_pagar_media"]
 
 # --- Funcionalidade de Exportação para PDF (Movida para o topo) ---
 st.markdown("---")
 
-# Função para criar PDF completo - "Print da tela" - VERSÃO MELHORADA
-def create_complete_dashboard_pdf():
-    """Cria um PDF completo que replica exatamente o dashboard na tela - versão melhorada"""
-    
-    if not REPORTLAB_AVAILABLE:
-        st.error("ReportLab não está instalado.")
-    
-    buffer = BytesIO()
-    
-    # Configurar documento
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        topMargin=0.5*inch,
-        bottomMargin=0.5*inch
-    )
-    
-    # Estilos sem emojis
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, spaceAfter=20, 
-                                textColor=colors.HexColor('#00497A'), alignment=1, fontName='Helvetica-Bold')
-    
-    section_style = ParagraphStyle('Section', parent=styles['Heading2'], fontSize=14, spaceBefore=15, 
-                                  spaceAfter=10, textColor=colors.HexColor('#00497A'), fontName='Helvetica-Bold')
-    
-    subsection_style = ParagraphStyle('Subsection', parent=styles['Heading3'], fontSize=12, spaceBefore=10, 
-                                     spaceAfter=8, textColor=colors.HexColor('#008DDE'), fontName='Helvetica-Bold')
-    
-    story = []
-    
-    # === TÍTULO PRINCIPAL ===
-    story.append(Paragraph("Relatório de Obras", title_style))
-    story.append(Spacer(1, 20))
-    
-    # === OBSERVAÇÕES NO TOPO ===
-    story.append(Paragraph("Observações e Considerações", section_style))
-    
-    observacoes_text = """
-    <b>Considerações do fluxo financeiro:</b><br/>
-    1. Pedras com permuta<br/>
-    2. Tubos com permutas<br/>
-    3. Asfalto com permutas<br/>
-    4. Parcelamentos dos terceiros de acordo com os contratos<br/>
-    5. O Percentual incorrido é do fluxo, e não do orçamento meta<br/>
-    6. Incluído o Diesel no fluxo (Rateado)<br/>
-    7. Incluída a operação da Mecânica no fluxo (Rateado)<br/><br/>
-    
-    <b>Não considerado no fluxo:</b><br/>
-    8. Mão de obra da Abecker<br/>
-    9. Equipamentos<br/><br/>
-    
-    <b>Informações do Relatório:</b><br/>
-    • Relatório gerado em: {data_geracao}<br/>
-    • Filtros aplicados preservados<br/>
-    • Todos os gráficos e dados do dashboard incluídos
-    """.format(data_geracao=pd.Timestamp.now().strftime('%d/%m/%Y às %H:%M'))
-    
-    story.append(Paragraph(observacoes_text, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # === FILTROS APLICADOS ===
-    story.append(Paragraph("Filtros Aplicados", section_style))
-    filtros_text = f"<b>Filtros Aplicados:</b><br/>"
-    filtros_text += f"• <b>Obras Selecionadas:</b> {', '.join(selected_obras[:5])}{'...' if len(selected_obras) > 5 else ''}<br/>"
-    filtros_text += f"• <b>Cidades Selecionadas:</b> {', '.join(selected_cidades[:5])}{'...' if len(selected_cidades) > 5 else ''}"
-    story.append(Paragraph(filtros_text, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # === KPIs PRINCIPAIS ===
-    story.append(Paragraph("Principais Indicadores", section_style))
-    
-    # KPIs em formato de cards
-    kpis_principais = [
-        ['Total de Obras', str(total_obras)],
-        ['Custo Fluxo Projetos', format_currency_br(investimento_exec_projetos, show_cents)],
-        ['Média Próximos Meses (Projetos)', format_currency_br(media_proximos_meses_projetos, show_cents)],
-        ['Saldo Projetos', format_currency_br(saldo_projetos, show_cents)],
-        ['Total de Lotes', f"{total_lotes:,}".replace(",", ".")]
-    ]
-    
-    kpis_table = Table(kpis_principais, colWidths=[4*inch, 3*inch])
-    kpis_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
-    ]))
-    story.append(kpis_table)
-    story.append(Spacer(1, 20))
-    
-    # === CUSTOS GERAIS (DESPESAS FIXAS) ===
-    story.append(Paragraph("Sumário de Custos Gerais (Despesas Fixas)", section_style))
-    
-    custos_gerais = [
-        ['Custo Geral Exec. (Fixas - Proporcional)', format_currency_br(custo_geral_exec_proporcional, show_cents)]
-    ]
-    if show_cents:
-        custos_gerais.append(['Proporção de Lotes', f"{proporcao_lotes:.1%}"])
-    
-    custos_table = Table(custos_gerais, colWidths=[4*inch, 3*inch])
-    custos_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightgreen),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
-    ]))
-    story.append(custos_table)
-    story.append(Spacer(1, 20))
-    
-    # === INDICADORES TOTAIS ===
-    story.append(Paragraph("Indicadores de Custos Totais", section_style))
-    
-    indicadores_totais = [
-        ['Custo Total do Fluxo (Geral)', format_currency_br(custo_total_fluxo_obras, show_cents)],
-        ['Custo Ago/25', format_currency_br(custo_ago_25, show_cents)],
-        ['Custo Set/25', format_currency_br(custo_set_25, show_cents)],
-        ['Custo Out/25', format_currency_br(custo_out_25, show_cents)],
-        ['Valor Restante a Pagar (Média)', format_currency_br(valor_restante_pagar_media, show_cents)]
-    ]
-    
-    indicadores_table = Table(indicadores_totais, colWidths=[4*inch, 3*inch])
-    indicadores_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.lightyellow),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
-    ]))
-    story.append(indicadores_table)
-    story.append(PageBreak())
-    
-    # === GRÁFICOS PRINCIPAIS ===
-    if not df_filtered_projetos.empty:
-        
-        # 1. OBRAS POR TIPOLOGIA
-        story.append(Paragraph("Obras por Tipologia", section_style))
-        tipologia_counts = df_filtered_projetos.groupby("Tipologia").agg({"Projeto": "count", "Lotes": "sum"}).reset_index()
-        tipologia_counts.columns = ["Tipologia", "Número de Obras", "Total de Lotes"]
-        
-        if KALEIDO_AVAILABLE:
-            fig_tipologia = px.pie(
-                tipologia_counts,
-                values="Número de Obras",
-                names="Tipologia", 
-                title="Distribuição por Tipologia",
-                color_discrete_sequence=px.colors.sequential.Greens_r
-            )
-            fig_tipologia.update_layout(
-                title_font_size=14,
-                title_font_color=COLORS["primary"],
-                font=dict(size=10),
-                showlegend=True,
-                height=400
-            )
-            
-            img_bytes = fig_tipologia.to_image(format="png", width=700, height=400, scale=2)
-            img_tipologia = Image(BytesIO(img_bytes), width=6*inch, height=3*inch)
-            story.append(img_tipologia)
-        
-        story.append(Spacer(1, 20))
-        
-        # 2. CUSTO FLUXO POR PROJETO
-        story.append(Paragraph("Custo Fluxo por Projeto", section_style))
-        
-        if KALEIDO_AVAILABLE:
-            df_custo_fluxo = df_filtered_projetos[["Projeto", "Custo Fluxo", "Lotes"]].copy()
-            grafico1 = px.bar(
-                df_custo_fluxo,
-                x="Projeto",
-                y="Custo Fluxo",
-                labels={"Custo Fluxo": "Custo (R$)"},
-                color_discrete_sequence=[COLORS["primary"]],
-                hover_data=["Lotes"]
-            )
-            grafico1.update_layout(
-                title_font_size=14,
-                title_font_color=COLORS["primary"],
-                xaxis_tickangle=-45,
-                font=dict(size=10),
-                height=500
-            )
-            
-            img_bytes = grafico1.to_image(format="png", width=800, height=500, scale=2)
-            img_custo = Image(BytesIO(img_bytes), width=7*inch, height=4*inch)
-            story.append(img_custo)
-        
-        story.append(PageBreak())
-        
-        # 3. CRONOGRAMA DAS OBRAS - CORRIGIDO
-        gantt_data = df_filtered_projetos[["Projeto", "Início Obra", "Fim Obra"]].dropna()
-        if not gantt_data.empty:
-            story.append(Paragraph("Cronograma das Obras", section_style))
-            
-            if KALEIDO_AVAILABLE:
-                # Preparar dados do Gantt de forma mais robusta
-                gantt_list = []
-                for _, row in gantt_data.iterrows():
-                    if pd.notna(row["Início Obra"]) and pd.notna(row["Fim Obra"]):
-                        inicio = pd.to_datetime(row["Início Obra"])
-                        fim = pd.to_datetime(row["Fim Obra"])
-                        
-                        # Garantir que as datas estão em um range válido
-                        if inicio < pd.to_datetime("2024-01-01"):
-                            inicio = pd.to_datetime("2024-01-01")
-                        
-                        gantt_list.append({
-                            'Task': row["Projeto"],
-                            'Start': inicio,
-                            'Finish': fim,
-                            'Resource': row["Projeto"]
-                        })
-                
-                if gantt_list:
-                    df_gantt = pd.DataFrame(gantt_list)
-                    
-                    # Criar gráfico Gantt com plotly
-                    fig_gantt = px.timeline(
-                        df_gantt, 
-                        x_start="Start", 
-                        x_end="Finish",
-                        y="Task",
-                        color="Resource",
-                        title="Cronograma das Obras"
-                    )
-                    
-                    fig_gantt.update_yaxes(autorange="reversed", title="Projetos")
-                    fig_gantt.update_xaxes(title="Período")
-                    fig_gantt.update_layout(
-                        title_font_size=14,
-                        title_font_color=COLORS["primary"],
-                        font=dict(size=9),
-                        height=600,
-                        showlegend=False
-                    )
-                    
-                    img_bytes = fig_gantt.to_image(format="png", width=800, height=600, scale=2)
-                    img_gantt = Image(BytesIO(img_bytes), width=7*inch, height=5*inch)
-                    story.append(img_gantt)
-            
-            story.append(PageBreak())
-    
-    # === DESPESAS RECORRENTES ===
-    if not df_sheet2.empty:
-        story.append(Paragraph("Despesas Recorrentes Detalhadas (Diesel e Mecânica)", section_style))
-        
-        # Gráfico de Custos Mensais da Sheet2 
-        if KALEIDO_AVAILABLE:
-            monthly_data = []
-            for _, row in df_sheet2.iterrows():
-                projeto = row["Projeto"]
-                tipologia = "Diesel" if "Diesel" in str(row.get("Tipologia", "")) else "Mecânica"
-                monthly_data.extend([
-                    {"Projeto": projeto, "Tipo": tipologia, "Mês": "Ago/25", "Valor": row.get("ago/25", 0)},
-                    {"Projeto": projeto, "Tipo": tipologia, "Mês": "Set/25", "Valor": row.get("set/25", 0)},
-                    {"Projeto": projeto, "Tipo": tipologia, "Mês": "Out/25", "Valor": row.get("out/25", 0)},
-                    {"Projeto": projeto, "Tipo": tipologia, "Mês": "Média Próximos", "Valor": row.get("Média dos Próximos Meses", 0)}
-                ])
-            
-            if monthly_data:
-                df_monthly_costs = pd.DataFrame(monthly_data)
-                fig_monthly_costs_sheet2 = px.line(
-                    df_monthly_costs,
-                    x="Mês", 
-                    y="Valor",
-                    color="Tipo",
-                    markers=True,
-                    labels={"Valor": "Valor (R$)", "Tipo": "Tipo de Custo"},
-                    color_discrete_sequence=[COLORS["support7"], COLORS["support8"]],
-                    title="Custos Mensais por Tipo de Despesa"
-                )
-                fig_monthly_costs_sheet2.update_traces(mode="lines+markers", line=dict(width=3), marker=dict(size=10))
-                fig_monthly_costs_sheet2.update_layout(
-                    title_font_size=14,
-                    title_font_color=COLORS["primary"],
-                    font=dict(size=10),
-                    height=400
-                )
-                
-                img_bytes = fig_monthly_costs_sheet2.to_image(format="png", width=800, height=400, scale=2)
-                img_monthly = Image(BytesIO(img_bytes), width=7*inch, height=3*inch)
-                story.append(img_monthly)
-        
-        story.append(PageBreak())
-    
-    # === OUTROS GRÁFICOS ===
-    if not df_filtered_projetos.empty:
-        
-        # Valores a Pagar por Mês
-        story.append(Paragraph("Valores a Pagar por Mês", section_style))
-        if KALEIDO_AVAILABLE:
-            monthly_costs = pd.DataFrame({
-                "Mês": ["Agosto/25", "Setembro/25", "Outubro/25", "Média Próximos Meses"],
-                "Valor": [custo_ago_25, custo_set_25, custo_out_25, valor_restante_pagar_media]
-            })
-            grafico_mensal = px.line(
-                monthly_costs,
-                x="Mês",
-                y="Valor",
-                labels={"Valor": "Valor (R$)"},
-                markers=True,
-                line_shape="linear",
-                title="Evolução dos Valores Mensais"
-            )
-            grafico_mensal.update_traces(
-                line=dict(color=COLORS["support7"], width=3),
-                marker=dict(size=10, color=COLORS["support8"])
-            )
-            grafico_mensal.update_layout(
-                title_font_size=14,
-                title_font_color=COLORS["primary"],
-                font=dict(size=10),
-                height=400
-            )
-            
-            img_bytes = grafico_mensal.to_image(format="png", width=800, height=400, scale=2)
-            img_mensal = Image(BytesIO(img_bytes), width=7*inch, height=3*inch)
-            story.append(img_mensal)
-        
-        # Obras por Cidade
-        story.append(Paragraph("Obras por Cidade", section_style))
-        if KALEIDO_AVAILABLE:
-            obras_por_cidade = df_filtered_projetos["Cidade"].value_counts().reset_index()
-            obras_por_cidade.columns = ["Cidade", "Número de Obras"]
-            grafico_cidade = px.bar(
-                obras_por_cidade,
-                x="Cidade",
-                y="Número de Obras", 
-                labels={"Número de Obras": "Quantidade de Obras"},
-                color_discrete_sequence=[COLORS["support6"]],
-                title="Distribuição por Cidade"
-            )
-            grafico_cidade.update_layout(
-                title_font_size=14,
-                title_font_color=COLORS["primary"],
-                xaxis_tickangle=-45,
-                font=dict(size=10),
-                height=400
-            )
-            
-            img_bytes = grafico_cidade.to_image(format="png", width=800, height=400, scale=2)
-            img_cidade = Image(BytesIO(img_bytes), width=7*inch, height=3*inch)
-            story.append(img_cidade)
-    
-    # Construir PDF
-    doc.build(story)
-    
-    buffer.seek(0)
-    return buffer
-
-# Função para criar PDF do dashboard usando ReportLab (versão profissional)
-def create_professional_pdf_report():
-    """Cria um relatório PDF profissional com ReportLab - melhor formatação e layout"""
-    
-    if not REPORTLAB_AVAILABLE:
-        st.error("ReportLab não está instalada. Usando versão básica do matplotlib.")
-    
-    buffer = BytesIO()
-    
-    # Configurar documento
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=0.5*inch,
-        leftMargin=0.5*inch,
-        topMargin=0.5*inch,
-        bottomMargin=0.5*inch
-    )
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        spaceAfter=30,
-        textColor=colors.HexColor('#00497A'),
-        alignment=1  # Center
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=16,
-        spaceAfter=20,
-        textColor=colors.HexColor('#008DDE'),
-        alignment=1
-    )
-    
-    section_style = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading3'],
-        fontSize=14,
-        spaceBefore=20,
-        spaceAfter=10,
-        textColor=colors.HexColor('#00497A'),
-        fontName='Helvetica-Bold'
-    )
-    
-    # Lista de elementos do documento
-    story = []
-    
-    # Título principal
-    story.append(Paragraph("📊 Dashboard de Obras - Relatório Executivo", title_style))
-    story.append(Spacer(1, 20))
-    
-    # Informações dos filtros
-    filtros_text = f"<b>Filtros Aplicados:</b><br/>"
-    filtros_text += f"• Obras: {', '.join(selected_obras[:5])}{'...' if len(selected_obras) > 5 else ''}<br/>"
-    filtros_text += f"• Cidades: {', '.join(selected_cidades[:5])}{'...' if len(selected_cidades) > 5 else ''}"
-    story.append(Paragraph(filtros_text, styles['Normal']))
-    story.append(Spacer(1, 30))
-    
-    # KPIs Principais em tabela estilizada
-    story.append(Paragraph("📊 Principais Indicadores", section_style))
-    
-    kpis_data = [
-        ['Indicador', 'Valor'],
-        ['🏗️ Total de Obras', str(total_obras)],
-        ['💰 Custo Fluxo Projetos', format_currency_br(investimento_exec_projetos, show_cents)],
-        ['🏘️ Total de Lotes', f"{total_lotes:,}".replace(",", ".")],
-        ['💸 Saldo Projetos', format_currency_br(saldo_projetos, show_cents)],
-        ['📈 Média Próximos Meses', format_currency_br(media_proximos_meses_projetos, show_cents)],
-        ['⚙️ Custo Geral (Proporcional)', format_currency_br(custo_geral_exec_proporcional, show_cents)]
-    ]
-    
-    kpis_table = Table(kpis_data, colWidths=[3*inch, 2.5*inch])
-    kpis_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#00497A')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
-    
-    story.append(kpis_table)
-    story.append(Spacer(1, 30))
-    
-    # Indicadores de Custos Mensais
-    story.append(Paragraph("💰 Valores Mensais", section_style))
-    
-    custos_mensais_data = [
-        ['Mês', 'Valor'],
-        ['Agosto/25', format_currency_br(custo_ago_25, show_cents)],
-        ['Setembro/25', format_currency_br(custo_set_25, show_cents)],
-        ['Outubro/25', format_currency_br(custo_out_25, show_cents)],
-        ['Custo Total do Fluxo', format_currency_br(custo_total_fluxo_obras, show_cents)]
-    ]
-    
-    custos_table = Table(custos_mensais_data, colWidths=[2.5*inch, 3*inch])
-    custos_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#008DDE')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightcyan])
-    ]))
-    
-    story.append(custos_table)
-    story.append(PageBreak())
-    
-    # Tabela detalhada das obras
-    if not df_filtered_projetos.empty:
-        story.append(Paragraph("📋 Tabela Detalhada das Obras", section_style))
-        
-        # Preparar dados da tabela
-        table_columns = ['Projeto', 'Cidade', 'Tipologia', 'Custo Fluxo', 'Saldo', 'Lotes']
-        existing_columns = [col for col in table_columns if col in df_filtered_projetos.columns]
-        
-        # Cabeçalho da tabela
-        table_data = [existing_columns]
-        
-        # Dados das obras
-        for _, row in df_filtered_projetos.iterrows():
-            row_data = []
-            for col in existing_columns:
-                if col in ['Custo Fluxo', 'Saldo']:
-                    row_data.append(format_currency_br(row[col], False))
-                elif col == 'Lotes':
-                    row_data.append(f"{row[col]:,.0f}".replace(",", "."))
-                else:
-                    row_data.append(str(row[col])[:20] + "..." if len(str(row[col])) > 20 else str(row[col]))
-            table_data.append(row_data)
-        
-        # Dividir tabela em páginas se necessário
-        rows_per_page = 20
-        for page_num, start_idx in enumerate(range(0, len(table_data)-1, rows_per_page)):
-            end_idx = min(start_idx + rows_per_page, len(table_data)-1)
-            
-            if page_num > 0:
-                story.append(PageBreak())
-                story.append(Paragraph(f"📋 Tabela Detalhada das Obras (Continuação - Página {page_num + 1})", section_style))
-            
-            page_data = [table_data[0]] + table_data[start_idx+1:end_idx+1]
-            
-            obras_table = Table(page_data, repeatRows=1)
-            obras_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
-            
-            story.append(obras_table)
-            story.append(Spacer(1, 20))
-    
-    # Gráfico de Custo Fluxo usando ReportLab Charts
-    if not df_filtered_projetos.empty and len(df_filtered_projetos) <= 10:
-        story.append(PageBreak())
-        story.append(Paragraph("📊 Custo Fluxo por Projeto", section_style))
-        
-        # Criar gráfico de barras com ReportLab
-        drawing = Drawing(400, 300)
-        
-        chart = VerticalBarChart()
-        chart.x = 50
-        chart.y = 50
-        chart.height = 200
-        chart.width = 300
-        
-        # Dados do gráfico
-        projetos_nomes = df_filtered_projetos['Projeto'].tolist()[:10]  # Máximo 10 projetos
-        projetos_valores = df_filtered_projetos['Custo Fluxo'].tolist()[:10]
-        
-        chart.data = [projetos_valores]
-        chart.categoryAxis.categoryNames = [nome[:15] + "..." if len(nome) > 15 else nome for nome in projetos_nomes]
-        chart.categoryAxis.labels.angle = 45
-        chart.categoryAxis.labels.fontSize = 8
-        chart.valueAxis.valueMin = 0
-        chart.valueAxis.valueMax = max(projetos_valores) * 1.1
-        
-        # Cores
-        chart.bars[0].fillColor = colors.HexColor('#00497A')
-        chart.bars[0].strokeColor = colors.HexColor('#00497A')
-        
-        drawing.add(chart)
-        story.append(drawing)
-        story.append(Spacer(1, 30))
-    
-    # Tabela da Sheet2 (Despesas Fixas)
-    if not df_sheet2.empty:
-        story.append(PageBreak())
-        story.append(Paragraph("⛽ Despesas Fixas Detalhadas", section_style))
-        
-        sheet2_data = [['Projeto', 'Tipologia', 'Custo Fluxo', 'Ago/25', 'Set/25', 'Out/25']]
-        
-        for _, row in df_sheet2.iterrows():
-            sheet2_data.append([
-                str(row.get('Projeto', ''))[:20],
-                str(row.get('Tipologia', ''))[:15],
-                format_currency_br(row.get('Custo Fluxo', 0), False),
-                format_currency_br(row.get('ago/25', 0), False),
-                format_currency_br(row.get('set/25', 0), False),
-                format_currency_br(row.get('out/25', 0), False)
-            ])
-        
-        sheet2_table = Table(sheet2_data, repeatRows=1)
-        sheet2_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#70AD47')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgreen])
-        ]))
-        
-        story.append(sheet2_table)
-    
-    # Rodapé com informações adicionais
-    story.append(PageBreak())
-    story.append(Paragraph("📝 Observações e Considerações", section_style))
-    
-    observacoes_text = """
-    <b>Considerações do fluxo financeiro:</b><br/>
-    1. Pedras com permuta<br/>
-    2. Tubos com permutas<br/>
-    3. Asfalto com permutas<br/>
-    4. Parcelamentos dos terceiros de acordo com os contratos<br/>
-    5. O Percentual incorrido é do fluxo, e não do orçamento meta<br/>
-    6. Incluído o Diesel no fluxo (Rateado)<br/>
-    7. Incluída a operação da Mecânica no fluxo (Rateado)<br/><br/>
-    
-    <b>Não considerado no fluxo:</b><br/>
-    8. Mão de obra da Abecker<br/>
-    9. Equipamentos
-    """
-    
-    story.append(Paragraph(observacoes_text, styles['Normal']))
-    
-    # Informações de geração do relatório
-    story.append(Spacer(1, 30))
-    footer_text = f"<i>Relatório gerado em {pd.Timestamp.now().strftime('%d/%m/%Y às %H:%M')}</i>"
-    story.append(Paragraph(footer_text, styles['Italic']))
-    
-    # Construir PDF
-    doc.build(story)
-    
-    buffer.seek(0)
-    return buffer
-
 # Interface para exportação de PDF - Dashboard Completo
-st.markdown("### 📁 Exportar Relatório PDF")    
+st.markdown("### 📁 Exportar Relatório")
 
 if REPORTLAB_AVAILABLE:
     col_pdf, col_info = st.columns([2, 1])
     
+    with col_info:
+        pdf_profile = st.selectbox(
+            "Perfil de saída",
+            options=list(OUTPUT_PROFILES),
+            format_func=lambda nome: OUTPUT_PROFILES[nome]["label"],
+            help="Tela: padrão | Impressão: gráficos em alta resolução | E-mail: arquivo menor (JPEG)",
+        )
+    
     with col_pdf:
         if st.button("📄 Gerar Relatório PDF", help="Relatório completo do dashboard", type="primary"):
             try:
                 with st.spinner("Gerando relatório PDF..."):
-                    pdf_buffer = create_complete_dashboard_pdf()
+                    perf.lap("exportacao")
+                    inicio_pdf = time.perf_counter()
+                    with track_export("pdf"):
+                        # Seções vêm do cache compartilhado (obras.cache); a data de geração é sempre a de agora
+                        pdf_buffer = create_complete_dashboard_pdf(view, df_sheet2, profile=pdf_profile)
+                    perf.lap("pdf")
+                    tempo_pdf = time.perf_counter() - inicio_pdf
                     
                     st.download_button(
                         label="⬇️ Download Relatório PDF",
@@ -892,11 +481,38 @@ if REPORTLAB_AVAILABLE:
                         mime="application/pdf",
                         key="pdf_report"
                     )
-                    st.success("✅ Relatório PDF gerado com sucesso!")
+                    tamanho_pdf = len(pdf_buffer.getvalue()) / 1024
+                    st.success(f"✅ Relatório PDF gerado com sucesso! ({tamanho_pdf:,.0f} KB em {tempo_pdf:.1f}s)".replace(",", "."))
             except Exception as e:
                 st.error(f"❌ Erro ao gerar PDF: {str(e)}")
-    
-    st.markdown("---")
+
+# Planilha Excel com a tabela filtrada, a Sheet2, os KPIs e gráficos nativos
+if XLSXWRITER_AVAILABLE:
+    if st.button("📊 Gerar Planilha Excel", help="Obras filtradas, despesas fixas e resumo com gráficos (.xlsx)"):
+        try:
+            perf.lap("exportacao")
+            inicio_excel = time.perf_counter()
+            with track_export("excel"):
+                excel_buffer = create_excel_export(view, df_sheet2)
+            perf.lap("excel")
+            tempo_excel = time.perf_counter() - inicio_excel
+
+            st.download_button(
+                label="⬇️ Download Planilha Excel",
+                data=excel_buffer.getvalue(),
+                file_name=f"dashboard_obras_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="excel_export"
+            )
+            tamanho_excel = len(excel_buffer.getvalue()) / 1024
+            st.success(f"✅ Planilha gerada! ({tamanho_excel:,.0f} KB em {tempo_excel:.2f}s)".replace(",", "."))
+        except Exception as e:
+            st.error(f"❌ Erro ao gerar planilha: {str(e)}")
+else:
+    st.info("Instale o XlsxWriter para exportar em Excel: pip install xlsxwriter")
+
+st.markdown("---")
+perf.lap("exportacao")
 
 # KPIs principais com formatação condicional
 kpi1, kpi2, kpi3, kpi4 = st.columns(4)
@@ -924,6 +540,7 @@ kpi_ct4.metric("🗓️ Custo Out/25", format_currency_br(custo_out_25, show_cen
 kpi_ct5.metric(
     "💸 Valor Restante a Pagar (Média)", format_currency_br(valor_restante_pagar_media, show_cents)
 )
+perf.lap("metricas")
 
 st.markdown("---")
 
@@ -933,11 +550,7 @@ col_saldo, col_tipologia = st.columns(2)
 with col_tipologia:
     st.subheader("📊 Obras por Tipologia")
     if not df_filtered_projetos.empty:
-        tipologia_counts = (
-            df_filtered_projetos.groupby("Tipologia")
-            .agg({"Projeto": "count", "Lotes": "sum"})
-            .reset_index()
-        )
+        tipologia_counts = aggregates["tipologia"][["Tipologia", "obras", "lotes"]]
         tipologia_counts.columns = ["Tipologia", "Número de Obras", "Total de Lotes"]
 
         fig_tipologia = px.pie(
@@ -951,7 +564,7 @@ with col_tipologia:
         fig_tipologia.update_traces(
             hovertemplate="<b>%{label}</b><br>Obras: %{value}<br>Lotes: %{customdata[0]}<extra></extra>"
         )
-        st.plotly_chart(fig_tipologia, use_container_width=True)
+        plot(fig_tipologia, "tipologia")
     else:
         st.info("Nenhuma obra selecionada para exibir tipologia.")
 
@@ -972,7 +585,7 @@ with col_saldo:
                 height=400,
                 color_discrete_sequence=px.colors.sequential.RdBu,
             )
-            st.plotly_chart(grafico2, use_container_width=True)
+            plot(grafico2, "saldo")
         else:
             st.info("Não há dados de Saldo para exibir no gráfico de pizza para os filtros selecionados.")
     else:
@@ -998,7 +611,7 @@ if not df_filtered_projetos.empty:
     grafico1.update_traces(
         hovertemplate="<b>%{x}</b><br>Custo: R$ %{y:,.2f}<br>Lotes: %{customdata[0]}<extra></extra>"
     )
-    st.plotly_chart(grafico1, use_container_width=True)
+    plot(grafico1, "custo_fluxo")
 else:
     st.info("Nenhuma obra selecionada para exibir custo fluxo.")
 
@@ -1024,29 +637,50 @@ if not df_filtered_projetos.empty:
         )
         grafico3.update_yaxes(autorange="reversed")
         grafico3.update_xaxes(range=["2024-01-01", gantt_data["Fim Obra"].max()])
-        st.plotly_chart(grafico3, use_container_width=True)
+        plot(grafico3, "cronograma")
     else:
         st.info("Não há dados de cronograma para as obras selecionadas.")
 else:
     st.info("Nenhuma obra selecionada para exibir cronograma.")
 
+# --- Curva de carga: obras, lotes e custo mensal ativos em cada mês ---
+st.subheader("📈 Carga da Carteira ao Longo do Tempo")
+df_carga = load_workload(load_data_version(), chave_filtro, df_filtered_projetos, view.get("centavos_projetos"))
+if not df_carga.empty:
+    grafico_carga = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        specs=[[{"secondary_y": True}], [{}]],
+        subplot_titles=("Obras e lotes ativos", "Custo mensal comprometido"),
+    )
+    grafico_carga.add_trace(
+        go.Scatter(x=df_carga["Mês"], y=df_carga["Obras ativas"], name="Obras ativas", line=dict(color=COLORS["primary"])),
+        row=1, col=1,
+    )
+    grafico_carga.add_trace(
+        go.Scatter(x=df_carga["Mês"], y=df_carga["Lotes ativos"], name="Lotes ativos", line=dict(color=COLORS["support3"])),
+        row=1, col=1, secondary_y=True,
+    )
+    grafico_carga.add_trace(
+        go.Bar(x=df_carga["Mês"], y=df_carga["Custo mensal comprometido"], name="Custo mensal", marker_color=COLORS["support1"],
+               hovertemplate="%{x|%m/%Y}<br>R$ %{y:,.2f}<extra></extra>"),
+        row=2, col=1,
+    )
+    grafico_carga.update_layout(height=600, hovermode="x unified")
+    plot(grafico_carga, "carga")
+    pico = df_carga.loc[df_carga["Lotes ativos"].idxmax()]
+    lotes_pico = f"{pico['Lotes ativos']:,.0f}".replace(",", ".")
+    st.caption(
+        f"Pico de lotes ativos em {pico['Mês']:%m/%Y}: {lotes_pico} lotes em {pico['Obras ativas']} obras "
+        "(demanda de equipamentos, diesel e mecânica). O custo de cada obra é o Custo Fluxo distribuído pelos meses da obra."
+    )
+else:
+    st.info("Não há datas de início e fim para montar a curva de carga.")
+
 st.markdown("---")
 
 # --- Visualizações da Sheet 2 ---
 st.subheader("📊 Despesas Recorrentes Detalhadas (Diesel e Mecânica)")
 
-# Certificar-se de que as colunas numéricas estão no formato correto
-numeric_cols_sheet2 = [
-    "Custo Fluxo",
-    "ago/25",
-    "set/25",
-    "out/25",
-    "Média dos Próximos Meses",
-]
-for col in numeric_cols_sheet2:
-    if col in df_sheet2.columns:
-        df_sheet2[col] = pd.to_numeric(df_sheet2[col], errors="coerce").fillna(0)
-
 # Gráfico de pizza para Custo Fluxo por Tipologia (Sheet 2) - Segmentado por lotes
 st.write("**Custo Fluxo por Tipo de Despesa (Segmentado por Lotes):**")
 
@@ -1071,18 +705,12 @@ if not df_sheet2.empty and not df_filtered_projetos.empty:
         diesel_data = df_sheet2[df_sheet2["Tipologia"].str.contains("Diesel", na=False)]
         if not diesel_data.empty:
             diesel_total = diesel_data["Custo Fluxo"].iloc[0]
-            diesel_por_empreendimento = []
-            for _, emp in empreendimentos_lotes.iterrows():
-                proporcao = emp["Lotes"] / total_lotes_filtered
-                diesel_por_empreendimento.append(
-                    {
-                        "Empreendimento": emp["Projeto"],
-                        "Valor": diesel_total * proporcao,
-                        "Lotes": emp["Lotes"],
-                    }
-                )
-
-            df_diesel_emp = pd.DataFrame(diesel_por_empreendimento)
+            # Rateio pelos lotes em centavos: as fatias somam exatamente o total da Sheet2
+            df_diesel_emp = pd.DataFrame({
+                "Empreendimento": empreendimentos_lotes["Projeto"],
+                "Valor": to_reais(allocate(to_centavos(diesel_total), empreendimentos_lotes["Lotes"].fillna(0))),
+                "Lotes": empreendimentos_lotes["Lotes"],
+            })
 
             fig_nested_pie.add_trace(
                 go.Pie(
@@ -1100,18 +728,11 @@ if not df_sheet2.empty and not df_filtered_projetos.empty:
         mecanica_data = df_sheet2[df_sheet2["Tipologia"].str.contains("Mecanica", na=False)]
         if not mecanica_data.empty:
             mecanica_total = mecanica_data["Custo Fluxo"].iloc[0]
-            mecanica_por_empreendimento = []
-            for _, emp in empreendimentos_lotes.iterrows():
-                proporcao = emp["Lotes"] / total_lotes_filtered
-                mecanica_por_empreendimento.append(
-                    {
-                        "Empreendimento": emp["Projeto"],
-                        "Valor": mecanica_total * proporcao,
-                        "Lotes": emp["Lotes"],
-                    }
-                )
-
-            df_mecanica_emp = pd.DataFrame(mecanica_por_empreendimento)
+            df_mecanica_emp = pd.DataFrame({
+                "Empreendimento": empreendimentos_lotes["Projeto"],
+                "Valor": to_reais(allocate(to_centavos(mecanica_total), empreendimentos_lotes["Lotes"].fillna(0))),
+                "Lotes": empreendimentos_lotes["Lotes"],
+            })
 
             fig_nested_pie.add_trace(
                 go.Pie(
@@ -1126,7 +747,7 @@ if not df_sheet2.empty and not df_filtered_projetos.empty:
             )
 
         fig_nested_pie.update_layout(height=500)
-        st.plotly_chart(fig_nested_pie, use_container_width=True)
+        plot(fig_nested_pie, "despesas")
     else:
         st.info("Não há dados de lotes para segmentar as despesas por empreendimento.")
 else:
@@ -1148,14 +769,14 @@ if not df_filtered_projetos.empty:
         y="Custo Fluxo",
         color_discrete_sequence=[COLORS["support5"]],
     )
-    st.plotly_chart(grafico4, use_container_width=True)
+    plot(grafico4, "empresa")
 else:
     st.info("Nenhuma obra selecionada para exibir custo por empresa.")
 
 # --- Novo Gráfico: Obras por Cidade ---
 st.subheader("🏙️ Obras por Cidade")
 if not df_filtered_projetos.empty:
-    obras_por_cidade = df_filtered_projetos["Cidade"].value_counts().reset_index()
+    obras_por_cidade = aggregates["cidade"][["Cidade", "obras"]]
     obras_por_cidade.columns = ["Cidade", "Número de Obras"]
     grafico_cidade = px.bar(
         obras_por_cidade,
@@ -1165,7 +786,7 @@ if not df_filtered_projetos.empty:
         height=400,
         color_discrete_sequence=[COLORS["support6"]],
     )
-    st.plotly_chart(grafico_cidade, use_container_width=True)
+    plot(grafico_cidade, "cidade")
 else:
     st.info("Nenhuma obra selecionada para exibir distribuição por cidade.")
 
@@ -1202,12 +823,28 @@ if not df_filtered_projetos.empty:
         hovertemplate="<b>%{fullData.name}</b><br>Mês: %{x}<br>Valor: R$ %{y:,.2f}<extra></extra>"
     )
     
-    st.plotly_chart(fig_pagar, use_container_width=True)
+    plot(fig_pagar, "valores_mensais")
 else:
     st.warning("Nenhuma obra para exibir com os filtros selecionados.")
 
 st.markdown("---")
 
+# Colunas monetárias ficam numéricas (ordenação correta no grid); a formatação é feita no navegador
+def currency_column_config(columns, show_cents):
+    formato = "localized" if show_cents else "compact"
+    return {col: st.column_config.NumberColumn(f"{col} (R$)", format=formato) for col in columns}
+
+
+# Índice de ordenação/busca da tabela final, montado uma vez por processo
+@st.cache_resource
+def load_table_index(columns):
+    return TableIndex(load_shared_snapshot().df_projetos[list(columns)])
+
+
+def reset_table_page():
+    st.session_state["tabela_pagina"] = 1
+
+
 # --- Tabela final ---
 st.subheader("📋 Tabela Detalhada de Obras")
 
@@ -1240,9 +877,6 @@ if not df_filtered_projetos.empty:
         "Lotes",
     ]
 
-    df_display = df_filtered_projetos[all_display_columns].copy()
-
-    # Aplicar formatação de moeda às colunas financeiras
     currency_display_cols = [
         "Custo Raso Meta",
         "Custo Fluxo",
@@ -1252,23 +886,129 @@ if not df_filtered_projetos.empty:
         "Média dos Próximos Meses",
         "Saldo",
     ]
-    for col in currency_display_cols:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(lambda x: format_currency_br(x, show_cents))
 
-    st.dataframe(df_display, use_container_width=True)
+    # Busca, ordenação e paginação feitas no servidor; só a página visível vai para o navegador
+    table_index = load_table_index(tuple(all_display_columns))
+    col_busca, col_ordem, col_direcao, col_tamanho = st.columns([3, 2, 1, 1])
+    with col_busca:
+        busca = st.text_input("🔎 Buscar", placeholder="Projeto, empresa, cidade, etapa...", key="tabela_busca", on_change=reset_table_page)
+    with col_ordem:
+        ordenar_por = st.selectbox("Ordenar por", ["(ordem da planilha)"] + all_display_columns, key="tabela_ordem", on_change=reset_table_page)
+    with col_direcao:
+        decrescente = st.toggle("Decrescente", key="tabela_decrescente", on_change=reset_table_page)
+    with col_tamanho:
+        page_size = st.selectbox("Linhas por página", PAGE_SIZES, index=1, key="tabela_page_size", on_change=reset_table_page)
+
+    posicoes = table_index.positions(
+        mask=table_index.df.index.isin(df_filtered_projetos.index),
+        search=busca,
+        sort_by=None if ordenar_por == "(ordem da planilha)" else ordenar_por,
+        ascending=not decrescente,
+    )
+    n_paginas = page_count(len(posicoes), page_size)
+    if st.session_state.get("tabela_pagina", 1) > n_paginas:
+        st.session_state["tabela_pagina"] = n_paginas
+
+    col_pagina, col_total = st.columns([1, 5])
+    with col_pagina:
+        pagina = st.number_input("Página", min_value=1, max_value=n_paginas, step=1, key="tabela_pagina")
+    with col_total:
+        inicio = (pagina - 1) * page_size
+        st.caption(
+            f"Mostrando {min(inicio + 1, len(posicoes))}–{min(inicio + page_size, len(posicoes))} de "
+            f"{len(posicoes)} obras encontradas ({len(df_filtered_projetos)} no filtro) · página {pagina} de {n_paginas}"
+        )
+
+    perf.lap("tabela")
+    st.dataframe(
+        table_index.page(posicoes, pagina, page_size),
+        column_config=currency_column_config(currency_display_cols, show_cents),
+        use_container_width=True,
+    )
+    perf.lap("st.dataframe: tabela")
 else:
     st.info("Nenhuma obra selecionada para exibir na tabela detalhada.")
 
 # Tabela com os dados da Sheet 2
 st.subheader("📋 Tabela Detalhada das Despesas Fixas (Diesel e Mecânica)")
 if not df_sheet2.empty:
-    df_display_sheet2 = df_sheet2.copy()
-    for col in numeric_cols_sheet2:
-        if col in df_display_sheet2.columns:
-            df_display_sheet2[col] = df_display_sheet2[col].apply(lambda x: format_currency_br(x, show_cents))
-    st.dataframe(df_display_sheet2, use_container_width=True)
+    st.dataframe(
+        df_sheet2,
+        column_config=currency_column_config(NUMERIC_COLS_SHEET2, show_cents),
+        use_container_width=True,
+    )
 else:
     st.info("Não há dados de despesas fixas para exibir.")
+perf.lap("st.dataframe: despesas")
+
+# --- Comparação entre versões da planilha ---
+st.subheader("🕘 Histórico de Versões")
+versoes_historico = load_history().versions()
+if len(versoes_historico) >= 2:
+    nomes_versoes = [m["nome"] for m in reversed(versoes_historico)]
+    rotulos_versoes = {m["nome"]: f"{m['ingerido_em'].replace('T', ' ')} ({m['versao'][:8]})" for m in versoes_historico}
+    col_versao_a, col_versao_b = st.columns(2)
+    versao_a = col_versao_a.selectbox("Versão A (anterior)", nomes_versoes, index=1, format_func=rotulos_versoes.get)
+    versao_b = col_versao_b.selectbox("Versão B (posterior)", nomes_versoes, index=0, format_func=rotulos_versoes.get)
+    df_diff_kpis, df_diff_projetos = compare_versions(versao_a, versao_b, selected_obras, selected_cidades)
+    st.caption("KPIs e obras com o filtro atual; obras juntadas pelo ID.")
+    st.dataframe(
+        df_diff_kpis,
+        hide_index=True,
+        column_config={
+            **{col: st.column_config.NumberColumn(format="localized") for col in ["Versão A", "Versão B", "Diferença"]},
+            "Variação %": st.column_config.NumberColumn(format="%.2f%%"),
+        },
+        use_container_width=True,
+    )
+    if df_diff_projetos.empty:
+        st.info("Nenhuma obra mudou entre as duas versões.")
+    else:
+        st.dataframe(df_diff_projetos, hide_index=True, use_container_width=True)
+else:
+    st.info("O histórico guarda cada versão da planilha carregada; a comparação aparece a partir da segunda versão.")
+perf.lap("historico")
 
 st.markdown("---")
+
+# --- Métricas e painel de desempenho: rerun atual, acumulado da sessão e log JSON lines ---
+sessao_id = st.session_state.setdefault("sessao_id", uuid.uuid4().hex[:8])
+if metricas_ativas:
+    touch_session(sessao_id)
+    observe_rerun(perf.timings, time.perf_counter() - inicio_rerun)
+    if metricas_arquivo:
+        write_textfile(metricas_arquivo)
+
+if perf_ativo:
+    etapas = dict(perf.timings)
+    etapas["total"] = time.perf_counter() - inicio_rerun
+    sessao = st.session_state.setdefault("perf_sessao", {"id": sessao_id, "reruns": 0, "etapas": {}})
+    sessao["reruns"] += 1
+    accumulate(sessao["etapas"], etapas)
+
+    erro_log = None
+    try:
+        append_jsonl(PERF_LOG_PATH, {
+            "ts": pd.Timestamp.now().isoformat(timespec="milliseconds"),
+            "sessao": sessao["id"],
+            "rerun": sessao["reruns"],
+            "obras": len(selected_obras),
+            "etapas_ms": {etapa: round(tempo * 1000, 2) for etapa, tempo in etapas.items()},
+        })
+    except OSError as e:
+        erro_log = str(e)
+
+    with perf_painel:
+        st.caption(f"Sessão {sessao['id']} · rerun {sessao['reruns']} · total {etapas['total'] * 1000:,.0f} ms".replace(",", "."))
+        df_perf = pd.DataFrame({
+            "Etapa": list(etapas),
+            "Rerun (ms)": [tempo * 1000 for tempo in etapas.values()],
+            "Média por rerun (ms)": [sessao["etapas"][etapa] * 1000 / sessao["reruns"] for etapa in etapas],
+        }).sort_values("Rerun (ms)", ascending=False)
+        st.dataframe(
+            df_perf,
+            hide_index=True,
+            column_config={col: st.column_config.NumberColumn(format="%.1f") for col in ["Rerun (ms)", "Média por rerun (ms)"]},
+        )
+        if erro_log:
+            st.warning(f"Não foi possível gravar o log de desempenho: {erro_log}")
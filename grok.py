@@ -34,6 +34,11 @@ try:
 except ImportError:
     KALEIDO_AVAILABLE = False
 
+from obras.data import EXCEL_PATH, shared_snapshot
+from obras.formatting import format_currency_br, format_currency_br_array
+from obras.model import build_view, cidades_options
+from obras.policies import POLICIES
+
 st.set_page_config(page_title="Dashboard de Obras", layout="wide")
 
 # Cores da identidade visual
@@ -69,74 +74,16 @@ ADDITIONAL_COLORS = [
 ALL_GANTT_COLORS = list(COLORS.values()) + ADDITIONAL_COLORS
 
 
-# Função para formatar valores como moeda brasileira
-def format_currency_br(value, show_cents=True):
-    if pd.isna(value):
-        return "R$ 0,00"
-
-    if show_cents:
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    else:
-        # Formatação simplificada para valores gerais (sem centavos)
-        if value >= 1000000:
-            return f"R$ {value/1000000:.1f}M".replace(".", ",")
-        elif value >= 1000:
-            return f"R$ {value/1000:.0f}K"
-        else:
-            return f"R$ {value:,.0f}".replace(",", ".")
-
-
 # --- Carregamento dos dados ---
-@st.cache_data
-def load_data():
-    df = pd.read_excel("./cadastro_obras_simplificado.xlsx", sheet_name="Sheet1")
-    df_sheet2 = pd.read_excel("./cadastro_obras_simplificado.xlsx", sheet_name="Sheet2")
-
-    # Preencher valores nulos para colunas numéricas e de data
-    numeric_cols = [
-        "Custo Raso Meta",
-        "Custo Fluxo",
-        "Percentual Incorrido do Fluxo%",
-        "ago/25",
-        "set/25",
-        "out/25",
-        "Média dos Próximos Meses",
-        "Saldo",
-        "Índice Ômega",
-        "% Avanço Físico",
-        "%Avanço Financeiro",
-        "Tempo de Obra",
-        "Lotes",
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    date_cols = ["Início Obra", "Fim Obra"]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-    # Separar custos gerais (IDs 900 e 901) - Manter para compatibilidade, mas usaremos valores fixos
-    df_custos_gerais_from_excel = df[df["ID"].isin([900, 901])].copy()
-    df_projetos = df[~df["ID"].isin([900, 901])].copy()
+# Mesmo snapshot somente leitura do dashboard principal (obras.data.shared_snapshot):
+# rodando no mesmo servidor, a planilha é lida e guardada uma única vez.
+@st.cache_resource
+def load_shared_snapshot():
+    return shared_snapshot(EXCEL_PATH)
 
-    return df_projetos, df_custos_gerais_from_excel, df_sheet2
 
-
-df_projetos, df_custos_gerais_from_excel, df_sheet2 = load_data()
-
-# Despesas fixas hardcoded
-despesas_fixas = pd.DataFrame(
-    {
-        "ID": [900, 901],
-        "Projeto": ["Diesel dos Equipamentos", "Custo de Operação da Mecanica"],
-        "Custo Fluxo": [779000 * 12 / 13, 641891 * 12 / 13],  # Valores diluídos por 13 meses
-    }
-)
-
-# Concatenar despesas fixas com os custos gerais lidos do excel, se houver
-df_custos_gerais = pd.concat([df_custos_gerais_from_excel, despesas_fixas], ignore_index=True)
+snapshot = load_shared_snapshot()
+df_projetos, df_custos_gerais, df_sheet2 = snapshot
 
 st.title("📊 Dashboard de Obras")
 
@@ -178,12 +125,7 @@ with col1:
 
 with col2:
     # Filtrar cidades com base nas obras selecionadas
-    if selected_obras:
-        cidades_options_filtered_by_obra = df_projetos[
-            df_projetos["Projeto"].isin(selected_obras)
-        ]["Cidade"].dropna().unique().tolist()
-    else:
-        cidades_options_filtered_by_obra = df_projetos["Cidade"].dropna().unique().tolist()
+    cidades_options_filtered_by_obra = cidades_options(df_projetos, selected_obras)
 
     selected_cidades = st.multiselect(
         "🏙️ Cidade das Obras (Preenchido Automaticamente)",
@@ -192,42 +134,24 @@ with col2:
         help="Selecione uma ou mais cidades",
     )
 
-# Aplicar filtros
-df_filtered_projetos = df_projetos[
-    df_projetos["Projeto"].isin(selected_obras)
-    & df_projetos["Cidade"].isin(selected_cidades)
-]
+# Aplicar filtros e calcular os KPIs (rateio pelas obras iniciadas até 30/09/2025)
+view = build_view(snapshot, selected_obras, selected_cidades, policy="obras_iniciadas")
+df_filtered_projetos = view["df_filtered_projetos"]
+show_cents = view["show_cents"]
+kpis = view["kpis"]
 
-# Determinar se deve mostrar centavos (quando obra específica é selecionada)
-show_cents = len(selected_obras) == 1
-
-# --- Cálculo proporcional do custo geral executado por lote ---
-# Filtrar obras iniciadas até 30/09/2025
-from datetime import datetime
-data_limite = pd.to_datetime("2025-09-30")
-df_obras_iniciadas = df_projetos[
-    (df_projetos["Etapa"] == "3. Obras iniciadas") &
-    (pd.to_datetime(df_projetos["Início Obra"], errors="coerce") <= data_limite)
-]
+# Obras que formam a base do rateio das despesas fixas
+df_obras_iniciadas = POLICIES["obras_iniciadas"].base_projetos(df_projetos)
 
-total_lotes_geral = df_obras_iniciadas["Lotes"].sum()
-total_lotes_filtrado = df_filtered_projetos["Lotes"].sum()
-
-# Custo geral executado total
-custo_geral_exec_total = df_sheet2["Custo Fluxo"].sum()
-
-# Custo geral executado proporcional baseado nos lotes
-if total_lotes_geral > 0:
-    proporcao_lotes = total_lotes_filtrado / total_lotes_geral
-    custo_geral_exec_proporcional = custo_geral_exec_total * proporcao_lotes
-else:
-    custo_geral_exec_proporcional = 0
+proporcao_lotes = kpis["proporcao_lotes"]
+custo_geral_exec_total = kpis["custo_geral_exec_total"]
+custo_geral_exec_proporcional = kpis["custo_geral_exec_proporcional"]
 
 # --- Cálculos mensais proporcionais da Sheet2 ---
-custo_ago_geral = df_sheet2["ago/25"].sum() * proporcao_lotes
-custo_set_geral = df_sheet2["set/25"].sum() * proporcao_lotes
-custo_out_geral = df_sheet2["out/25"].sum() * proporcao_lotes
-media_proximos_geral = df_sheet2["Média dos Próximos Meses"].sum() * proporcao_lotes
+custo_ago_geral = kpis["custo_ago_geral"]
+custo_set_geral = kpis["custo_set_geral"]
+custo_out_geral = kpis["custo_out_geral"]
+media_proximos_geral = kpis["media_proximos_geral"]
 
 custo_fluxo_mec_diesel = df_sheet2["Custo Fluxo"].sum()
 
@@ -238,19 +162,19 @@ custo_media_proximos_geral_clean = df_sheet2["Média dos Próximos Meses"].sum()
 
 
 # --- KPIs de Projetos ---
-total_obras = len(df_filtered_projetos)
-investimento_exec_projetos = df_filtered_projetos["Custo Fluxo"].sum()
-media_proximos_meses_projetos = df_filtered_projetos["Média dos Próximos Meses"].sum()
-saldo_projetos = df_filtered_projetos["Saldo"].sum()
-total_lotes = df_filtered_projetos["Lotes"].sum()
+total_obras = kpis["total_obras"]
+investimento_exec_projetos = kpis["investimento_exec_projetos"]
+media_proximos_meses_projetos = kpis["media_proximos_meses_projetos"]
+saldo_projetos = kpis["saldo_projetos"]
+total_lotes = kpis["total_lotes"]
 
 # --- Novos Indicadores Solicitados ---
-custo_total_fluxo_obras = investimento_exec_projetos + custo_geral_exec_total
-custo_ago_25 = df_filtered_projetos["ago/25"].sum()
-custo_set_25 = df_filtered_projetos["set/25"].sum()
-custo_out_25 = df_filtered_projetos["out/25"].sum()
-valor_restante_pagar_media = media_proximos_meses_projetos
-saldo_total_acumulado = saldo_projetos
+custo_total_fluxo_obras = kpis["custo_total_fluxo_obras"]
+custo_ago_25 = kpis["custo_ago_25"]
+custo_set_25 = kpis["custo_set_25"]
+custo_out_25 = kpis["custo_out_25"]
+valor_restante_pagar_media = kpis["valor_restante_pagar_media"]
+saldo_total_acumulado = kpis["saldo_total_acumulado"]
 
 # --- Funcionalidade de Exportação para PDF (Movida para o topo) ---
 st.markdown("---")
@@ -662,7 +586,7 @@ def create_complete_dashboard_pdf():
     # Formatar colunas para exibição
     for col in ["Custo Fluxo", "Saldo", "Média dos Próximos Meses"]:
         if col in df_tabela.columns:
-            df_tabela[col] = df_tabela[col].apply(lambda x: format_currency_br(x, show_cents))
+            df_tabela[col] = format_currency_br_array(df_tabela[col], show_cents)
     
     for col in ["Início Obra", "Fim Obra"]:
         if col in df_tabela.columns:
@@ -699,7 +623,7 @@ def create_complete_dashboard_pdf():
     df_sheet2_display = df_sheet2.copy()
     for col in ["Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses"]:
         if col in df_sheet2_display.columns:
-            df_sheet2_display[col] = df_sheet2_display[col].apply(lambda x: format_currency_br(x, show_cents))
+            df_sheet2_display[col] = format_currency_br_array(df_sheet2_display[col], show_cents)
     
     data_sheet2 = [df_sheet2_display.columns.tolist()] + df_sheet2_display.values.tolist()
     
@@ -1069,6 +993,12 @@ else:
 
 st.markdown("---")
 
+# Colunas monetárias ficam numéricas (ordenação correta no grid); a formatação é feita no navegador
+def currency_column_config(columns, show_cents):
+    formato = "localized" if show_cents else "compact"
+    return {col: st.column_config.NumberColumn(f"{col} (R$)", format=formato) for col in columns}
+
+
 # --- Tabela final Sheet1 ---
 st.subheader("📋 Tabela Detalhada de Obras")
 
@@ -1101,9 +1031,6 @@ if not df_filtered_projetos.empty:
         "Lotes",
     ]
 
-    df_display = df_filtered_projetos[all_display_columns].copy()
-
-    # Aplicar formatação de moeda às colunas financeiras
     currency_display_cols = [
         "Custo Raso Meta",
         "Custo Fluxo",
@@ -1113,22 +1040,22 @@ if not df_filtered_projetos.empty:
         "Média dos Próximos Meses",
         "Saldo",
     ]
-    for col in currency_display_cols:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].apply(lambda x: format_currency_br(x, show_cents))
-
-    st.dataframe(df_display, use_container_width=True)
+    st.dataframe(
+        df_filtered_projetos[all_display_columns],
+        column_config=currency_column_config(currency_display_cols, show_cents),
+        use_container_width=True,
+    )
 else:
     st.info("Nenhuma obra selecionada para exibir na tabela detalhada.")
 
 # Tabela com os dados da Sheet 2
 st.subheader("📋 Tabela Detalhada das Despesas Fixas - Diesel e Mecânica")
 if not df_sheet2.empty:
-    df_display_sheet2 = df_sheet2.copy()
-    for col in ["Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses"]:
-        if col in df_display_sheet2.columns:
-            df_display_sheet2[col] = df_display_sheet2[col].apply(lambda x: format_currency_br(x, show_cents))
-    st.dataframe(df_display_sheet2, use_container_width=True)
+    st.dataframe(
+        df_sheet2,
+        column_config=currency_column_config(["Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses"], show_cents),
+        use_container_width=True,
+    )
 else:
     st.info("Não há dados de despesas fixas para exibir.")
 
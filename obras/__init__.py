@@ -0,0 +1,5 @@
+"""Núcleo compartilhado do Dashboard de Obras (dados, KPIs e relatórios).
+
+Os módulos deste pacote não dependem do Streamlit, de modo que podem ser
+usados tanto pelos dashboards quanto por ferramentas de linha de comando.
+"""
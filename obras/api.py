@@ -0,0 +1,275 @@
+"""API HTTP local (JSON) com KPIs, agregados, cronograma e curva de carga da visão filtrada.
+
+Roda à parte do Streamlit e usa o mesmo modelo do dashboard (snapshot
+somente leitura + `obras.model.build_view`). O filtro vem na query string,
+na forma canônica dos links do dashboard (`obras.filters.encode_filters`):
+a query string de um link compartilhado serve direto na API.
+
+    GET /kpis?obra=Obra%20A&obra=Obra%20B&cidade=Joinville
+    GET /agregados?sem_obra=Obra%20C&periodo=2026-01-01..2026-03-31
+    GET /cronograma?obra=Obra%20A
+    GET /carga?cidade=Joinville&tipologia=Loteamento
+    GET /versao
+
+Sem `obra` nem `sem_obra`, considera todas as obras; sem `cidade`, todas as
+cidades das obras escolhidas. `politica` escolhe a regra de rateio das
+despesas fixas (`obras.policies`, padrão "todas"). Parâmetros desconhecidos
+ou com valor inválido dão 400. Cada resposta traz um ETag formado pela
+versão dos dados e pela chave do filtro (`obras.filters.filters_key`),
+então `If-None-Match` devolve 304 sem recalcular nada, e vem compactada
+com gzip quando o cliente aceita. A planilha é lida de novo quando o
+arquivo muda.
+
+Uso:
+    python -m obras.api
+    python -m obras.api --porta 8600 --planilha cadastro_obras_simplificado.xlsx
+"""
+
+import argparse
+import gzip
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from obras.cache import SectionCache
+from obras.data import EXCEL_PATH, freeze_snapshot, load_snapshot, snapshot_version
+from obras.filters import FILTER_PARAMS, RANGE_PARAMS, FilterIndex, decode_filters, encode_filters, filters_key
+from obras.model import build_view, get_aggregates
+from obras.policies import POLICIES
+from obras.workload import workload_curve
+
+# Respostas já serializadas, por ETag
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+
+# Respostas menores que isto não compensam compactar
+GZIP_MIN_BYTES = 512
+
+PROJECT_COLUMNS = ["Custo Fluxo", "Saldo", "Lotes", "ago/25", "set/25", "out/25", "Média dos Próximos Meses"]
+
+
+class DataSource:
+    """Snapshot da planilha, sua versão e o índice dos filtros; relê quando o arquivo muda"""
+
+    def __init__(self, path=EXCEL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.snapshot = None
+        self.version = None
+        self.filter_index = None
+
+    def state(self):
+        """(snapshot, versão, índice dos filtros) atuais, sempre da mesma leitura"""
+        mtime = os.stat(self.path).st_mtime_ns
+        with self._lock:
+            if mtime != self._mtime:
+                self.snapshot = freeze_snapshot(load_snapshot(self.path))
+                self.version = snapshot_version(self.snapshot)
+                self.filter_index = FilterIndex(self.snapshot.df_projetos)
+                self._mtime = mtime
+            return self.snapshot, self.version, self.filter_index
+
+    def current(self):
+        """(snapshot, versão) atuais"""
+        return self.state()[:2]
+
+
+def _records(df):
+    """Linhas do DataFrame como dicts, com vazios como null"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _json_default(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(valor).date().isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def payload_kpis(view):
+    return {"kpis": view["kpis"]}
+
+
+def payload_agregados(view):
+    df = view["df_filtered_projetos"]
+    colunas = [col for col in PROJECT_COLUMNS if col in df.columns]
+    por_projeto = df.groupby("Projeto", sort=False)[colunas].sum().reset_index()
+    aggregates = get_aggregates(view)
+    return {
+        "projetos": _records(por_projeto),
+        "tipologia": _records(aggregates["tipologia"]),
+        "cidade": _records(aggregates["cidade"]),
+    }
+
+
+def payload_cronograma(view):
+    df = view["df_filtered_projetos"]
+    colunas = [col for col in ["Projeto", "Etapa", "Início Obra", "Fim Obra", "% Avanço Físico"] if col in df.columns]
+    return {"cronograma": _records(df[colunas])}
+
+
+def payload_carga(view):
+    return {"carga": _records(workload_curve(view["df_filtered_projetos"], view.get("centavos_projetos")))}
+
+
+ENDPOINTS = {
+    "/kpis": payload_kpis,
+    "/agregados": payload_agregados,
+    "/cronograma": payload_cronograma,
+    "/carga": payload_carga,
+}
+
+
+def filter_spec(query, todas_obras):
+    """Filtro da query string (forma canônica do dashboard, `obras.filters.decode_filters`).
+
+    Devolve (obras, cidades, política, filtros, params): cidades None são
+    todas as das obras escolhidas, `filtros` vai para `FilterIndex.mask` e
+    `params` é a forma canônica, base da chave do cache. Parâmetros
+    desconhecidos ou com valor inválido levantam ValueError.
+    """
+    params = parse_qs(query, keep_blank_values=True)
+    desconhecidos = sorted(set(params) - FILTER_PARAMS)
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(desconhecidos)}. Opções: {', '.join(sorted(FILTER_PARAMS))}")
+    politica = params.get("politica", [None])[0]
+    if politica is not None and politica not in POLICIES:
+        raise ValueError(f"Política de rateio desconhecida: {politica}. Opções: {', '.join(POLICIES)}")
+    estado = decode_filters(params)
+    # decode_filters ignora os valores que não entende; aqui eles são erro
+    filtros = estado["filtros"]
+    invalidos = [
+        nome for nome, presente in [
+            ("periodo", "periodo" in filtros),
+            *((nome, col in filtros.get("faixas", {})) for col, nome in RANGE_PARAMS.items()),
+        ]
+        if nome in params and not presente
+    ]
+    if invalidos:
+        raise ValueError(f"Valor inválido para: {', '.join(invalidos)}")
+
+    if estado["obra"] is not None:
+        obras = sorted(set(estado["obra"]) & set(todas_obras))
+    elif estado["sem_obra"] is not None:
+        obras = sorted(set(todas_obras) - set(estado["sem_obra"]))
+    else:
+        obras = sorted(todas_obras)
+    cidades = sorted(set(estado["cidades"])) if estado["cidades"] is not None else None
+    politica = estado["politica"]
+    return obras, cidades, politica, filtros, encode_filters(obras, todas_obras, cidades, politica, filtros)
+
+
+def render(source, caminho, query):
+    """(ETag, corpo JSON) do endpoint para o filtro da query string"""
+    snapshot, versao, filter_index = source.state()
+    todas_obras = snapshot.df_projetos["Projeto"].dropna().unique().tolist()
+    obras, cidades, politica, filtros, params = filter_spec(query, todas_obras)
+    etag = f'"{versao}-{caminho.strip("/")}-{filters_key(params)[:16]}"'
+    return etag, lambda: _compute(snapshot, versao, caminho, obras, cidades, politica, filter_index.mask(**filtros), params)
+
+
+def _compute(snapshot, versao, caminho, obras, cidades, politica, mask, params):
+    view = build_view(snapshot, obras, cidades, policy=politica, mask=mask)
+    corpo = ENDPOINTS[caminho](view)
+    corpo["versao"] = versao
+    corpo["filtro"] = {
+        "obras": view["selected_obras"], "cidades": view["selected_cidades"], "politica": politica, "parametros": params,
+    }
+    return json.dumps(corpo, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    source = None
+    cache = None
+
+    def _send(self, status, corpo=b"", etag=None):
+        gz = len(corpo) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gz:
+            chave = f"{etag}:gzip"
+            compactado = self.cache.get(chave) if etag else None
+            if compactado is None:
+                compactado = gzip.compress(corpo, compresslevel=6)
+                if etag:
+                    self.cache.put(chave, compactado)
+            corpo = compactado
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            if gz:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(corpo)
+
+    def _erro(self, status, mensagem):
+        self._send(status, json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        caminho = url.path.rstrip("/") or "/"
+        try:
+            if caminho == "/versao":
+                _, versao = self.source.current()
+                self._send(200, json.dumps({"versao": versao}).encode("utf-8"))
+                return
+            if caminho not in ENDPOINTS:
+                self._erro(404, f"Endpoint desconhecido: {caminho}")
+                return
+            etag, calcular = render(self.source, caminho, url.query)
+            if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+                self._send(304, etag=etag)
+                return
+            corpo = self.cache.get(etag)
+            if corpo is None:
+                corpo = calcular()
+                self.cache.put(etag, corpo)
+            self._send(200, corpo, etag)
+        except ValueError as e:
+            self._erro(400, str(e))
+        except OSError as e:
+            self._erro(503, f"Planilha indisponível: {e}")
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(host, porta, source, cache=None):
+    handler = type("ObrasApiHandler", (ApiHandler,), {
+        "source": source,
+        "cache": cache if cache is not None else SectionCache(RESPONSE_CACHE_BYTES),
+    })
+    return ThreadingHTTPServer((host, porta), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON local com KPIs, agregados e cronograma.")
+    parser.add_argument("--planilha", default=EXCEL_PATH, help="Caminho da planilha de obras")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8600)
+    args = parser.parse_args(argv)
+
+    source = DataSource(args.planilha)
+    source.current()
+    server = make_server(args.host, args.porta, source)
+    print(f"API de obras em http://{args.host}:{args.porta} (versão dos dados {source.version})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
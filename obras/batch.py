@@ -0,0 +1,108 @@
+"""Geração em lote dos relatórios PDF por obra.
+
+Lê a planilha uma única vez e gera, em processos paralelos, o relatório
+completo de cada obra (modo com centavos, como quando uma única obra é
+selecionada no dashboard).
+
+Uso:
+    python -m obras.batch --saida relatorios/
+    python -m obras.batch --obras "Obra A" "Obra B" --workers 4
+    python -m obras.batch --perfil email
+"""
+
+import argparse
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from obras.data import EXCEL_PATH, load_snapshot
+from obras.model import build_view
+from obras.reports import DEFAULT_PROFILE, OUTPUT_PROFILES, create_complete_dashboard_pdf
+
+# Snapshot compartilhado pelos workers (recebido uma vez no initializer)
+_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _snapshot
+    _snapshot = snapshot
+
+
+def _slug(nome):
+    nome = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^A-Za-z0-9]+", "_", nome).strip("_").lower() or "obra"
+
+
+def _build_report(obra, output_dir, profile):
+    """Gera o relatório de uma obra no worker e grava o arquivo em disco"""
+    inicio = time.perf_counter()
+    view = build_view(_snapshot, [obra])
+    pdf_buffer = create_complete_dashboard_pdf(view, _snapshot.df_sheet2, profile=profile)
+    path = os.path.join(output_dir, f"relatorio_{_slug(obra)}.pdf")
+    with open(path, "wb") as f:
+        f.write(pdf_buffer.getvalue())
+    return obra, path, os.path.getsize(path), time.perf_counter() - inicio
+
+
+def run_batch(snapshot, obras, output_dir, workers=None, profile=DEFAULT_PROFILE):
+    """Gera os relatórios das obras informadas e retorna a lista de resultados"""
+    os.makedirs(output_dir, exist_ok=True)
+    resultados = []
+    erros = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot,)) as executor:
+        futures = {executor.submit(_build_report, obra, output_dir, profile): obra for obra in obras}
+        for future in as_completed(futures):
+            obra = futures[future]
+            try:
+                resultados.append(future.result())
+            except Exception as e:
+                erros.append((obra, e))
+                print(f"❌ {obra}: {e}")
+            else:
+                print(f"✅ {obra} ({resultados[-1][3]:.2f}s)")
+    return resultados, erros
+
+
+def print_summary(resultados, erros, elapsed, workers):
+    total_bytes = sum(r[2] for r in resultados)
+    tempo_medio = sum(r[3] for r in resultados) / len(resultados) if resultados else 0
+    print()
+    print("Resumo da geração em lote")
+    print(f"  Relatórios gerados:  {len(resultados)}")
+    print(f"  Falhas:              {len(erros)}")
+    print(f"  Workers:             {workers}")
+    print(f"  Tempo total:         {elapsed:.2f}s")
+    print(f"  Vazão:               {len(resultados) / elapsed if elapsed > 0 else 0:.2f} relatórios/s")
+    print(f"  Tempo médio/obra:    {tempo_medio:.2f}s (dentro do worker)")
+    print(f"  Tamanho total:       {total_bytes / 1024 / 1024:.2f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o relatório PDF de cada obra em paralelo.")
+    parser.add_argument("--planilha", default=EXCEL_PATH, help="Caminho da planilha de obras")
+    parser.add_argument("--obras", nargs="+", help="Obras a gerar (padrão: todas)")
+    parser.add_argument("--saida", default="relatorios", help="Diretório de saída dos PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Número de processos")
+    parser.add_argument("--perfil", choices=list(OUTPUT_PROFILES), default=DEFAULT_PROFILE, help="Perfil de saída do PDF")
+    args = parser.parse_args(argv)
+
+    snapshot = load_snapshot(args.planilha)
+    todas_obras = snapshot.df_projetos["Projeto"].dropna().unique().tolist()
+    if args.obras:
+        desconhecidas = [obra for obra in args.obras if obra not in todas_obras]
+        if desconhecidas:
+            parser.error(f"Obras não encontradas na planilha: {', '.join(desconhecidas)}")
+        obras = args.obras
+    else:
+        obras = todas_obras
+
+    inicio = time.perf_counter()
+    resultados, erros = run_batch(snapshot, obras, args.saida, args.workers, args.perfil)
+    print_summary(resultados, erros, time.perf_counter() - inicio, args.workers)
+    return 1 if erros else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
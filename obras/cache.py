@@ -0,0 +1,87 @@
+"""Cache das seções já renderizadas dos relatórios.
+
+Cada seção de um relatório depende só de parte dos filtros (a de despesas
+recorrentes, por exemplo, só da Sheet2). As seções renderizadas são
+guardadas em bytes, com a chave formada pelo hash das entradas da seção,
+e uma nova exportação só renderiza de novo as seções cujas entradas mudaram.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Limite padrão do cache (soma dos bytes guardados)
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+def hash_inputs(*parts):
+    """Hash estável das entradas de uma seção (DataFrames, Series e valores simples)"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            h.update(repr(list(part.columns)).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, pd.Series):
+            h.update(repr(part.name).encode())
+            h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class SectionCache:
+    """Cache LRU de seções renderizadas, limitado pelo total de bytes guardados.
+
+    Compartilhado entre as sessões do Streamlit (mesmo processo), por isso
+    protegido por lock. `hits` e `misses` contam os acessos desde a criação.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            antigo = self._entries.pop(key, None)
+            if antigo is not None:
+                self._size -= len(antigo)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, removido = self._entries.popitem(last=False)
+                self._size -= len(removido)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+
+# Cache padrão do processo, usado pelos geradores de relatório
+REPORT_CACHE = SectionCache()
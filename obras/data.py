@@ -0,0 +1,169 @@
+"""Leitura da planilha de obras e montagem do snapshot de dados."""
+
+import os
+import threading
+import weakref
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from obras.cache import hash_inputs
+from obras.money import centavos_frame, share, to_centavos, to_reais
+
+EXCEL_PATH = "./cadastro_obras_simplificado.xlsx"
+
+# IDs reservados para os custos gerais na Sheet1
+CUSTOS_GERAIS_IDS = [900, 901]
+
+NUMERIC_COLS = [
+    "Custo Raso Meta",
+    "Custo Fluxo",
+    "Percentual Incorrido do Fluxo%",
+    "ago/25",
+    "set/25",
+    "out/25",
+    "Média dos Próximos Meses",
+    "Saldo",
+    "Índice Ômega",
+    "% Avanço Físico",
+    "%Avanço Financeiro",
+    "Tempo de Obra",
+    "Lotes",
+]
+
+NUMERIC_COLS_SHEET2 = [
+    "Custo Fluxo",
+    "ago/25",
+    "set/25",
+    "out/25",
+    "Média dos Próximos Meses",
+]
+
+# Colunas em reais: arredondadas ao centavo na leitura (os cálculos somam a cópia em centavos, money_centavos)
+MONEY_COLS = ["Custo Raso Meta", "Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses", "Saldo"]
+
+DATE_COLS = ["Início Obra", "Fim Obra"]
+
+# Despesas fixas anuais (12 meses) diluídas em 13 parcelas mensais
+DESPESAS_FIXAS = {"Diesel dos Equipamentos": 779000, "Custo de Operação da Mecanica": 641891}
+PARCELAS_DESPESAS_FIXAS = 13
+
+# Dados já carregados e tratados, prontos para filtros e relatórios
+Snapshot = namedtuple("Snapshot", ["df_projetos", "df_custos_gerais", "df_sheet2"])
+
+# Snapshots somente leitura do processo, por planilha (shared_snapshot)
+_SHARED_SNAPSHOTS = {}
+_SHARED_LOCK = threading.Lock()
+
+# Cópias em centavos das colunas em reais, por snapshot (money_centavos)
+_CENTAVOS = {}
+_CENTAVOS_LOCK = threading.Lock()
+
+
+def read_workbook(path=EXCEL_PATH):
+    """Lê a planilha e retorna (df_projetos, df_custos_gerais_from_excel, df_sheet2)"""
+    df = pd.read_excel(path, sheet_name="Sheet1")
+    df_sheet2 = pd.read_excel(path, sheet_name="Sheet2")
+
+    # Preencher valores nulos para colunas numéricas e de data
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    for col in DATE_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    for col in NUMERIC_COLS_SHEET2:
+        if col in df_sheet2.columns:
+            df_sheet2[col] = pd.to_numeric(df_sheet2[col], errors="coerce").fillna(0)
+
+    # Reais com exatamente duas casas: a soma em centavos bate com a do financeiro
+    for frame, colunas in ((df, MONEY_COLS), (df_sheet2, NUMERIC_COLS_SHEET2)):
+        for col in colunas:
+            if col in frame.columns:
+                frame[col] = to_reais(to_centavos(frame[col]))
+
+    # Separar custos gerais (IDs 900 e 901) - Manter para compatibilidade, mas usaremos valores fixos
+    df_custos_gerais_from_excel = df[df["ID"].isin(CUSTOS_GERAIS_IDS)].copy()
+    df_projetos = df[~df["ID"].isin(CUSTOS_GERAIS_IDS)].copy()
+
+    return df_projetos, df_custos_gerais_from_excel, df_sheet2
+
+
+def build_custos_gerais(df_custos_gerais_from_excel):
+    """Concatena as despesas fixas (diesel e mecânica) aos custos gerais lidos do Excel"""
+    despesas_fixas = pd.DataFrame(
+        {
+            "ID": CUSTOS_GERAIS_IDS,
+            "Projeto": list(DESPESAS_FIXAS),
+            # Valores diluídos por 13 meses: a parcela do mês, arredondada ao centavo
+            "Custo Fluxo": [
+                to_reais(share(to_centavos(anual * 12), 1, PARCELAS_DESPESAS_FIXAS))
+                for anual in DESPESAS_FIXAS.values()
+            ],
+        }
+    )
+    return pd.concat([df_custos_gerais_from_excel, despesas_fixas], ignore_index=True)
+
+
+def _read_only(serie):
+    """Série sobre o mesmo array, marcado como somente leitura (colunas numéricas e de data)"""
+    if not isinstance(serie.dtype, np.dtype):
+        return serie
+    valores = serie.to_numpy()
+    valores.flags.writeable = False
+    return pd.Series(valores, index=serie.index, name=serie.name, copy=False)
+
+
+def freeze_frame(df):
+    """DataFrame com os arrays somente leitura: escrever nos valores (loc/iloc) gera erro"""
+    return pd.DataFrame({col: _read_only(df[col]) for col in df.columns}, copy=False)
+
+
+def freeze_snapshot(snapshot):
+    """Snapshot imutável, para ser compartilhado entre sessões sem cópias"""
+    return Snapshot(*(freeze_frame(df) for df in snapshot))
+
+
+def snapshot_version(snapshot):
+    """Versão dos dados: hash curto do conteúdo do snapshot"""
+    return hash_inputs(*snapshot)[:16]
+
+
+def money_centavos(snapshot):
+    """Snapshot só com as colunas de MONEY_COLS, em centavos int64 e somente leitura.
+
+    Calculado uma vez por snapshot (enquanto ele existir) e alinhado às
+    linhas dele: os cálculos recortam as linhas filtradas e somam inteiros,
+    sem converter os reais a cada visão.
+    """
+    chave = tuple(id(df) for df in snapshot)
+    with _CENTAVOS_LOCK:
+        centavos = _CENTAVOS.get(chave)
+        if centavos is None:
+            centavos = freeze_snapshot(Snapshot(*(centavos_frame(df, MONEY_COLS) for df in snapshot)))
+            _CENTAVOS[chave] = centavos
+            for df in snapshot:
+                weakref.finalize(df, _CENTAVOS.pop, chave, None)
+        return centavos
+
+
+def load_snapshot(path=EXCEL_PATH):
+    """Lê a planilha uma única vez e monta o Snapshot usado pelos relatórios"""
+    df_projetos, df_custos_gerais_from_excel, df_sheet2 = read_workbook(path)
+    return Snapshot(df_projetos, build_custos_gerais(df_custos_gerais_from_excel), df_sheet2)
+
+
+def shared_snapshot(path=EXCEL_PATH):
+    """Snapshot somente leitura da planilha, lido uma vez por processo.
+
+    Todos os dashboards que rodam no mesmo servidor Streamlit (e a API)
+    recebem o mesmo objeto, em vez de cada um ler e guardar sua cópia.
+    """
+    chave = os.path.abspath(path)
+    with _SHARED_LOCK:
+        if chave not in _SHARED_SNAPSHOTS:
+            _SHARED_SNAPSHOTS[chave] = freeze_snapshot(load_snapshot(path))
+        return _SHARED_SNAPSHOTS[chave]
@@ -0,0 +1,225 @@
+"""Exportação da visão filtrada para Excel (.xlsx) com gráficos nativos.
+
+A planilha é escrita em modo `constant_memory` do xlsxwriter: cada linha
+vai para o disco assim que a próxima começa, então a memória não cresce com
+o número de obras. Os gráficos são gráficos do próprio Excel, apontando
+para as tabelas de agregados da aba "Resumo" e para a aba "Obras".
+"""
+
+from io import BytesIO
+
+import pandas as pd
+
+from obras.model import get_aggregates
+from obras.timing import SectionTimer
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+EXCEL_COLUMNS = [
+    "ID", "Empresa desenvolvedora", "Sócia", "Projeto", "Tipologia", "Cidade", "UF", "Etapa",
+    "Custo Raso Meta", "Custo Fluxo", "Percentual Incorrido do Fluxo%", "ago/25", "set/25", "out/25",
+    "Média dos Próximos Meses", "Saldo", "Índice Ômega", "% Avanço Físico", "%Avanço Financeiro",
+    "Tempo de Obra", "Início Obra", "Fim Obra", "Meses Restantes Pós Out/25", "Lotes"
+]
+CURRENCY_COLUMNS = ["Custo Raso Meta", "Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses", "Saldo"]
+DATE_COLUMNS = ["Início Obra", "Fim Obra"]
+
+FORMATO_MOEDA = '"R$" #,##0.00'
+FORMATO_DATA = "dd/mm/yyyy"
+
+# Gráfico de custo por projeto só até este número de obras (acima disso fica ilegível)
+MAX_PROJETOS_GRAFICO = 60
+
+
+def _column_values(serie):
+    """Valores da coluna como objetos Python e o método do worksheet que os escreve"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        valores = [None if pd.isna(v) else v for v in serie.dt.to_pydatetime()]
+        return valores, "write_datetime"
+    if pd.api.types.is_numeric_dtype(serie):
+        valores = serie.astype(float).to_numpy()
+        return [None if v != v else v for v in valores.tolist()], "write_number"
+    return [None if pd.isna(v) else str(v) for v in serie.tolist()], "write_string"
+
+
+def _write_table(worksheet, first_row, df, formats, header_format):
+    """Escreve cabeçalho e linhas em ordem (exigência do modo constant_memory)
+
+    Cada coluna usa o método de escrita do seu tipo e o formato de `formats`
+    (as células vazias ficam em branco). Devolve a última linha escrita.
+    """
+    worksheet.write_row(first_row, 0, list(df.columns), header_format)
+    colunas = []
+    writers = []
+    formatos = []
+    for col_idx, col in enumerate(df.columns):
+        valores, metodo = _column_values(df[col])
+        colunas.append(valores)
+        writers.append(getattr(worksheet, metodo))
+        formatos.append(formats.get(col))
+        if col in formats:
+            worksheet.set_column(col_idx, col_idx, 16)
+    celulas = list(enumerate(zip(writers, formatos)))
+    for linha, valores in enumerate(zip(*colunas), start=first_row + 1):
+        for col_idx, (escrever, formato) in celulas:
+            valor = valores[col_idx]
+            if valor is not None:
+                escrever(linha, col_idx, valor, formato)
+    return first_row + len(df)
+
+
+def create_excel_export(view, df_sheet2, timings=None):
+    """Gera o .xlsx da visão filtrada: resumo com KPIs e gráficos, obras e despesas fixas
+
+    `view` é o resultado de `obras.model.build_view`. Se `timings` for um dict,
+    recebe o tempo gasto em cada etapa.
+    """
+    if not XLSXWRITER_AVAILABLE:
+        raise RuntimeError("XlsxWriter não está instalado.")
+
+    df_filtered_projetos = view["df_filtered_projetos"]
+    kpis = view["kpis"]
+    aggregates = get_aggregates(view)
+    timer = SectionTimer(timings)
+
+    buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True, "nan_inf_to_errors": True})
+    titulo = workbook.add_format({"bold": True, "font_size": 14, "font_color": "#00497A"})
+    cabecalho = workbook.add_format({"bold": True, "bg_color": "#00497A", "font_color": "white", "border": 1})
+    moeda = workbook.add_format({"num_format": FORMATO_MOEDA})
+    data = workbook.add_format({"num_format": FORMATO_DATA})
+    percentual = workbook.add_format({"num_format": "0.0%"})
+    inteiro = workbook.add_format({"num_format": "#,##0"})
+
+    # As abas são criadas antes para os gráficos do resumo poderem apontar para "Obras"
+    ws_resumo = workbook.add_worksheet("Resumo")
+    ws_obras = workbook.add_worksheet("Obras")
+    ws_sheet2 = workbook.add_worksheet("Despesas Fixas")
+    timer.lap("setup")
+
+    # === RESUMO: filtros, KPIs e agregados ===
+    ws_resumo.set_column(0, 0, 42)
+    ws_resumo.set_column(1, 3, 18)
+    ws_resumo.write(0, 0, "Relatório de Obras", titulo)
+    ws_resumo.write(1, 0, f"Gerado em {pd.Timestamp.now().strftime('%d/%m/%Y às %H:%M')}")
+    ws_resumo.write(2, 0, "Obras selecionadas")
+    ws_resumo.write(2, 1, ", ".join(view["selected_obras"]))
+    ws_resumo.write(3, 0, "Cidades selecionadas")
+    ws_resumo.write(3, 1, ", ".join(view["selected_cidades"]))
+
+    linhas_kpis = [
+        ("Total de Obras", kpis["total_obras"], inteiro),
+        ("Custo Fluxo Projetos", kpis["investimento_exec_projetos"], moeda),
+        ("Média Próximos Meses (Projetos)", kpis["media_proximos_meses_projetos"], moeda),
+        ("Saldo Projetos", kpis["saldo_projetos"], moeda),
+        ("Total de Lotes", kpis["total_lotes"], inteiro),
+        ("Proporção de Lotes", kpis["proporcao_lotes"], percentual),
+        ("Custo Geral Exec. (Fixas - Proporcional)", kpis["custo_geral_exec_proporcional"], moeda),
+        ("Custo Total do Fluxo (Geral)", kpis["custo_total_fluxo_obras"], moeda),
+        ("Custo Ago/25", kpis["custo_ago_25"], moeda),
+        ("Custo Set/25", kpis["custo_set_25"], moeda),
+        ("Custo Out/25", kpis["custo_out_25"], moeda),
+        ("Valor Restante a Pagar (Média)", kpis["valor_restante_pagar_media"], moeda),
+    ]
+    linha = 5
+    ws_resumo.write_row(linha, 0, ["Indicador", "Valor"], cabecalho)
+    for nome, valor, formato in linhas_kpis:
+        linha += 1
+        ws_resumo.write(linha, 0, nome)
+        ws_resumo.write_number(linha, 1, float(valor), formato)
+    # Linhas dos meses na tabela de KPIs (usadas pelo gráfico de valores mensais)
+    linha_meses = linha - 3
+
+    linha += 2
+    ws_resumo.write_row(linha, 0, ["Tipologia", "Obras", "Lotes", "Custo Fluxo"], cabecalho)
+    inicio_tipologia = linha + 1
+    for tipologia, obras, lotes, custo in aggregates["tipologia"].itertuples(index=False, name=None):
+        linha += 1
+        ws_resumo.write_row(linha, 0, [tipologia, obras, lotes])
+        ws_resumo.write_number(linha, 3, float(custo), moeda)
+    fim_tipologia = linha
+
+    linha += 2
+    ws_resumo.write_row(linha, 0, ["Cidade", "Obras", "Custo Fluxo"], cabecalho)
+    inicio_cidade = linha + 1
+    for cidade, obras, custo in aggregates["cidade"].itertuples(index=False, name=None):
+        linha += 1
+        ws_resumo.write_row(linha, 0, [cidade, obras])
+        ws_resumo.write_number(linha, 2, float(custo), moeda)
+    fim_cidade = linha
+    timer.lap("resumo")
+
+    # === OBRAS (tabela filtrada) ===
+    colunas = [col for col in EXCEL_COLUMNS if col in df_filtered_projetos.columns]
+    formatos = {col: moeda for col in CURRENCY_COLUMNS}
+    formatos.update({col: data for col in DATE_COLUMNS})
+    ultima_obra = _write_table(ws_obras, 0, df_filtered_projetos[colunas], formatos, cabecalho)
+    ws_obras.freeze_panes(1, 0)
+    timer.lap("obras")
+
+    # === DESPESAS FIXAS (Sheet2) ===
+    _write_table(ws_sheet2, 0, df_sheet2, {col: moeda for col in CURRENCY_COLUMNS}, cabecalho)
+    timer.lap("despesas_fixas")
+
+    # === GRÁFICOS NATIVOS ===
+    if fim_tipologia >= inicio_tipologia:
+        grafico = workbook.add_chart({"type": "pie"})
+        grafico.add_series({
+            "name": "Obras por Tipologia",
+            "categories": ["Resumo", inicio_tipologia, 0, fim_tipologia, 0],
+            "values": ["Resumo", inicio_tipologia, 1, fim_tipologia, 1],
+            "data_labels": {"percentage": True},
+        })
+        grafico.set_title({"name": "Distribuição por Tipologia"})
+        ws_resumo.insert_chart(1, 5, grafico)
+
+    if fim_cidade >= inicio_cidade:
+        grafico = workbook.add_chart({"type": "column"})
+        grafico.add_series({
+            "name": "Obras por Cidade",
+            "categories": ["Resumo", inicio_cidade, 0, fim_cidade, 0],
+            "values": ["Resumo", inicio_cidade, 1, fim_cidade, 1],
+            "fill": {"color": "#008DDE"},
+        })
+        grafico.set_title({"name": "Distribuição por Cidade"})
+        grafico.set_legend({"none": True})
+        ws_resumo.insert_chart(17, 5, grafico)
+
+    grafico = workbook.add_chart({"type": "line"})
+    grafico.add_series({
+        "name": "Valores a Pagar por Mês",
+        "categories": ["Resumo", linha_meses, 0, linha_meses + 3, 0],
+        "values": ["Resumo", linha_meses, 1, linha_meses + 3, 1],
+        "marker": {"type": "circle"},
+    })
+    grafico.set_title({"name": "Evolução dos Valores Mensais"})
+    grafico.set_y_axis({"num_format": FORMATO_MOEDA})
+    grafico.set_legend({"none": True})
+    ws_resumo.insert_chart(33, 5, grafico)
+
+    if "Custo Fluxo" in colunas and 0 < ultima_obra <= MAX_PROJETOS_GRAFICO:
+        col_projeto = colunas.index("Projeto")
+        col_custo = colunas.index("Custo Fluxo")
+        grafico = workbook.add_chart({"type": "column"})
+        grafico.add_series({
+            "name": "Custo Fluxo",
+            "categories": ["Obras", 1, col_projeto, ultima_obra, col_projeto],
+            "values": ["Obras", 1, col_custo, ultima_obra, col_custo],
+            "fill": {"color": "#00497A"},
+        })
+        grafico.set_title({"name": "Custo Fluxo por Projeto"})
+        grafico.set_y_axis({"num_format": FORMATO_MOEDA})
+        grafico.set_legend({"none": True})
+        grafico.set_size({"width": 960, "height": 400})
+        ws_resumo.insert_chart(49, 5, grafico)
+    timer.lap("graficos")
+
+    workbook.close()
+    timer.lap("build")
+
+    buffer.seek(0)
+    return buffer
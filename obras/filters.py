@@ -0,0 +1,288 @@
+"""Índices dos filtros do dashboard, montados uma vez por versão dos dados.
+
+Cada filtro é respondido por um índice sobre as linhas de todas as obras e
+devolve uma máscara booleana alinhada às posições de `df_projetos`; as
+máscaras dos filtros ativos se combinam com `&` e entram em
+`obras.model.build_view` (`mask=`), junto com os filtros de obra e cidade.
+
+`encode_filters` dá a forma canônica de todos os filtros, que é ao mesmo
+tempo a query string dos links do dashboard e a chave dos caches.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from obras.cache import hash_inputs
+from obras.policies import DEFAULT_POLICY, POLICIES
+
+# Colunas com filtro por valor, em cascata (as opções de cada uma vêm das obras que passam pelas anteriores)
+CATEGORY_COLUMNS = ["Tipologia", "Etapa", "Empresa desenvolvedora", "UF", "Sócia"]
+
+# Colunas numéricas com filtro de faixa
+RANGE_COLUMNS = ["Saldo", "Lotes", "% Avanço Físico", "Índice Ômega", "Custo Fluxo"]
+
+# Nome dos parâmetros da URL de cada coluna filtrada
+CATEGORY_PARAMS = {
+    "Tipologia": "tipologia",
+    "Etapa": "etapa",
+    "Empresa desenvolvedora": "empresa",
+    "UF": "uf",
+    "Sócia": "socia",
+}
+RANGE_PARAMS = {
+    "Saldo": "saldo",
+    "Lotes": "lotes",
+    "% Avanço Físico": "avanco",
+    "Índice Ômega": "omega",
+    "Custo Fluxo": "custo",
+}
+
+# Todos os parâmetros da forma canônica (`encode_filters`)
+FILTER_PARAMS = {
+    "obra", "sem_obra", "cidade", "politica", "periodo", "periodo_modo",
+    *RANGE_PARAMS.values(), *CATEGORY_PARAMS.values(),
+}
+
+# Como o período escolhido se relaciona com o intervalo [Início Obra, Fim Obra]
+PERIOD_MODES = {
+    "andamento": "Em andamento no período",
+    "inicio": "Iniciam no período",
+    "fim": "Terminam no período",
+}
+
+
+def _datetimes(serie):
+    return serie.to_numpy(dtype="datetime64[ns]")
+
+
+def _as_datetime64(data):
+    return np.datetime64(pd.Timestamp(data), "ns")
+
+
+def _between(ordem, valores, de=None, ate=None):
+    """Posições (de `ordem`) com `de` <= valor <= `ate`, por busca binária em `valores` ordenados.
+
+    Limites None ficam abertos.
+    """
+    primeiro = 0 if de is None else np.searchsorted(valores, de, side="left")
+    ultimo = len(valores) if ate is None else np.searchsorted(valores, ate, side="right")
+    return ordem[primeiro:ultimo]
+
+
+def _mask(size, posicoes):
+    mascara = np.zeros(size, dtype=bool)
+    mascara[posicoes] = True
+    return mascara
+
+
+class DateRangeIndex:
+    """Extremos ordenados dos intervalos [início, fim] das obras.
+
+    Cada extremo fica ordenado uma vez, com a permutação das posições; uma
+    consulta por período vira duas buscas binárias e o recorte das
+    permutações, sem varrer as colunas de data. Obras sem as duas datas
+    nunca entram no resultado.
+    """
+
+    def __init__(self, inicio, fim):
+        inicio, fim = _datetimes(inicio), _datetimes(fim)
+        self.size = len(inicio)
+        validas = np.flatnonzero(~np.isnat(inicio) & ~np.isnat(fim))
+        self._por_inicio = validas[np.argsort(inicio[validas], kind="stable")]
+        self._por_fim = validas[np.argsort(fim[validas], kind="stable")]
+        self._inicios = inicio[self._por_inicio]
+        self._fins = fim[self._por_fim]
+        self.min = pd.Timestamp(self._inicios[0]) if len(validas) else None
+        self.max = pd.Timestamp(self._fins[-1]) if len(validas) else None
+
+    def mask(self, inicio, fim, mode="andamento"):
+        """Máscara das obras que se relacionam com o período [inicio, fim] conforme `mode`"""
+        inicio = _as_datetime64(inicio)
+        # Fim do período inclusivo: vale o dia inteiro
+        fim = _as_datetime64(pd.Timestamp(fim) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns"))
+        if mode == "inicio":
+            return _mask(self.size, _between(self._por_inicio, self._inicios, inicio, fim))
+        if mode == "fim":
+            return _mask(self.size, _between(self._por_fim, self._fins, inicio, fim))
+        if mode == "andamento":
+            # Começou até o fim do período e termina depois do começo dele
+            comecou = _mask(self.size, _between(self._por_inicio, self._inicios, ate=fim))
+            return comecou & _mask(self.size, _between(self._por_fim, self._fins, de=inicio))
+        raise ValueError(f"Modo de período desconhecido: {mode}. Opções: {', '.join(PERIOD_MODES)}")
+
+
+class NumericRangeIndex:
+    """Valores de uma coluna numérica ordenados uma vez, com a permutação das posições.
+
+    Uma faixa [de, ate] vira duas buscas binárias e um recorte da permutação.
+    `min` e `max` (None sem valores) são os limites dos sliders; linhas sem
+    valor nunca entram no resultado.
+    """
+
+    def __init__(self, serie):
+        valores = serie.to_numpy(dtype=float, na_value=np.nan)
+        self.size = len(valores)
+        validas = np.flatnonzero(~np.isnan(valores))
+        self._ordem = validas[np.argsort(valores[validas], kind="stable")]
+        self._valores = valores[self._ordem]
+        self.min = float(self._valores[0]) if len(validas) else None
+        self.max = float(self._valores[-1]) if len(validas) else None
+
+    def mask(self, de=None, ate=None):
+        """Máscara das linhas com `de` <= valor <= `ate`"""
+        return _mask(self.size, _between(self._ordem, self._valores, de, ate))
+
+
+class CategoryIndex:
+    """Índice por valor de uma coluna: as posições das linhas de cada valor.
+
+    As linhas ficam agrupadas por valor numa única permutação, com o início
+    de cada grupo; filtrar por valores junta os grupos escolhidos, e as
+    opções de uma seleção saem dos códigos das linhas dela, sem reler a coluna.
+    """
+
+    def __init__(self, serie):
+        codigos, valores = pd.factorize(serie, sort=True)
+        self.size = len(codigos)
+        self.values = valores.tolist()
+        self._codigos = codigos
+        self._posicao_valor = {valor: i for i, valor in enumerate(self.values)}
+        self._ordem = np.argsort(codigos, kind="stable")
+        self._inicios = np.searchsorted(codigos[self._ordem], np.arange(len(self.values) + 1))
+
+    def positions(self, valor):
+        """Posições das linhas com `valor` (vazio se o valor não existir)"""
+        i = self._posicao_valor.get(valor)
+        if i is None:
+            return self._ordem[:0]
+        return self._ordem[self._inicios[i]:self._inicios[i + 1]]
+
+    def mask(self, valores):
+        """Máscara das linhas com algum dos `valores`"""
+        valores = set(valores)
+        if len(valores) >= len(self.values) and valores.issuperset(self.values):
+            return self._codigos >= 0
+        return _mask(self.size, np.concatenate([self._ordem[:0], *(self.positions(v) for v in valores)]))
+
+    def options(self, mask=None):
+        """Valores presentes nas linhas de `mask` (todas sem máscara), em ordem"""
+        if mask is None:
+            return list(self.values)
+        codigos = self._codigos[mask]
+        presentes = np.bincount(codigos[codigos >= 0], minlength=len(self.values)) > 0
+        return [self.values[i] for i in np.flatnonzero(presentes)]
+
+
+class FilterIndex:
+    """Índices de todos os filtros sobre `df_projetos` (as linhas de todas as obras)"""
+
+    def __init__(self, df_projetos):
+        self.size = len(df_projetos)
+        self.periodo = DateRangeIndex(df_projetos["Início Obra"], df_projetos["Fim Obra"])
+        self.faixas = {col: NumericRangeIndex(df_projetos[col]) for col in RANGE_COLUMNS if col in df_projetos}
+        # Projeto e Cidade também, como ponto de partida da cascata
+        self.categorias = {
+            col: CategoryIndex(df_projetos[col]) for col in ["Projeto", "Cidade", *CATEGORY_COLUMNS] if col in df_projetos
+        }
+
+    def mask(self, periodo=None, periodo_modo="andamento", faixas=None, categorias=None):
+        """Máscara combinada dos filtros informados; None quando nenhum está ativo.
+
+        `periodo` é (início, fim); `faixas`, {coluna: (de, ate)} das colunas de
+        RANGE_COLUMNS; `categorias`, {coluna: valores} das colunas indexadas.
+        """
+        mascaras = []
+        for col, valores in (categorias or {}).items():
+            mascaras.append(self.categorias[col].mask(valores))
+        if periodo is not None:
+            mascaras.append(self.periodo.mask(*periodo, mode=periodo_modo))
+        for col, (de, ate) in (faixas or {}).items():
+            mascaras.append(self.faixas[col].mask(de, ate))
+        if not mascaras:
+            return None
+        return np.logical_and.reduce(mascaras)
+
+
+def _listed(valores):
+    # Lista vazia vira [""] para continuar na URL (nenhum valor selecionado)
+    return sorted(str(v) for v in valores) or [""]
+
+
+def _pair(texto, converter):
+    de, _, ate = texto.partition("..")
+    return converter(de), converter(ate)
+
+
+def encode_filters(selected_obras, todas_obras, cidades=None, politica=DEFAULT_POLICY, filtros=None):
+    """Forma canônica dos filtros: {parâmetro: [valores]}, tudo ordenado e sem o que está no padrão.
+
+    As obras vão como as selecionadas (`obra`) ou as excluídas (`sem_obra`),
+    o que for menor; `cidades` None são todas as cidades das obras (o
+    preenchimento automático); `filtros` é o dict aceito por `FilterIndex.mask`.
+    """
+    filtros = filtros or {}
+    params = {}
+    selecionadas = set(selected_obras)
+    if len(selecionadas) < len(todas_obras):
+        excluidas = set(todas_obras) - selecionadas
+        if len(selecionadas) <= len(excluidas):
+            params["obra"] = _listed(selecionadas)
+        else:
+            params["sem_obra"] = _listed(excluidas)
+    if cidades is not None:
+        params["cidade"] = _listed(cidades)
+    if politica != DEFAULT_POLICY:
+        params["politica"] = [politica]
+    if filtros.get("periodo") is not None:
+        inicio, fim = filtros["periodo"]
+        params["periodo"] = [f"{pd.Timestamp(inicio):%Y-%m-%d}..{pd.Timestamp(fim):%Y-%m-%d}"]
+        params["periodo_modo"] = [filtros.get("periodo_modo", "andamento")]
+    for col, (de, ate) in (filtros.get("faixas") or {}).items():
+        params[RANGE_PARAMS[col]] = [f"{float(de)!r}..{float(ate)!r}"]
+    for col, valores in (filtros.get("categorias") or {}).items():
+        params[CATEGORY_PARAMS[col]] = _listed(valores)
+    return dict(sorted(params.items()))
+
+
+def decode_filters(params):
+    """Lê os parâmetros de `encode_filters` ({parâmetro: [valores]}), ignorando os inválidos.
+
+    Devolve um dict com "obra" e "sem_obra" (listas ou None), "cidades"
+    (lista ou None), "politica" e "filtros" (como em `encode_filters`).
+    """
+    def valores(nome):
+        lista = params.get(nome)
+        return None if lista is None else [v for v in lista if v != ""]
+
+    estado = {"obra": valores("obra"), "sem_obra": valores("sem_obra"), "cidades": valores("cidade")}
+    politica = (params.get("politica") or [DEFAULT_POLICY])[0]
+    estado["politica"] = politica if politica in POLICIES else DEFAULT_POLICY
+
+    filtros = {}
+    try:
+        periodo = _pair(params["periodo"][0], datetime.date.fromisoformat)
+        modo = (params.get("periodo_modo") or ["andamento"])[0]
+        filtros["periodo"] = periodo
+        filtros["periodo_modo"] = modo if modo in PERIOD_MODES else "andamento"
+    except (KeyError, IndexError, ValueError):
+        pass
+    faixas = {}
+    for col, nome in RANGE_PARAMS.items():
+        try:
+            faixas[col] = _pair(params[nome][0], float)
+        except (KeyError, IndexError, ValueError):
+            pass
+    if faixas:
+        filtros["faixas"] = faixas
+    categorias = {col: tuple(valores(nome)) for col, nome in CATEGORY_PARAMS.items() if nome in params}
+    if categorias:
+        filtros["categorias"] = categorias
+    estado["filtros"] = filtros
+    return estado
+
+
+def filters_key(params):
+    """Chave de cache da forma canônica (`encode_filters`): filtros iguais, mesma chave"""
+    return hash_inputs(sorted(params.items()))
@@ -0,0 +1,112 @@
+"""Formatação de valores para exibição."""
+
+import numpy as np
+import pandas as pd
+
+
+# Função para formatar valores como moeda brasileira
+def format_currency_br(value, show_cents=True):
+    if pd.isna(value):
+        return "R$ 0,00"
+
+    if show_cents:
+        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    else:
+        # Formatação simplificada para valores gerais (sem centavos)
+        if value >= 1000000:
+            return f"R$ {value/1000000:.1f}M".replace(".", ",")
+        elif value >= 1000:
+            return f"R$ {value/1000:.0f}K"
+        else:
+            return f"R$ {value:,.0f}".replace(",", ".")
+
+
+def _to_float_array(values):
+    if isinstance(values, (pd.Series, pd.Index)):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(values, dtype="float64")
+
+
+def _format_fixed(values, decimals, group):
+    """Formata valores finitos com `decimals` casas, vírgula decimal e (opcional) ponto de milhar.
+
+    Devolve (strings, suspeitos). O arredondamento é o do `format` do Python
+    (meio para o par, sobre o valor binário exato) sempre que o valor escalado
+    não está colado num ",5"; esses casos, e os valores grandes demais para
+    int64, vêm marcados em `suspeitos` para serem formatados um a um.
+    """
+    negativo = np.signbit(values)
+    escalado = np.abs(values) * 10 ** decimals
+    inteiro = np.floor(escalado)
+    suspeitos = (np.abs(escalado - inteiro - 0.5) <= 2 * np.spacing(escalado)) | (escalado >= 2 ** 52)
+    arredondado = np.where(suspeitos, 0, np.rint(escalado)).astype(np.int64)
+    parte_inteira = arredondado // 10 ** decimals
+    parte_decimal = arredondado % 10 ** decimals
+
+    # Matriz de caracteres (uma linha por valor), preenchida coluna a coluna
+    n_digitos = len(str(int(parte_inteira.max()))) if len(parte_inteira) else 1
+    n_separadores = (n_digitos - 1) // 3 if group else 0
+    largura = n_digitos + n_separadores + (decimals + 1 if decimals else 0)
+    matriz = np.empty((len(values), largura), dtype=np.uint32)
+    coluna = 0
+    # Zeros à esquerda viram espaço (o dígito das unidades sempre aparece)
+    visto = np.zeros(len(values), dtype=bool)
+    for j in range(n_digitos):
+        if group and j > 0 and (n_digitos - j) % 3 == 0:
+            matriz[:, coluna] = np.where(visto, ord("."), ord(" "))
+            coluna += 1
+        digito = (parte_inteira // 10 ** (n_digitos - 1 - j)) % 10
+        visto |= (digito != 0) | (j == n_digitos - 1)
+        matriz[:, coluna] = np.where(visto, ord("0") + digito, ord(" "))
+        coluna += 1
+    if decimals:
+        matriz[:, coluna] = ord(",")
+        for k in range(decimals):
+            matriz[:, coluna + 1 + k] = ord("0") + (parte_decimal // 10 ** (decimals - 1 - k)) % 10
+    texto = matriz.view(np.dtype(("U", matriz.shape[1]))).ravel()
+    texto = np.strings.lstrip(texto, " ")
+    texto = np.where(negativo, np.strings.add("-", texto), texto)
+    return texto, suspeitos
+
+
+def format_currency_br_array(values, show_cents=True):
+    """Versão vetorizada de `format_currency_br` para um array/Series inteiro.
+
+    Devolve um array numpy de strings com exatamente o mesmo texto que
+    `format_currency_br` daria para cada valor, nos modos com centavos e
+    compacto (K/M).
+    """
+    valores = _to_float_array(values).ravel()
+    finitos = np.isfinite(valores)
+    partes = []
+    # Infinitos (e os casos marcados por _format_fixed) seguem pelo caminho escalar
+    avulsos = {i: format_currency_br(valores[i], show_cents) for i in np.flatnonzero(np.isinf(valores))}
+
+    if show_cents:
+        faixas = [(finitos, valores, 2, True, "")]
+    else:
+        milhao = finitos & (valores >= 1000000)
+        mil = finitos & (valores >= 1000) & ~milhao
+        resto = finitos & ~milhao & ~mil
+        faixas = [
+            (milhao, valores / 1000000, 1, False, "M"),
+            (mil, valores / 1000, 0, False, "K"),
+            (resto, valores, 0, True, ""),
+        ]
+
+    for mascara, escalados, decimals, group, sufixo in faixas:
+        if not mascara.any():
+            continue
+        indices = np.flatnonzero(mascara)
+        texto, suspeitos = _format_fixed(escalados[indices], decimals, group)
+        partes.append((indices, np.strings.add(np.strings.add("R$ ", texto), sufixo)))
+        for i in indices[suspeitos]:
+            avulsos[i] = format_currency_br(valores[i], show_cents)
+
+    largura = max([len("R$ 0,00")] + [texto.dtype.itemsize // 4 for _, texto in partes] + [len(t) for t in avulsos.values()])
+    resultado = np.full(len(valores), "R$ 0,00", dtype=f"U{largura}")
+    for indices, texto in partes:
+        resultado[indices] = texto
+    for i, texto in avulsos.items():
+        resultado[i] = texto
+    return resultado
@@ -0,0 +1,252 @@
+"""Histórico das versões da planilha e comparação entre versões.
+
+Cada versão ingerida vira uma pasta em `OBRAS_HISTORY_DIR` com, para cada
+tabela do snapshot, o hash de cada linha na ordem da planilha (`.npy`) e um
+Parquet só com as linhas que ainda não apareceram desde o último quadro
+completo (delta): uma versão em que pouca coisa mudou ocupa poucos bytes. A
+cada `KEYFRAME_EVERY` versões grava-se um quadro completo, para que montar
+qualquer versão leia poucos arquivos.
+
+A comparação entre duas versões junta as obras pelo ID (merge vetorizado) e
+calcula a diferença dos KPIs e dos valores de cada obra.
+
+Uso:
+    python -m obras.history ingerir
+    python -m obras.history listar
+    python -m obras.history diff 0001 0002
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from obras.data import EXCEL_PATH, Snapshot, load_snapshot, snapshot_version
+from obras.model import build_view
+
+HISTORY_DIR = os.environ.get("OBRAS_HISTORY_DIR", "historico")
+
+# Um quadro completo a cada tantas versões (limita as leituras para montar uma versão)
+KEYFRAME_EVERY = 12
+
+MANIFEST_FILE = "manifesto.json"
+
+# Valores por obra comparados entre versões
+DIFF_COLUMNS = ["Custo Fluxo", "Saldo", "Média dos Próximos Meses", "% Avanço Físico", "Lotes"]
+
+KPI_LABELS = {
+    "total_obras": "Total de Obras",
+    "investimento_exec_projetos": "Custo Fluxo Projetos",
+    "saldo_projetos": "Saldo dos Projetos",
+    "total_lotes": "Total de Lotes",
+    "custo_geral_exec_proporcional": "Custos Fixos (proporcional)",
+    "custo_total_fluxo_obras": "Custo Total",
+    "custo_ago_25": "Custo Ago/25",
+    "custo_set_25": "Custo Set/25",
+    "custo_out_25": "Custo Out/25",
+    "valor_restante_pagar_media": "Valor Restante a Pagar (Média)",
+}
+
+
+def row_hashes(df):
+    """Hash de cada linha (conteúdo de todas as colunas), na ordem do DataFrame"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class HistoryStore:
+    """Versões ingeridas da planilha, guardadas como deltas colunares"""
+
+    def __init__(self, base_dir=HISTORY_DIR):
+        self.base_dir = base_dir
+
+    def versions(self):
+        """Manifestos das versões, da mais antiga para a mais recente"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        manifestos = []
+        for nome in sorted(os.listdir(self.base_dir)):
+            caminho = os.path.join(self.base_dir, nome, MANIFEST_FILE)
+            if nome.startswith(".") or not os.path.isfile(caminho):
+                continue
+            with open(caminho, encoding="utf-8") as f:
+                manifestos.append(json.load(f))
+        return manifestos
+
+    def _manifest(self, nome):
+        with open(os.path.join(self.base_dir, nome, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _chain(self, nome):
+        """Pastas do último quadro completo até `nome`, em ordem"""
+        cadeia = [self._manifest(nome)]
+        while not cadeia[-1]["quadro_completo"]:
+            cadeia.append(self._manifest(cadeia[-1]["anterior"]))
+        return [m["nome"] for m in reversed(cadeia)]
+
+    def ingest(self, snapshot, planilha=None):
+        """Guarda `snapshot` como nova versão; não faz nada se a versão dos dados já existir"""
+        versao = snapshot_version(snapshot)
+        versoes = self.versions()
+        for manifest in versoes:
+            if manifest["versao"] == versao:
+                return manifest
+        anterior = versoes[-1] if versoes else None
+        quadro_completo = anterior is None or anterior["desde_quadro_completo"] + 1 >= KEYFRAME_EVERY
+        conhecidas = {} if quadro_completo else self._known_hashes(anterior["nome"])
+
+        # Número sequencial na frente: a ordem dos nomes é a ordem de ingestão
+        nome = f"{len(versoes) + 1:04d}_{time.strftime('%Y%m%dT%H%M%S')}_{versao}"
+        os.makedirs(self.base_dir, exist_ok=True)
+        temporario = os.path.join(self.base_dir, f".{nome}.{os.getpid()}.tmp")
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        linhas, novas = {}, {}
+        for tabela, df in zip(Snapshot._fields, snapshot):
+            hashes = row_hashes(df)
+            np.save(os.path.join(temporario, f"{tabela}.npy"), hashes)
+            # Linhas inéditas desde o último quadro completo (e sem repetir dentro da própria versão)
+            inedita = ~pd.Series(hashes).duplicated().to_numpy()
+            if tabela in conhecidas:
+                inedita &= ~np.isin(hashes, conhecidas[tabela])
+            delta = df[inedita].reset_index(drop=True)
+            delta.insert(0, "_hash", hashes[inedita])
+            delta.to_parquet(os.path.join(temporario, f"{tabela}.parquet"), index=False, compression="zstd")
+            linhas[tabela], novas[tabela] = len(df), int(inedita.sum())
+        manifest = {
+            "nome": nome,
+            "versao": versao,
+            "planilha": planilha,
+            "ingerido_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "anterior": anterior["nome"] if anterior else None,
+            "quadro_completo": quadro_completo,
+            "desde_quadro_completo": 0 if quadro_completo else anterior["desde_quadro_completo"] + 1,
+            "linhas": linhas,
+            "linhas_gravadas": novas,
+            "colunas": {tabela: [str(col) for col in df.columns] for tabela, df in zip(Snapshot._fields, snapshot)},
+        }
+        with open(os.path.join(temporario, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, os.path.join(self.base_dir, nome))
+        return manifest
+
+    def _known_hashes(self, nome):
+        """Hashes das linhas já gravadas na cadeia que termina em `nome`"""
+        conhecidas = {}
+        for pasta in self._chain(nome):
+            for tabela in Snapshot._fields:
+                lidas = pd.read_parquet(os.path.join(self.base_dir, pasta, f"{tabela}.parquet"), columns=["_hash"])
+                conhecidas.setdefault(tabela, []).append(lidas["_hash"].to_numpy())
+        return {tabela: np.concatenate(partes) for tabela, partes in conhecidas.items()}
+
+    def load(self, nome):
+        """Snapshot completo da versão `nome`"""
+        manifest = self._manifest(nome)
+        cadeia = self._chain(nome)
+        tabelas = []
+        for tabela in Snapshot._fields:
+            partes = [pd.read_parquet(os.path.join(self.base_dir, pasta, f"{tabela}.parquet")) for pasta in cadeia]
+            linhas = pd.concat(partes, ignore_index=True).drop_duplicates("_hash", keep="last").set_index("_hash")
+            hashes = np.load(os.path.join(self.base_dir, nome, f"{tabela}.npy"))
+            df = linhas.loc[hashes, manifest["colunas"][tabela]].reset_index(drop=True)
+            tabelas.append(df)
+        return Snapshot(*tabelas)
+
+
+def diff_kpis(view_a, view_b):
+    """Tabela dos KPIs nas duas visões, com a diferença absoluta e percentual"""
+    kpis_a, kpis_b = view_a["kpis"], view_b["kpis"]
+    df = pd.DataFrame({
+        "Indicador": list(KPI_LABELS.values()),
+        "Versão A": [float(kpis_a[chave]) for chave in KPI_LABELS],
+        "Versão B": [float(kpis_b[chave]) for chave in KPI_LABELS],
+    })
+    df["Diferença"] = df["Versão B"] - df["Versão A"]
+    df["Variação %"] = (df["Diferença"] / df["Versão A"].where(df["Versão A"] != 0)) * 100
+    return df
+
+
+def diff_projetos(df_a, df_b, columns=DIFF_COLUMNS, only_changed=True):
+    """Obras das duas versões juntadas pelo ID, com os valores de A, de B e a diferença"""
+    columns = [col for col in columns if col in df_a.columns and col in df_b.columns]
+    a = df_a[["ID", "Projeto", *columns]]
+    b = df_b[["ID", "Projeto", *columns]]
+    df = a.merge(b, on="ID", how="outer", suffixes=(" (A)", " (B)"), indicator=True)
+    df.insert(1, "Projeto", df["Projeto (B)"].fillna(df["Projeto (A)"]))
+    df = df.drop(columns=["Projeto (A)", "Projeto (B)"])
+    situacao = np.select(
+        [df["_merge"].eq("left_only").to_numpy(), df["_merge"].eq("right_only").to_numpy()],
+        ["removida", "nova"], default="igual",
+    )
+    alterada = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        antes = df[f"{col} (A)"].to_numpy(dtype=float, na_value=np.nan)
+        depois = df[f"{col} (B)"].to_numpy(dtype=float, na_value=np.nan)
+        df[f"Δ {col}"] = np.nan_to_num(depois) - np.nan_to_num(antes)
+        alterada |= ~np.isclose(antes, depois, equal_nan=True)
+    situacao = np.where((situacao == "igual") & alterada, "alterada", situacao)
+    df.insert(2, "Situação", situacao)
+    df = df.drop(columns="_merge")
+    if only_changed:
+        df = df[df["Situação"] != "igual"]
+    return df.reset_index(drop=True)
+
+
+def diff_versions(snapshot_a, snapshot_b, selected_obras=None, selected_cidades=None):
+    """(KPIs, obras) comparando duas versões com o mesmo filtro; sem obras, todas as obras"""
+    visoes = []
+    for snapshot in (snapshot_a, snapshot_b):
+        obras = selected_obras
+        if obras is None:
+            obras = snapshot.df_projetos["Projeto"].dropna().unique().tolist()
+        visoes.append(build_view(snapshot, obras, selected_cidades))
+    projetos = diff_projetos(visoes[0]["df_filtered_projetos"], visoes[1]["df_filtered_projetos"])
+    return diff_kpis(*visoes), projetos
+
+
+def _find(store, prefixo):
+    nomes = [m["nome"] for m in store.versions() if m["nome"].startswith(prefixo) or m["versao"].startswith(prefixo)]
+    if len(nomes) != 1:
+        raise SystemExit(f"Versão não encontrada ou ambígua: {prefixo}")
+    return nomes[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Histórico das versões da planilha de obras.")
+    parser.add_argument("--historico", default=HISTORY_DIR, help="Diretório do histórico")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    ingerir = comandos.add_parser("ingerir", help="Guarda a planilha atual como nova versão")
+    ingerir.add_argument("--planilha", default=EXCEL_PATH, help="Caminho da planilha de obras")
+    comandos.add_parser("listar", help="Lista as versões guardadas")
+    diff = comandos.add_parser("diff", help="Compara duas versões (nome ou início do nome/versão)")
+    diff.add_argument("a")
+    diff.add_argument("b")
+    diff.add_argument("--obras", nargs="+", help="Obras comparadas (padrão: todas)")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.historico)
+    if args.comando == "ingerir":
+        manifest = store.ingest(load_snapshot(args.planilha), args.planilha)
+        print(f"Versão {manifest['nome']} ({sum(manifest['linhas_gravadas'].values())} linhas gravadas)")
+    elif args.comando == "listar":
+        for manifest in store.versions():
+            tipo = "completo" if manifest["quadro_completo"] else "delta"
+            print(f"{manifest['nome']}  {manifest['ingerido_em']}  {tipo:8}  "
+                  f"{manifest['linhas']['df_projetos']} obras, {manifest['linhas_gravadas']['df_projetos']} gravadas")
+    else:
+        inicio = time.perf_counter()
+        kpis, projetos = diff_versions(store.load(_find(store, args.a)), store.load(_find(store, args.b)), args.obras)
+        with pd.option_context("display.width", 200, "display.max_columns", 20, "display.max_rows", 200,
+                               "display.float_format", "{:,.2f}".format):
+            print(kpis.to_string(index=False))
+            print()
+            print(projetos.to_string(index=False) if not projetos.empty else "Nenhuma obra alterada.")
+        print(f"\n({time.perf_counter() - inicio:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Materialização das visões, para abrir o dashboard já com cache.
+
+Depois que a planilha é atualizada, calcula a visão padrão (todas as obras)
+e a visão de cada obra (com agregados) e grava tudo em
+`OBRAS_MATERIALIZED_DIR/<versão dos dados>/`. O dashboard procura ali a
+versão dos dados que carregou; os primeiros usuários do dia recebem as
+visões prontas, sem recalcular nada. O PDF não é materializado: a data de
+geração tem de ser a da exportação, e as seções já ficam no cache
+compartilhado (`obras.cache.REPORT_CACHE`). A versão também entra no
+histórico (`obras.history`).
+
+Uso:
+    python -m obras.materialize
+    python -m obras.materialize --manter 3
+    python -m obras.materialize --observar --intervalo 300   # roda a cada atualização da planilha
+"""
+
+import argparse
+import json
+import os
+import pickle
+import shutil
+import time
+
+from obras.cache import hash_inputs
+from obras.data import EXCEL_PATH, load_snapshot, snapshot_version
+from obras.history import HistoryStore
+from obras.model import build_view, cidades_options, get_aggregates
+
+MATERIALIZED_DIR = os.environ.get("OBRAS_MATERIALIZED_DIR", "materializado")
+
+VIEWS_FILE = "visoes.pkl"
+MANIFEST_FILE = "manifesto.json"
+
+# Muda quando as visões ganham ou perdem campos; materializações de outro formato são ignoradas
+FORMAT_VERSION = 3
+
+
+def view_key(selected_obras, selected_cidades):
+    """Chave de uma visão: os filtros ordenados (a ordem da seleção não importa)"""
+    return hash_inputs(sorted(selected_obras), sorted(selected_cidades))
+
+
+class Materialized:
+    """Visões materializadas de uma versão dos dados"""
+
+    def __init__(self, path, views, manifest):
+        self.path = path
+        self.views = views
+        self.manifest = manifest
+
+    def view(self, selected_obras, selected_cidades):
+        """Cópia rasa da visão materializada para os filtros (regra de rateio padrão); None se não houver"""
+        view = self.views.get(view_key(selected_obras, selected_cidades))
+        return dict(view) if view is not None else None
+
+
+def load_materialized(versao, base_dir=MATERIALIZED_DIR):
+    """Materialização da versão `versao` dos dados; None se ainda não existir"""
+    path = os.path.join(base_dir, versao)
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("formato") != FORMAT_VERSION:
+            return None
+        with open(os.path.join(path, VIEWS_FILE), "rb") as f:
+            views = pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        return None
+    return Materialized(path, views, manifest)
+
+
+def materialize(snapshot, base_dir=MATERIALIZED_DIR, planilha=None):
+    """Calcula e grava as visões de `snapshot`; retorna o manifesto"""
+    inicio = time.perf_counter()
+    versao = snapshot_version(snapshot)
+    todas_obras = snapshot.df_projetos["Projeto"].dropna().unique().tolist()
+
+    views = {}
+    padrao = build_view(snapshot, todas_obras, cidades_options(snapshot.df_projetos, todas_obras))
+    get_aggregates(padrao)
+    chave_padrao = view_key(padrao["selected_obras"], padrao["selected_cidades"])
+    views[chave_padrao] = padrao
+    for obra in todas_obras:
+        view = build_view(snapshot, [obra])
+        get_aggregates(view)
+        views[view_key(view["selected_obras"], view["selected_cidades"])] = view
+
+    # Grava numa pasta temporária e troca de uma vez, para o dashboard nunca ler pela metade
+    os.makedirs(base_dir, exist_ok=True)
+    destino = os.path.join(base_dir, versao)
+    temporario = os.path.join(base_dir, f".{versao}.{os.getpid()}.tmp")
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+    with open(os.path.join(temporario, VIEWS_FILE), "wb") as f:
+        pickle.dump(views, f, protocol=pickle.HIGHEST_PROTOCOL)
+    manifest = {
+        "versao": versao,
+        "formato": FORMAT_VERSION,
+        "planilha": planilha,
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "visao_padrao": chave_padrao,
+        "visoes": len(views),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+    with open(os.path.join(temporario, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+    return manifest
+
+
+def prune(base_dir, keep):
+    """Remove as materializações mais antigas, mantendo as `keep` mais recentes"""
+    versoes = [
+        os.path.join(base_dir, nome) for nome in os.listdir(base_dir)
+        if not nome.startswith(".") and os.path.isfile(os.path.join(base_dir, nome, MANIFEST_FILE))
+    ]
+    versoes.sort(key=os.path.getmtime, reverse=True)
+    for path in versoes[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def run_once(planilha, base_dir, keep):
+    snapshot = load_snapshot(planilha)
+    versao = snapshot_version(snapshot)
+    HistoryStore().ingest(snapshot, planilha)
+    if load_materialized(versao, base_dir) is not None:
+        print(f"Versão {versao} já materializada em {base_dir}", flush=True)
+        return
+    manifest = materialize(snapshot, base_dir, planilha)
+    print(f"✅ Versão {versao}: {manifest['visoes']} visões em {manifest['segundos']:.1f}s ({base_dir})", flush=True)
+    if keep:
+        prune(base_dir, keep)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materializa as visões do dashboard.")
+    parser.add_argument("--planilha", default=EXCEL_PATH, help="Caminho da planilha de obras")
+    parser.add_argument("--saida", default=MATERIALIZED_DIR, help="Diretório das materializações")
+    parser.add_argument("--manter", type=int, default=3, help="Versões mantidas (0 mantém todas)")
+    parser.add_argument("--observar", action="store_true", help="Continua rodando e materializa a cada alteração da planilha")
+    parser.add_argument("--intervalo", type=float, default=60, help="Intervalo entre verificações da planilha (s)")
+    args = parser.parse_args(argv)
+
+    if not args.observar:
+        run_once(args.planilha, args.saida, args.manter)
+        return 0
+
+    ultima = None
+    try:
+        while True:
+            try:
+                mtime = os.stat(args.planilha).st_mtime_ns
+                if mtime != ultima:
+                    run_once(args.planilha, args.saida, args.manter)
+                    ultima = mtime
+            except Exception as e:
+                # Planilha sendo gravada ou inválida: tenta de novo no próximo ciclo
+                print(f"❌ Falha ao materializar: {e}", flush=True)
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+"""Métricas do dashboard no formato texto do Prometheus.
+
+Sem dependências externas: um registro simples de contadores, gauges e
+histogramas, exposto por um endpoint HTTP local (`OBRAS_METRICS_PORT`) e/ou
+gravado num arquivo para o textfile collector do node_exporter
+(`OBRAS_METRICS_FILE`). Sem nenhuma das duas variáveis, o dashboard não
+mede nada a mais.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from obras.cache import REPORT_CACHE
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Sessões vistas neste intervalo (segundos) contam como ativas
+ACTIVE_WINDOW = 300
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pares):
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escape(valor)}"' for nome, valor in pares) + "}"
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor))
+
+
+class _Metric:
+    tipo = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(nome, "") for nome in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.tipo}"]
+
+
+class Counter(_Metric):
+    tipo = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        chave = self._key(labels)
+        with self._lock:
+            self._values[chave] = self._values.get(chave, 0.0) + amount
+
+    def set(self, value, **labels):
+        """Espelha um total contado em outro lugar (ex.: acertos de um cache)"""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def render(self):
+        with self._lock:
+            itens = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(list(zip(self.labelnames, chave)))} {_numero(valor)}" for chave, valor in itens
+        ]
+
+
+class Gauge(Counter):
+    tipo = "gauge"
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    tipo = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        chave = self._key(labels)
+        with self._lock:
+            contagens, soma = self._values.get(chave, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    contagens[i] += 1
+            contagens[-1] += 1
+            self._values[chave] = (contagens, soma + value)
+
+    def render(self):
+        with self._lock:
+            itens = sorted((chave, (list(contagens), soma)) for chave, (contagens, soma) in self._values.items())
+        linhas = self.header()
+        for chave, (contagens, soma) in itens:
+            pares = list(zip(self.labelnames, chave))
+            for limite, contagem in zip(self.buckets + (float("inf"),), contagens):
+                linhas.append(f"{self.name}_bucket{_labels(pares + [('le', _numero(limite))])} {contagem}")
+            linhas.append(f"{self.name}_sum{_labels(pares)} {_numero(soma)}")
+            linhas.append(f"{self.name}_count{_labels(pares)} {contagens[-1]}")
+        return linhas
+
+
+class Registry:
+    """Métricas registradas e funções chamadas antes de cada coleta"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        for coletar in self.collectors:
+            coletar()
+        linhas = []
+        for metric in self.metrics:
+            linhas.extend(metric.render())
+        return "\n".join(linhas) + "\n"
+
+
+class CacheStats:
+    """Acertos e faltas de um cache que não conta sozinho (ex.: st.cache_resource)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+METRICS = Registry()
+
+RERUN_SECONDS = METRICS.register(Histogram("obras_rerun_seconds", "Duração total dos reruns do dashboard."))
+SECTION_SECONDS = METRICS.register(Histogram(
+    "obras_rerun_section_seconds", "Duração de cada seção/etapa do rerun.", ["section"]
+))
+LOAD_DATA_SECONDS = METRICS.register(Histogram(
+    "obras_load_data_seconds", "Duração da leitura da planilha (faltas do cache de dados)."
+))
+CACHE_HITS = METRICS.register(Counter("obras_cache_hits_total", "Acertos de cache.", ["cache"]))
+CACHE_MISSES = METRICS.register(Counter("obras_cache_misses_total", "Faltas de cache.", ["cache"]))
+CACHE_BYTES = METRICS.register(Gauge("obras_cache_bytes", "Bytes guardados no cache.", ["cache"]))
+ACTIVE_SESSIONS = METRICS.register(Gauge(
+    "obras_active_sessions", f"Sessões com rerun nos últimos {ACTIVE_WINDOW} segundos."
+))
+EXPORTS_IN_FLIGHT = METRICS.register(Gauge("obras_exports_in_flight", "Exportações em andamento.", ["formato"]))
+EXPORT_SECONDS = METRICS.register(Histogram("obras_export_seconds", "Duração das exportações.", ["formato"]))
+EXPORTS_TOTAL = METRICS.register(Counter("obras_exports_total", "Exportações concluídas.", ["formato", "status"]))
+RESIDENT_MEMORY = METRICS.register(Gauge("process_resident_memory_bytes", "Memória residente do processo."))
+
+# Cache do snapshot de dados (dashboard)
+DATA_CACHE = CacheStats()
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def touch_session(session_id):
+    with _sessions_lock:
+        _sessions[session_id] = time.monotonic()
+
+
+def observe_rerun(timings, total):
+    """Registra um rerun: duração total e de cada seção (`timings` em segundos)"""
+    RERUN_SECONDS.observe(total)
+    for section, seconds in timings.items():
+        SECTION_SECONDS.observe(seconds, section=section)
+
+
+@contextmanager
+def track_export(formato):
+    """Exportação em andamento: conta em voo, mede a duração e conta por status"""
+    EXPORTS_IN_FLIGHT.inc(formato=formato)
+    inicio = time.perf_counter()
+    status = "erro"
+    try:
+        yield
+        status = "ok"
+    finally:
+        EXPORT_SECONDS.observe(time.perf_counter() - inicio, formato=formato)
+        EXPORTS_TOTAL.inc(formato=formato, status=status)
+        EXPORTS_IN_FLIGHT.dec(formato=formato)
+
+
+def _resident_memory_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Sem /proc (macOS): pico de RSS, que lá já vem em bytes
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if RESOURCE_AVAILABLE else 0
+
+
+def _collect():
+    CACHE_HITS.set(DATA_CACHE.hits, cache="dados")
+    CACHE_MISSES.set(DATA_CACHE.misses, cache="dados")
+    CACHE_HITS.set(REPORT_CACHE.hits, cache="secoes_relatorio")
+    CACHE_MISSES.set(REPORT_CACHE.misses, cache="secoes_relatorio")
+    CACHE_BYTES.set(REPORT_CACHE.size_bytes, cache="secoes_relatorio")
+    limite = time.monotonic() - ACTIVE_WINDOW
+    with _sessions_lock:
+        for session_id in [sid for sid, visto in _sessions.items() if visto < limite]:
+            del _sessions[session_id]
+        ACTIVE_SESSIONS.set(len(_sessions))
+    RESIDENT_MEMORY.set(_resident_memory_bytes())
+
+
+METRICS.collectors.append(_collect)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = METRICS
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        corpo = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_exporter(port, host="127.0.0.1", registry=METRICS):
+    """Serve `registry` em http://host:port/metrics numa thread daemon"""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="obras-metrics", daemon=True).start()
+    return server
+
+
+def write_textfile(path, registry=METRICS):
+    """Grava as métricas em `path` de forma atômica (textfile collector)"""
+    temporario = f"{path}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(temporario, path)
+
+
+def exporter_config():
+    """(porta, arquivo) configurados pelas variáveis de ambiente; None quando ausentes"""
+    porta = os.environ.get("OBRAS_METRICS_PORT")
+    return (int(porta) if porta else None), os.environ.get("OBRAS_METRICS_FILE") or None
@@ -0,0 +1,147 @@
+"""Filtros e cálculo dos KPIs do dashboard."""
+
+from obras.data import MONEY_COLS, money_centavos
+from obras.money import centavos_frame, share, to_reais
+from obras.policies import DEFAULT_POLICY, get_policy
+from obras.timing import SectionTimer
+
+
+def cidades_options(df_projetos, selected_obras):
+    """Cidades disponíveis para as obras selecionadas (filtro em cascata)"""
+    if selected_obras:
+        return df_projetos[df_projetos["Projeto"].isin(selected_obras)]["Cidade"].dropna().unique().tolist()
+    return df_projetos["Cidade"].dropna().unique().tolist()
+
+
+def _selection(df_projetos, selected_obras, selected_cidades, mask=None):
+    selecao = df_projetos["Projeto"].isin(selected_obras) & df_projetos["Cidade"].isin(selected_cidades)
+    if mask is not None:
+        selecao &= mask
+    return selecao
+
+
+def filter_projetos(df_projetos, selected_obras, selected_cidades, mask=None):
+    """Linhas das obras e cidades selecionadas; `mask` (alinhada às linhas) soma os demais filtros"""
+    return df_projetos[_selection(df_projetos, selected_obras, selected_cidades, mask)]
+
+
+def compute_kpis(snapshot, df_filtered_projetos, policy=DEFAULT_POLICY, centavos=None):
+    """Calcula os indicadores exibidos no dashboard e nos relatórios, com a regra de rateio `policy`.
+
+    Somas e rateios em centavos (`obras.money`); os valores em reais só na
+    saída. `centavos` são as colunas em reais das obras filtradas já em
+    centavos (recorte de `obras.data.money_centavos`); sem ela, são
+    convertidas aqui.
+    """
+    policy = get_policy(policy)
+    if centavos is None:
+        centavos = centavos_frame(df_filtered_projetos, MONEY_COLS)
+    # --- Cálculo proporcional do custo geral executado por lote ---
+    total_lotes_geral = policy.base_projetos(snapshot.df_projetos)["Lotes"].sum()  # Lotes da base do rateio
+    total_lotes_filtrado = df_filtered_projetos["Lotes"].sum()  # Total de lotes das obras filtradas
+
+    # Custo geral executado total
+    custo_geral_exec_total = policy.custo_geral_total(snapshot)
+
+    # Custo geral executado proporcional baseado nos lotes
+    if total_lotes_geral > 0:
+        proporcao_lotes = total_lotes_filtrado / total_lotes_geral
+    else:
+        proporcao_lotes = 0
+
+    def proporcional(centavos):
+        return share(centavos, total_lotes_filtrado, total_lotes_geral) if total_lotes_geral > 0 else 0
+
+    custo_geral_exec_proporcional = proporcional(custo_geral_exec_total)
+
+    # --- KPIs de Projetos ---
+    investimento_exec_projetos = int(centavos["Custo Fluxo"].sum())
+    media_proximos_meses_projetos = int(centavos["Média dos Próximos Meses"].sum())
+    saldo_projetos = int(centavos["Saldo"].sum())
+    sheet2 = money_centavos(snapshot).df_sheet2
+
+    # Saída em reais
+    return {
+        "total_obras": len(df_filtered_projetos),
+        "investimento_exec_projetos": to_reais(investimento_exec_projetos),
+        "media_proximos_meses_projetos": to_reais(media_proximos_meses_projetos),
+        "saldo_projetos": to_reais(saldo_projetos),
+        "total_lotes": df_filtered_projetos["Lotes"].sum(),
+        "proporcao_lotes": proporcao_lotes,
+        "custo_geral_exec_total": to_reais(custo_geral_exec_total),
+        "custo_geral_exec_proporcional": to_reais(custo_geral_exec_proporcional),
+        # --- Cálculos mensais proporcionais da Sheet2 ---
+        "custo_ago_geral": to_reais(proporcional(int(sheet2["ago/25"].sum()))),
+        "custo_set_geral": to_reais(proporcional(int(sheet2["set/25"].sum()))),
+        "custo_out_geral": to_reais(proporcional(int(sheet2["out/25"].sum()))),
+        "media_proximos_geral": to_reais(proporcional(int(sheet2["Média dos Próximos Meses"].sum()))),
+        # --- Novos Indicadores Solicitados ---
+        "custo_total_fluxo_obras": to_reais(policy.custo_total(
+            investimento_exec_projetos, custo_geral_exec_total, custo_geral_exec_proporcional
+        )),
+        "custo_ago_25": to_reais(int(centavos["ago/25"].sum())),
+        "custo_set_25": to_reais(int(centavos["set/25"].sum())),
+        "custo_out_25": to_reais(int(centavos["out/25"].sum())),
+        "valor_restante_pagar_media": to_reais(media_proximos_meses_projetos),
+        "saldo_total_acumulado": to_reais(saldo_projetos),
+    }
+
+
+def compute_aggregates(df_filtered_projetos, centavos=None):
+    """Agregados dos gráficos principais: por tipologia e por cidade (`centavos` como em `compute_kpis`)"""
+    if centavos is None:
+        centavos = centavos_frame(df_filtered_projetos, ["Custo Fluxo"])
+    # Custo somado em centavos e convertido para reais no fim
+    df = df_filtered_projetos.assign(custo_fluxo=centavos["Custo Fluxo"].to_numpy())
+    por_tipologia = (
+        df.groupby("Tipologia")
+        .agg(obras=("Projeto", "count"), lotes=("Lotes", "sum"), custo_fluxo=("custo_fluxo", "sum"))
+        .reset_index()
+    )
+    por_cidade = (
+        df.groupby("Cidade")
+        .agg(obras=("Projeto", "count"), custo_fluxo=("custo_fluxo", "sum"))
+        .sort_values("obras", ascending=False, kind="stable")
+        .reset_index()
+    )
+    for agregado in (por_tipologia, por_cidade):
+        agregado["custo_fluxo"] = to_reais(agregado["custo_fluxo"])
+    return {"tipologia": por_tipologia, "cidade": por_cidade}
+
+
+def get_aggregates(view):
+    """Agregados da visão, calculados na primeira vez e guardados na própria visão"""
+    if "aggregates" not in view:
+        view["aggregates"] = compute_aggregates(view["df_filtered_projetos"], view.get("centavos_projetos"))
+    return view["aggregates"]
+
+
+def build_view(snapshot, selected_obras, selected_cidades=None, timings=None, policy=DEFAULT_POLICY, mask=None):
+    """Aplica os filtros ao snapshot e reúne tudo o que um relatório precisa.
+
+    Sem cidades informadas, usa todas as cidades das obras selecionadas,
+    como o preenchimento automático do dashboard. Se `timings` for um dict,
+    recebe o tempo do filtro e do cálculo dos KPIs. `policy` é a regra de
+    rateio das despesas fixas (`obras.policies`) e `mask`, a máscara dos
+    demais filtros (`obras.filters.FilterIndex`).
+    """
+    timer = SectionTimer(timings)
+    if selected_cidades is None:
+        selected_cidades = cidades_options(snapshot.df_projetos, selected_obras)
+    selecao = _selection(snapshot.df_projetos, selected_obras, selected_cidades, mask)
+    df_filtered_projetos = snapshot.df_projetos[selecao]
+    # As mesmas linhas na cópia em centavos do snapshot, para as somas
+    centavos_projetos = money_centavos(snapshot).df_projetos[selecao.to_numpy()]
+    timer.lap("filtro")
+    kpis = compute_kpis(snapshot, df_filtered_projetos, policy, centavos_projetos)
+    timer.lap("kpis")
+    return {
+        "selected_obras": list(selected_obras),
+        "selected_cidades": list(selected_cidades),
+        # Determinar se deve mostrar centavos (quando obra específica é selecionada)
+        "show_cents": len(selected_obras) == 1,
+        "df_filtered_projetos": df_filtered_projetos,
+        "centavos_projetos": centavos_projetos,
+        "kpis": kpis,
+        "politica": get_policy(policy).name,
+    }
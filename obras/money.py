@@ -0,0 +1,62 @@
+"""Valores monetários em centavos (int64) para os cálculos.
+
+As planilhas trazem reais com duas casas; em float64 as somas e os rateios
+acumulam erros de arredondamento e os totais podiam diferir do financeiro
+por centavos. As colunas em reais do snapshot ganham uma cópia em centavos
+inteiros uma única vez (`obras.data.money_centavos`); os cálculos
+(`obras.model`, `obras.policies`, `obras.workload`) somam e rateiam esses
+inteiros e só devolvem reais na saída. Todo rateio é exato e distribui o
+centavo que sobra de forma determinística.
+"""
+
+import math
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+
+def to_centavos(valores):
+    """Reais (escalar, Series ou array) em centavos int64, arredondados ao centavo mais próximo"""
+    if np.ndim(valores) == 0:
+        return int(round(float(valores) * 100)) if pd.notna(valores) else 0
+    reais = np.asarray(valores, dtype=float)
+    return np.rint(np.nan_to_num(reais) * 100).astype(np.int64)
+
+
+def to_reais(centavos):
+    """Centavos (escalar ou array) em reais"""
+    if np.ndim(centavos) == 0:
+        return int(centavos) / 100
+    return np.asarray(centavos, dtype=np.int64) / 100
+
+
+def centavos_frame(df, colunas):
+    """DataFrame com as `colunas` de `df` (as que existirem) em centavos int64, no mesmo índice"""
+    return pd.DataFrame({col: to_centavos(df[col]) for col in colunas if col in df.columns}, index=df.index)
+
+
+def share(total, parte, todo):
+    """Parte `parte`/`todo` de `total` centavos, arredondada ao centavo (metade para o par)"""
+    if not todo:
+        return 0
+    return round(Fraction(int(total)) * Fraction(parte) / Fraction(todo))
+
+
+def allocate(total, pesos):
+    """Divide `total` centavos proporcionalmente a `pesos`, somando exatamente `total`.
+
+    Cada parte recebe o piso da sua fração; os centavos que sobram vão para
+    as maiores frações restantes, com empate resolvido pela posição. As
+    frações são exatas (Fraction), mesmo com pesos em float; pesos NaN valem 0.
+    """
+    pesos = [Fraction(peso) if pd.notna(peso) else Fraction(0) for peso in np.asarray(pesos, dtype=float).tolist()]
+    soma = sum(pesos)
+    if not pesos or soma <= 0:
+        return np.zeros(len(pesos), dtype=np.int64)
+    bruto = [int(total) * peso / soma for peso in pesos]
+    partes = [math.floor(fracao) for fracao in bruto]
+    sobra = int(total) - sum(partes)
+    for i in sorted(range(len(pesos)), key=lambda i: partes[i] - bruto[i])[:sobra]:
+        partes[i] += 1
+    return np.array(partes, dtype=np.int64)
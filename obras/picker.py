@@ -0,0 +1,156 @@
+"""Seletor de obras com busca incremental.
+
+O índice é montado uma vez por versão dos dados: trigramas dos nomes
+normalizados (busca por trecho do nome) e a lista ordenada das palavras
+(busca por prefixo, usada nos termos com menos de três letras). A seleção
+guarda só as exceções a "todas" ou a "nenhuma", então continua pequena
+mesmo com milhares de obras selecionadas.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from obras.table import normalize_text
+
+# Agrupamentos oferecidos no seletor
+GROUP_COLUMNS = {"Empresa": "Empresa desenvolvedora", "Cidade": "Cidade"}
+SEM_GRUPO = "(sem informação)"
+
+# Termos menores que isto são buscados como prefixo de palavra
+NGRAM = 3
+
+
+def _ngrams(texto):
+    return {texto[i:i + NGRAM] for i in range(len(texto) - NGRAM + 1)}
+
+
+class ProjectIndex:
+    """Índice de busca sobre os nomes de projeto de `df` (um por obra, na ordem da planilha).
+
+    As buscas devolvem posições em `names`, em ordem crescente.
+    """
+
+    def __init__(self, df, group_columns=GROUP_COLUMNS):
+        base = df.dropna(subset=["Projeto"]).drop_duplicates("Projeto")
+        self.names = base["Projeto"].astype(str).tolist()
+        self._positions = {nome: pos for pos, nome in enumerate(self.names)}
+        self.groups = {
+            col: base[col].fillna(SEM_GRUPO).astype(str).to_numpy()
+            for col in group_columns.values() if col in base.columns
+        }
+        self._normalized = normalize_text(base["Projeto"]).tolist()
+
+        postings = defaultdict(list)
+        palavras = []
+        for pos, nome in enumerate(self._normalized):
+            for gram in _ngrams(nome):
+                postings[gram].append(pos)
+            palavras.extend((palavra, pos) for palavra in set(nome.split()))
+        self._ngrams = {gram: np.array(lista, dtype=np.int64) for gram, lista in postings.items()}
+        palavras.sort()
+        self._words = [palavra for palavra, _ in palavras]
+        self._word_positions = np.array([pos for _, pos in palavras], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix(self, termo):
+        inicio = bisect_left(self._words, termo)
+        fim = bisect_left(self._words, termo + "\uffff", inicio)
+        return np.unique(self._word_positions[inicio:fim])
+
+    def _substring(self, termo):
+        candidatos = None
+        for gram in _ngrams(termo):
+            lista = self._ngrams.get(gram)
+            if lista is None:
+                return np.empty(0, dtype=np.int64)
+            candidatos = lista if candidatos is None else np.intersect1d(candidatos, lista, assume_unique=True)
+        # Os trigramas só garantem candidatos; confirma o trecho inteiro
+        return np.array([pos for pos in candidatos if termo in self._normalized[pos]], dtype=np.int64)
+
+    def search(self, query):
+        """Posições das obras cujo nome contém todas as palavras de `query`"""
+        termos = normalize_text(pd.Series([query])).iloc[0].split() if query else []
+        encontradas = np.arange(len(self.names))
+        for termo in termos:
+            achadas = self._prefix(termo) if len(termo) < NGRAM else self._substring(termo)
+            encontradas = np.intersect1d(encontradas, achadas, assume_unique=True)
+        return encontradas
+
+    def group(self, positions, column):
+        """[(valor, posições)] das obras em `positions`, agrupadas por `column` (ordem alfabética)"""
+        valores = self.groups[column][positions]
+        ordem = np.argsort(valores, kind="stable")
+        unicos, inicios = np.unique(valores[ordem], return_index=True)
+        return list(zip(unicos.tolist(), np.split(positions[ordem], inicios[1:])))
+
+    def names_at(self, positions):
+        return [self.names[pos] for pos in positions]
+
+    def positions_of(self, names):
+        """Posições das obras de `names` (nomes desconhecidos são ignorados)"""
+        return [self._positions[nome] for nome in names if nome in self._positions]
+
+
+class ProjectSelection:
+    """Obras selecionadas, guardadas como "todas" ou "nenhuma" mais as exceções.
+
+    `total` é o número de obras do índice; as posições são as de `ProjectIndex.names`.
+    """
+
+    def __init__(self, total, todas=True):
+        self.total = total
+        self.todas = todas
+        self.excecoes = set()
+
+    def __contains__(self, pos):
+        return (pos in self.excecoes) != self.todas
+
+    def __len__(self):
+        return self.total - len(self.excecoes) if self.todas else len(self.excecoes)
+
+    def _compact(self):
+        # Com mais da metade das obras como exceção, inverte a base
+        if len(self.excecoes) > self.total // 2:
+            self.excecoes = set(range(self.total)) - self.excecoes
+            self.todas = not self.todas
+
+    def add(self, positions):
+        if self.todas:
+            self.excecoes.difference_update(int(pos) for pos in positions)
+        else:
+            self.excecoes.update(int(pos) for pos in positions)
+        self._compact()
+
+    def remove(self, positions):
+        if self.todas:
+            self.excecoes.update(int(pos) for pos in positions)
+        else:
+            self.excecoes.difference_update(int(pos) for pos in positions)
+        self._compact()
+
+    def toggle(self, pos):
+        if pos in self:
+            self.remove([pos])
+        else:
+            self.add([pos])
+
+    def select_all(self):
+        self.todas = True
+        self.excecoes = set()
+
+    def clear(self):
+        self.todas = False
+        self.excecoes = set()
+
+    def positions(self):
+        """Posições selecionadas, em ordem crescente"""
+        if self.todas:
+            mascara = np.ones(self.total, dtype=bool)
+            mascara[list(self.excecoes)] = False
+            return np.flatnonzero(mascara)
+        return np.array(sorted(self.excecoes), dtype=np.int64)
@@ -0,0 +1,65 @@
+"""Regras de rateio das despesas fixas (diesel e mecânica) entre as obras.
+
+Os dashboards diferem só na regra: o `dashboard_obras.py` rateia o custo
+geral pelos lotes de todas as obras e soma a parte proporcional ao custo
+total; o `grok.py` rateia o custo da Sheet2 pelos lotes das obras iniciadas
+até 30/09/2025 e soma o custo geral inteiro. Cada regra é uma política
+registrada em `POLICIES`, escolhida pelo nome em `obras.model.build_view`.
+Os custos entram e saem das políticas em centavos (`obras.money`), somados
+da cópia em centavos do snapshot (`obras.data.money_centavos`).
+"""
+
+import pandas as pd
+
+from obras.data import money_centavos
+
+
+class AllocationPolicy:
+    """Rateio pelos lotes de todas as obras (regra do dashboard principal)"""
+
+    name = "todas"
+    label = "Todas as obras"
+
+    def base_projetos(self, df_projetos):
+        """Obras cujos lotes formam a base do rateio"""
+        return df_projetos
+
+    def custo_geral_total(self, snapshot):
+        """Custo geral (despesas fixas) a ratear, em centavos"""
+        return int(money_centavos(snapshot).df_custos_gerais["Custo Fluxo"].sum())
+
+    def custo_total(self, investimento_exec_projetos, custo_geral_total, custo_geral_proporcional):
+        """Custo total do fluxo: obras filtradas mais a parte das despesas fixas"""
+        return investimento_exec_projetos + custo_geral_proporcional
+
+
+class ObrasIniciadasPolicy(AllocationPolicy):
+    """Rateio pelos lotes das obras iniciadas até a data limite (regra do grok.py)"""
+
+    name = "obras_iniciadas"
+    label = "Obras iniciadas até 30/09/2025"
+    etapa = "3. Obras iniciadas"
+    data_limite = pd.Timestamp("2025-09-30")
+
+    def base_projetos(self, df_projetos):
+        return df_projetos[(df_projetos["Etapa"] == self.etapa) & (df_projetos["Início Obra"] <= self.data_limite)]
+
+    def custo_geral_total(self, snapshot):
+        return int(money_centavos(snapshot).df_sheet2["Custo Fluxo"].sum())
+
+    def custo_total(self, investimento_exec_projetos, custo_geral_total, custo_geral_proporcional):
+        return investimento_exec_projetos + custo_geral_total
+
+
+POLICIES = {policy.name: policy for policy in (AllocationPolicy(), ObrasIniciadasPolicy())}
+DEFAULT_POLICY = "todas"
+
+
+def get_policy(policy):
+    """Aceita o nome de uma política de POLICIES ou uma instância de AllocationPolicy"""
+    if isinstance(policy, AllocationPolicy):
+        return policy
+    try:
+        return POLICIES[policy]
+    except KeyError:
+        raise ValueError(f"Política de rateio desconhecida: {policy}. Opções: {', '.join(POLICIES)}")
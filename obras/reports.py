@@ -0,0 +1,830 @@
+"""Geração dos relatórios PDF (ReportLab) a partir de uma visão filtrada."""
+
+import importlib.util
+import pickle
+from io import BytesIO
+
+import pandas as pd
+import plotly.express as px
+from PIL import Image as PILImage
+
+from obras.cache import REPORT_CACHE, hash_inputs
+from obras.formatting import format_currency_br, format_currency_br_array
+from obras.theme import COLORS
+from obras.timing import SectionTimer
+
+# Imports para nova geração de PDF com ReportLab
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+# Imports para versão premium com Plotly
+KALEIDO_AVAILABLE = importlib.util.find_spec("kaleido") is not None
+
+# Perfis de saída: formato das imagens, resolução (DPI no tamanho impresso) e compressão do PDF.
+# Na tela o PDF sai sem compressão das páginas (geração mais rápida); impressão e e-mail comprimem.
+OUTPUT_PROFILES = {
+    "screen": {"label": "Tela", "format": "png", "optimize": False, "dpi": 230, "page_compression": 0},
+    "print": {"label": "Impressão", "format": "png", "optimize": True, "dpi": 300, "page_compression": 1},
+    "email": {"label": "E-mail", "format": "jpeg", "quality": 70, "dpi": 110, "page_compression": 1},
+}
+DEFAULT_PROFILE = "screen"
+
+
+def get_profile(profile):
+    """Aceita o nome de um perfil de OUTPUT_PROFILES ou um dict com as mesmas chaves"""
+    if isinstance(profile, dict):
+        return profile
+    try:
+        return OUTPUT_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Perfil de saída desconhecido: {profile}. Opções: {', '.join(OUTPUT_PROFILES)}")
+
+
+def _encode_raster(png_bytes, profile):
+    """Recodifica o PNG do kaleido conforme o perfil (PNG otimizado ou JPEG)"""
+    if profile["format"] == "png" and not profile.get("optimize"):
+        return png_bytes
+    img = PILImage.open(BytesIO(png_bytes))
+    out = BytesIO()
+    if profile["format"] == "jpeg":
+        img.convert("RGB").save(out, format="JPEG", quality=profile.get("quality", 75), optimize=True)
+    else:
+        img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _chart_image(fig, width, height, display_width, display_height, profile):
+    """Exporta a figura Plotly na resolução do perfil e devolve a imagem para o PDF"""
+    scale = profile["dpi"] * display_width / inch / width
+    img_bytes = _encode_raster(fig.to_image(format="png", width=width, height=height, scale=scale), profile)
+    return Image(BytesIO(img_bytes), width=display_width, height=display_height)
+
+
+# Texto fixo das observações (não depende dos filtros)
+OBSERVACOES_TEXT = """
+    <b>Considerações do fluxo financeiro:</b><br/>
+    1. Pedras com permuta<br/>
+    2. Tubos com permutas<br/>
+    3. Asfalto com permutas<br/>
+    4. Parcelamentos dos terceiros de acordo com os contratos<br/>
+    5. O Percentual incorrido é do fluxo, e não do orçamento meta<br/>
+    6. Incluído o Diesel no fluxo (Rateado)<br/>
+    7. Incluída a operação da Mecânica no fluxo (Rateado)<br/><br/>
+    
+    <b>Não considerado no fluxo:</b><br/>
+    8. Mão de obra da Abecker<br/>
+    9. Equipamentos<br/><br/>
+    """
+
+
+def _complete_styles():
+    # Estilos sem emojis
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=18, spaceAfter=20, 
+                                textColor=colors.HexColor('#00497A'), alignment=1, fontName='Helvetica-Bold')
+    
+    section_style = ParagraphStyle('Section', parent=styles['Heading2'], fontSize=14, spaceBefore=15, 
+                                  spaceAfter=10, textColor=colors.HexColor('#00497A'), fontName='Helvetica-Bold')
+    
+    return {"normal": styles['Normal'], "title": title_style, "section": section_style}
+
+
+def _kpi_table(rows, background):
+    table = Table(rows, colWidths=[4*inch, 3*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), background),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
+    ]))
+    return table
+
+
+def _cached_section(cache, name, build, estilos, *inputs):
+    """Flowables da seção `name`, tirados do cache quando as entradas não mudaram
+
+    A chave é o hash de `inputs`; os flowables ficam guardados em pickle, então
+    cada exportação recebe objetos novos (o ReportLab altera os flowables no build).
+    """
+    if cache is None:
+        return build(estilos, *inputs)
+    key = hash_inputs("complete", name, *inputs)
+    data = cache.get(key)
+    if data is not None:
+        return pickle.loads(data)
+    flowables = build(estilos, *inputs)
+    cache.put(key, pickle.dumps(flowables))
+    return flowables
+
+
+def _secao_observacoes(estilos):
+    # === TÍTULO PRINCIPAL ===
+    story = [Paragraph("Relatório de Obras", estilos["title"]), Spacer(1, 20)]
+    
+    # === OBSERVAÇÕES NO TOPO ===
+    story.append(Paragraph("Observações e Considerações", estilos["section"]))
+    story.append(Paragraph(OBSERVACOES_TEXT, estilos["normal"]))
+    return story
+
+
+def _secao_filtros(estilos, selected_obras, selected_cidades):
+    # === FILTROS APLICADOS ===
+    story = [Paragraph("Filtros Aplicados", estilos["section"])]
+    filtros_text = "<b>Filtros Aplicados:</b><br/>"
+    filtros_text += f"• <b>Obras Selecionadas:</b> {', '.join(selected_obras[:5])}{'...' if len(selected_obras) > 5 else ''}<br/>"
+    filtros_text += f"• <b>Cidades Selecionadas:</b> {', '.join(selected_cidades[:5])}{'...' if len(selected_cidades) > 5 else ''}"
+    story.append(Paragraph(filtros_text, estilos["normal"]))
+    story.append(Spacer(1, 20))
+    return story
+
+
+def _secao_kpis(estilos, total_obras, investimento_exec_projetos, media_proximos_meses_projetos,
+                saldo_projetos, total_lotes, show_cents):
+    # === KPIs PRINCIPAIS ===
+    # KPIs em formato de cards
+    kpis_principais = [
+        ['Total de Obras', str(total_obras)],
+        ['Custo Fluxo Projetos', format_currency_br(investimento_exec_projetos, show_cents)],
+        ['Média Próximos Meses (Projetos)', format_currency_br(media_proximos_meses_projetos, show_cents)],
+        ['Saldo Projetos', format_currency_br(saldo_projetos, show_cents)],
+        ['Total de Lotes', f"{total_lotes:,}".replace(",", ".")]
+    ]
+    return [
+        Paragraph("Principais Indicadores", estilos["section"]),
+        _kpi_table(kpis_principais, colors.lightblue),
+        Spacer(1, 20),
+    ]
+
+
+def _secao_custos_gerais(estilos, custo_geral_exec_proporcional, proporcao_lotes, show_cents):
+    # === CUSTOS GERAIS (DESPESAS FIXAS) ===
+    custos_gerais = [
+        ['Custo Geral Exec. (Fixas - Proporcional)', format_currency_br(custo_geral_exec_proporcional, show_cents)]
+    ]
+    if show_cents:
+        custos_gerais.append(['Proporção de Lotes', f"{proporcao_lotes:.1%}"])
+    return [
+        Paragraph("Sumário de Custos Gerais (Despesas Fixas)", estilos["section"]),
+        _kpi_table(custos_gerais, colors.lightgreen),
+        Spacer(1, 20),
+    ]
+
+
+def _secao_indicadores_totais(estilos, custo_total_fluxo_obras, custo_ago_25, custo_set_25, custo_out_25,
+                              valor_restante_pagar_media, show_cents):
+    # === INDICADORES TOTAIS ===
+    indicadores_totais = [
+        ['Custo Total do Fluxo (Geral)', format_currency_br(custo_total_fluxo_obras, show_cents)],
+        ['Custo Ago/25', format_currency_br(custo_ago_25, show_cents)],
+        ['Custo Set/25', format_currency_br(custo_set_25, show_cents)],
+        ['Custo Out/25', format_currency_br(custo_out_25, show_cents)],
+        ['Valor Restante a Pagar (Média)', format_currency_br(valor_restante_pagar_media, show_cents)]
+    ]
+    return [
+        Paragraph("Indicadores de Custos Totais", estilos["section"]),
+        _kpi_table(indicadores_totais, colors.lightyellow),
+        PageBreak(),
+    ]
+
+
+def _secao_tipologia(estilos, df_tipologia, profile, com_graficos):
+    # 1. OBRAS POR TIPOLOGIA
+    story = [Paragraph("Obras por Tipologia", estilos["section"])]
+    
+    if com_graficos:
+        tipologia_counts = df_tipologia.groupby("Tipologia").agg({"Projeto": "count", "Lotes": "sum"}).reset_index()
+        tipologia_counts.columns = ["Tipologia", "Número de Obras", "Total de Lotes"]
+        fig_tipologia = px.pie(
+            tipologia_counts,
+            values="Número de Obras",
+            names="Tipologia", 
+            title="Distribuição por Tipologia",
+            color_discrete_sequence=px.colors.sequential.Greens_r
+        )
+        fig_tipologia.update_layout(
+            title_font_size=14,
+            title_font_color=COLORS["primary"],
+            font=dict(size=10),
+            showlegend=True,
+            height=400
+        )
+        
+        story.append(_chart_image(fig_tipologia, 700, 400, 6*inch, 3*inch, profile))
+    
+    story.append(Spacer(1, 20))
+    return story
+
+
+def _secao_custo_fluxo(estilos, df_custo_fluxo, profile, com_graficos):
+    # 2. CUSTO FLUXO POR PROJETO
+    story = [Paragraph("Custo Fluxo por Projeto", estilos["section"])]
+    
+    if com_graficos:
+        grafico1 = px.bar(
+            df_custo_fluxo,
+            x="Projeto",
+            y="Custo Fluxo",
+            labels={"Custo Fluxo": "Custo (R$)"},
+            color_discrete_sequence=[COLORS["primary"]],
+            hover_data=["Lotes"]
+        )
+        grafico1.update_layout(
+            title_font_size=14,
+            title_font_color=COLORS["primary"],
+            xaxis_tickangle=-45,
+            font=dict(size=10),
+            height=500
+        )
+        
+        story.append(_chart_image(grafico1, 800, 500, 7*inch, 4*inch, profile))
+    
+    story.append(PageBreak())
+    return story
+
+
+def _secao_cronograma(estilos, gantt_data, profile, com_graficos):
+    # 3. CRONOGRAMA DAS OBRAS - CORRIGIDO
+    story = [Paragraph("Cronograma das Obras", estilos["section"])]
+    
+    if com_graficos:
+        # Preparar dados do Gantt de forma mais robusta
+        gantt_list = []
+        for _, row in gantt_data.iterrows():
+            if pd.notna(row["Início Obra"]) and pd.notna(row["Fim Obra"]):
+                inicio = pd.to_datetime(row["Início Obra"])
+                fim = pd.to_datetime(row["Fim Obra"])
+                
+                # Garantir que as datas estão em um range válido
+                if inicio < pd.to_datetime("2024-01-01"):
+                    inicio = pd.to_datetime("2024-01-01")
+                
+                gantt_list.append({
+                    'Task': row["Projeto"],
+                    'Start': inicio,
+                    'Finish': fim,
+                    'Resource': row["Projeto"]
+                })
+        
+        if gantt_list:
+            df_gantt = pd.DataFrame(gantt_list)
+            
+            # Criar gráfico Gantt com plotly
+            fig_gantt = px.timeline(
+                df_gantt, 
+                x_start="Start", 
+                x_end="Finish",
+                y="Task",
+                color="Resource",
+                title="Cronograma das Obras"
+            )
+            
+            fig_gantt.update_yaxes(autorange="reversed", title="Projetos")
+            fig_gantt.update_xaxes(title="Período")
+            fig_gantt.update_layout(
+                title_font_size=14,
+                title_font_color=COLORS["primary"],
+                font=dict(size=9),
+                height=600,
+                showlegend=False
+            )
+            
+            story.append(_chart_image(fig_gantt, 800, 600, 7*inch, 5*inch, profile))
+    
+    story.append(PageBreak())
+    return story
+
+
+def _secao_despesas_recorrentes(estilos, df_sheet2, profile, com_graficos):
+    # === DESPESAS RECORRENTES ===
+    story = [Paragraph("Despesas Recorrentes Detalhadas (Diesel e Mecânica)", estilos["section"])]
+    
+    # Gráfico de Custos Mensais da Sheet2 
+    if com_graficos:
+        monthly_data = []
+        for _, row in df_sheet2.iterrows():
+            projeto = row["Projeto"]
+            tipologia = "Diesel" if "Diesel" in str(row.get("Tipologia", "")) else "Mecânica"
+            monthly_data.extend([
+                {"Projeto": projeto, "Tipo": tipologia, "Mês": "Ago/25", "Valor": row.get("ago/25", 0)},
+                {"Projeto": projeto, "Tipo": tipologia, "Mês": "Set/25", "Valor": row.get("set/25", 0)},
+                {"Projeto": projeto, "Tipo": tipologia, "Mês": "Out/25", "Valor": row.get("out/25", 0)},
+                {"Projeto": projeto, "Tipo": tipologia, "Mês": "Média Próximos", "Valor": row.get("Média dos Próximos Meses", 0)}
+            ])
+        
+        if monthly_data:
+            df_monthly_costs = pd.DataFrame(monthly_data)
+            fig_monthly_costs_sheet2 = px.line(
+                df_monthly_costs,
+                x="Mês", 
+                y="Valor",
+                color="Tipo",
+                markers=True,
+                labels={"Valor": "Valor (R$)", "Tipo": "Tipo de Custo"},
+                color_discrete_sequence=[COLORS["support7"], COLORS["support8"]],
+                title="Custos Mensais por Tipo de Despesa"
+            )
+            fig_monthly_costs_sheet2.update_traces(mode="lines+markers", line=dict(width=3), marker=dict(size=10))
+            fig_monthly_costs_sheet2.update_layout(
+                title_font_size=14,
+                title_font_color=COLORS["primary"],
+                font=dict(size=10),
+                height=400
+            )
+            
+            story.append(_chart_image(fig_monthly_costs_sheet2, 800, 400, 7*inch, 3*inch, profile))
+    
+    story.append(PageBreak())
+    return story
+
+
+def _secao_valores_mensais(estilos, custo_ago_25, custo_set_25, custo_out_25, valor_restante_pagar_media,
+                           profile, com_graficos):
+    # Valores a Pagar por Mês
+    story = [Paragraph("Valores a Pagar por Mês", estilos["section"])]
+    if com_graficos:
+        monthly_costs = pd.DataFrame({
+            "Mês": ["Agosto/25", "Setembro/25", "Outubro/25", "Média Próximos Meses"],
+            "Valor": [custo_ago_25, custo_set_25, custo_out_25, valor_restante_pagar_media]
+        })
+        grafico_mensal = px.line(
+            monthly_costs,
+            x="Mês",
+            y="Valor",
+            labels={"Valor": "Valor (R$)"},
+            markers=True,
+            line_shape="linear",
+            title="Evolução dos Valores Mensais"
+        )
+        grafico_mensal.update_traces(
+            line=dict(color=COLORS["support7"], width=3),
+            marker=dict(size=10, color=COLORS["support8"])
+        )
+        grafico_mensal.update_layout(
+            title_font_size=14,
+            title_font_color=COLORS["primary"],
+            font=dict(size=10),
+            height=400
+        )
+        
+        story.append(_chart_image(grafico_mensal, 800, 400, 7*inch, 3*inch, profile))
+    return story
+
+
+def _secao_cidade(estilos, cidades, profile, com_graficos):
+    # Obras por Cidade
+    story = [Paragraph("Obras por Cidade", estilos["section"])]
+    if com_graficos:
+        obras_por_cidade = cidades.value_counts().reset_index()
+        obras_por_cidade.columns = ["Cidade", "Número de Obras"]
+        grafico_cidade = px.bar(
+            obras_por_cidade,
+            x="Cidade",
+            y="Número de Obras", 
+            labels={"Número de Obras": "Quantidade de Obras"},
+            color_discrete_sequence=[COLORS["support6"]],
+            title="Distribuição por Cidade"
+        )
+        grafico_cidade.update_layout(
+            title_font_size=14,
+            title_font_color=COLORS["primary"],
+            xaxis_tickangle=-45,
+            font=dict(size=10),
+            height=400
+        )
+        
+        story.append(_chart_image(grafico_cidade, 800, 400, 7*inch, 3*inch, profile))
+    return story
+
+
+def create_complete_dashboard_pdf(view, df_sheet2, timings=None, profile=DEFAULT_PROFILE, cache=REPORT_CACHE):
+    """Cria um PDF completo que replica exatamente o dashboard na tela - versão melhorada
+
+    `view` é o resultado de `obras.model.build_view` para os filtros do relatório.
+    Se `timings` for um dict, recebe o tempo gasto em cada seção. `profile` escolhe
+    um dos OUTPUT_PROFILES (formato e resolução dos gráficos, compressão do PDF).
+    Cada seção é guardada em `cache` (um `obras.cache.SectionCache`; None desliga)
+    e só é renderizada de novo quando as suas entradas mudam.
+    """
+    
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("ReportLab não está instalado.")
+    
+    selected_obras = view["selected_obras"]
+    selected_cidades = view["selected_cidades"]
+    show_cents = view["show_cents"]
+    df_filtered_projetos = view["df_filtered_projetos"]
+    kpis = view["kpis"]
+    profile = get_profile(profile)
+    timer = SectionTimer(timings)
+    
+    buffer = BytesIO()
+    
+    # Configurar documento
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        pageCompression=profile["page_compression"]
+    )
+    
+    estilos = _complete_styles()
+    story = []
+    
+    timer.lap("setup")
+    
+    story.extend(_cached_section(cache, "observacoes", _secao_observacoes, estilos))
+    # Data de geração fica fora do cache
+    info_text = """
+    <b>Informações do Relatório:</b><br/>
+    • Relatório gerado em: {data_geracao}<br/>
+    • Filtros aplicados preservados<br/>
+    • Todos os gráficos e dados do dashboard incluídos
+    """.format(data_geracao=pd.Timestamp.now().strftime('%d/%m/%Y às %H:%M'))
+    story.append(Paragraph(info_text, estilos["normal"]))
+    story.append(Spacer(1, 20))
+    
+    timer.lap("observacoes")
+    
+    story.extend(_cached_section(cache, "filtros", _secao_filtros, estilos, selected_obras, selected_cidades))
+    timer.lap("filtros")
+    
+    story.extend(_cached_section(
+        cache, "kpis", _secao_kpis, estilos,
+        kpis["total_obras"], kpis["investimento_exec_projetos"], kpis["media_proximos_meses_projetos"],
+        kpis["saldo_projetos"], kpis["total_lotes"], show_cents
+    ))
+    timer.lap("kpis")
+    
+    story.extend(_cached_section(
+        cache, "custos_gerais", _secao_custos_gerais, estilos,
+        kpis["custo_geral_exec_proporcional"], kpis["proporcao_lotes"], show_cents
+    ))
+    timer.lap("custos_gerais")
+    
+    story.extend(_cached_section(
+        cache, "indicadores_totais", _secao_indicadores_totais, estilos,
+        kpis["custo_total_fluxo_obras"], kpis["custo_ago_25"], kpis["custo_set_25"], kpis["custo_out_25"],
+        kpis["valor_restante_pagar_media"], show_cents
+    ))
+    timer.lap("indicadores_totais")
+    
+    # === GRÁFICOS PRINCIPAIS ===
+    if not df_filtered_projetos.empty:
+        story.extend(_cached_section(
+            cache, "tipologia", _secao_tipologia, estilos,
+            df_filtered_projetos[["Tipologia", "Projeto", "Lotes"]], profile, KALEIDO_AVAILABLE
+        ))
+        timer.lap("tipologia")
+        
+        story.extend(_cached_section(
+            cache, "custo_fluxo", _secao_custo_fluxo, estilos,
+            df_filtered_projetos[["Projeto", "Custo Fluxo", "Lotes"]], profile, KALEIDO_AVAILABLE
+        ))
+        timer.lap("custo_fluxo")
+        
+        gantt_data = df_filtered_projetos[["Projeto", "Início Obra", "Fim Obra"]].dropna()
+        if not gantt_data.empty:
+            story.extend(_cached_section(
+                cache, "cronograma", _secao_cronograma, estilos, gantt_data, profile, KALEIDO_AVAILABLE
+            ))
+    
+    timer.lap("cronograma")
+    
+    if not df_sheet2.empty:
+        story.extend(_cached_section(
+            cache, "despesas_recorrentes", _secao_despesas_recorrentes, estilos, df_sheet2, profile, KALEIDO_AVAILABLE
+        ))
+    
+    timer.lap("despesas_recorrentes")
+    
+    # === OUTROS GRÁFICOS ===
+    if not df_filtered_projetos.empty:
+        story.extend(_cached_section(
+            cache, "valores_mensais", _secao_valores_mensais, estilos,
+            kpis["custo_ago_25"], kpis["custo_set_25"], kpis["custo_out_25"], kpis["valor_restante_pagar_media"],
+            profile, KALEIDO_AVAILABLE
+        ))
+        timer.lap("valores_mensais")
+        
+        story.extend(_cached_section(
+            cache, "cidade", _secao_cidade, estilos, df_filtered_projetos["Cidade"], profile, KALEIDO_AVAILABLE
+        ))
+    
+    timer.lap("cidade")
+    
+    # Construir PDF
+    doc.build(story)
+    timer.lap("build")
+    
+    buffer.seek(0)
+    return buffer
+
+# Função para criar PDF do dashboard usando ReportLab (versão profissional)
+def create_professional_pdf_report(view, df_sheet2, timings=None, profile=DEFAULT_PROFILE):
+    """Cria um relatório PDF profissional com ReportLab - melhor formatação e layout"""
+    
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("ReportLab não está instalada.")
+    
+    selected_obras = view["selected_obras"]
+    selected_cidades = view["selected_cidades"]
+    show_cents = view["show_cents"]
+    df_filtered_projetos = view["df_filtered_projetos"]
+    kpis = view["kpis"]
+    profile = get_profile(profile)
+    timer = SectionTimer(timings)
+    
+    buffer = BytesIO()
+    
+    # Configurar documento
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch,
+        pageCompression=profile["page_compression"]
+    )
+    
+    # Estilos
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=20,
+        spaceAfter=30,
+        textColor=colors.HexColor('#00497A'),
+        alignment=1  # Center
+    )
+    
+    section_style = ParagraphStyle(
+        'SectionHeader',
+        parent=styles['Heading3'],
+        fontSize=14,
+        spaceBefore=20,
+        spaceAfter=10,
+        textColor=colors.HexColor('#00497A'),
+        fontName='Helvetica-Bold'
+    )
+    
+    # Lista de elementos do documento
+    story = []
+    
+    timer.lap("setup")
+    
+    # Título principal
+    story.append(Paragraph("📊 Dashboard de Obras - Relatório Executivo", title_style))
+    story.append(Spacer(1, 20))
+    
+    # Informações dos filtros
+    filtros_text = "<b>Filtros Aplicados:</b><br/>"
+    filtros_text += f"• Obras: {', '.join(selected_obras[:5])}{'...' if len(selected_obras) > 5 else ''}<br/>"
+    filtros_text += f"• Cidades: {', '.join(selected_cidades[:5])}{'...' if len(selected_cidades) > 5 else ''}"
+    story.append(Paragraph(filtros_text, styles['Normal']))
+    story.append(Spacer(1, 30))
+    
+    timer.lap("filtros")
+    
+    # KPIs Principais em tabela estilizada
+    story.append(Paragraph("📊 Principais Indicadores", section_style))
+    
+    kpis_data = [
+        ['Indicador', 'Valor'],
+        ['🏗️ Total de Obras', str(kpis["total_obras"])],
+        ['💰 Custo Fluxo Projetos', format_currency_br(kpis["investimento_exec_projetos"], show_cents)],
+        ['🏘️ Total de Lotes', f"{kpis['total_lotes']:,}".replace(",", ".")],
+        ['💸 Saldo Projetos', format_currency_br(kpis["saldo_projetos"], show_cents)],
+        ['📈 Média Próximos Meses', format_currency_br(kpis["media_proximos_meses_projetos"], show_cents)],
+        ['⚙️ Custo Geral (Proporcional)', format_currency_br(kpis["custo_geral_exec_proporcional"], show_cents)]
+    ]
+    
+    kpis_table = Table(kpis_data, colWidths=[3*inch, 2.5*inch])
+    kpis_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#00497A')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+    ]))
+    
+    story.append(kpis_table)
+    story.append(Spacer(1, 30))
+    
+    timer.lap("kpis")
+    
+    # Indicadores de Custos Mensais
+    story.append(Paragraph("💰 Valores Mensais", section_style))
+    
+    custos_mensais_data = [
+        ['Mês', 'Valor'],
+        ['Agosto/25', format_currency_br(kpis["custo_ago_25"], show_cents)],
+        ['Setembro/25', format_currency_br(kpis["custo_set_25"], show_cents)],
+        ['Outubro/25', format_currency_br(kpis["custo_out_25"], show_cents)],
+        ['Custo Total do Fluxo', format_currency_br(kpis["custo_total_fluxo_obras"], show_cents)]
+    ]
+    
+    custos_table = Table(custos_mensais_data, colWidths=[2.5*inch, 3*inch])
+    custos_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#008DDE')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightcyan])
+    ]))
+    
+    story.append(custos_table)
+    story.append(PageBreak())
+    
+    timer.lap("valores_mensais")
+    
+    # Tabela detalhada das obras
+    if not df_filtered_projetos.empty:
+        story.append(Paragraph("📋 Tabela Detalhada das Obras", section_style))
+        
+        # Preparar dados da tabela
+        table_columns = ['Projeto', 'Cidade', 'Tipologia', 'Custo Fluxo', 'Saldo', 'Lotes']
+        existing_columns = [col for col in table_columns if col in df_filtered_projetos.columns]
+        
+        # Cabeçalho da tabela
+        table_data = [existing_columns]
+        
+        # Dados das obras, formatados coluna a coluna
+        colunas_texto = []
+        for col in existing_columns:
+            if col in ['Custo Fluxo', 'Saldo']:
+                colunas_texto.append(format_currency_br_array(df_filtered_projetos[col], False).tolist())
+            elif col == 'Lotes':
+                colunas_texto.append([f"{valor:,.0f}".replace(",", ".") for valor in df_filtered_projetos[col]])
+            else:
+                textos = df_filtered_projetos[col].map(str)
+                colunas_texto.append([texto[:20] + "..." if len(texto) > 20 else texto for texto in textos])
+        table_data.extend(list(linha) for linha in zip(*colunas_texto))
+        
+        # Dividir tabela em páginas se necessário
+        rows_per_page = 20
+        for page_num, start_idx in enumerate(range(0, len(table_data)-1, rows_per_page)):
+            end_idx = min(start_idx + rows_per_page, len(table_data)-1)
+            
+            if page_num > 0:
+                story.append(PageBreak())
+                story.append(Paragraph(f"📋 Tabela Detalhada das Obras (Continuação - Página {page_num + 1})", section_style))
+            
+            page_data = [table_data[0]] + table_data[start_idx+1:end_idx+1]
+            
+            obras_table = Table(page_data, repeatRows=1)
+            obras_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('FONTSIZE', (0, 1), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ]))
+            
+            story.append(obras_table)
+            story.append(Spacer(1, 20))
+    
+    timer.lap("tabela_obras")
+    
+    # Gráfico de Custo Fluxo usando ReportLab Charts
+    if not df_filtered_projetos.empty and len(df_filtered_projetos) <= 10:
+        story.append(PageBreak())
+        story.append(Paragraph("📊 Custo Fluxo por Projeto", section_style))
+        
+        # Criar gráfico de barras com ReportLab
+        drawing = Drawing(400, 300)
+        
+        chart = VerticalBarChart()
+        chart.x = 50
+        chart.y = 50
+        chart.height = 200
+        chart.width = 300
+        
+        # Dados do gráfico
+        projetos_nomes = df_filtered_projetos['Projeto'].tolist()[:10]  # Máximo 10 projetos
+        projetos_valores = df_filtered_projetos['Custo Fluxo'].tolist()[:10]
+        
+        chart.data = [projetos_valores]
+        chart.categoryAxis.categoryNames = [nome[:15] + "..." if len(nome) > 15 else nome for nome in projetos_nomes]
+        chart.categoryAxis.labels.angle = 45
+        chart.categoryAxis.labels.fontSize = 8
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.valueMax = max(projetos_valores) * 1.1
+        
+        # Cores
+        chart.bars[0].fillColor = colors.HexColor('#00497A')
+        chart.bars[0].strokeColor = colors.HexColor('#00497A')
+        
+        drawing.add(chart)
+        story.append(drawing)
+        story.append(Spacer(1, 30))
+    
+    timer.lap("custo_fluxo")
+    
+    # Tabela da Sheet2 (Despesas Fixas)
+    if not df_sheet2.empty:
+        story.append(PageBreak())
+        story.append(Paragraph("⛽ Despesas Fixas Detalhadas", section_style))
+        
+        sheet2_data = [['Projeto', 'Tipologia', 'Custo Fluxo', 'Ago/25', 'Set/25', 'Out/25']]
+        
+        def _coluna(nome, padrao):
+            return df_sheet2[nome] if nome in df_sheet2.columns else pd.Series(padrao, index=df_sheet2.index)
+        
+        colunas_texto = [
+            [str(valor)[:20] for valor in _coluna('Projeto', '')],
+            [str(valor)[:15] for valor in _coluna('Tipologia', '')],
+        ] + [format_currency_br_array(_coluna(col, 0), False).tolist() for col in ['Custo Fluxo', 'ago/25', 'set/25', 'out/25']]
+        sheet2_data.extend(list(linha) for linha in zip(*colunas_texto))
+        
+        sheet2_table = Table(sheet2_data, repeatRows=1)
+        sheet2_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#70AD47')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgreen])
+        ]))
+        
+        story.append(sheet2_table)
+    
+    timer.lap("tabela_sheet2")
+    
+    # Rodapé com informações adicionais
+    story.append(PageBreak())
+    story.append(Paragraph("📝 Observações e Considerações", section_style))
+    
+    observacoes_text = """
+    <b>Considerações do fluxo financeiro:</b><br/>
+    1. Pedras com permuta<br/>
+    2. Tubos com permutas<br/>
+    3. Asfalto com permutas<br/>
+    4. Parcelamentos dos terceiros de acordo com os contratos<br/>
+    5. O Percentual incorrido é do fluxo, e não do orçamento meta<br/>
+    6. Incluído o Diesel no fluxo (Rateado)<br/>
+    7. Incluída a operação da Mecânica no fluxo (Rateado)<br/><br/>
+    
+    <b>Não considerado no fluxo:</b><br/>
+    8. Mão de obra da Abecker<br/>
+    9. Equipamentos
+    """
+    
+    story.append(Paragraph(observacoes_text, styles['Normal']))
+    
+    # Informações de geração do relatório
+    story.append(Spacer(1, 30))
+    footer_text = f"<i>Relatório gerado em {pd.Timestamp.now().strftime('%d/%m/%Y às %H:%M')}</i>"
+    story.append(Paragraph(footer_text, styles['Italic']))
+    
+    timer.lap("observacoes")
+    
+    # Construir PDF
+    doc.build(story)
+    timer.lap("build")
+    
+    buffer.seek(0)
+    return buffer
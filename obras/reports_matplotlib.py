@@ -0,0 +1,669 @@
+"""Relatório PDF em várias páginas gerado com matplotlib (PdfPages).
+
+Cada página é desenhada por uma função independente (`_page_*`), o que
+permite renderizar as páginas em paralelo, cada uma em um PDF próprio, e
+depois juntá-las na ordem original com o pypdf. As páginas renderizadas
+assim ficam no cache de seções (`obras.cache`), com a chave formada pelos
+dados que cada página usa. Em série e sem nenhuma página em cache, o
+relatório sai de uma vez só, sem a junção (mais rápida e com arquivo menor).
+"""
+
+import atexit
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")  # Use non-interactive backend
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+import numpy as np
+import pandas as pd
+
+from obras.cache import REPORT_CACHE, hash_inputs
+from obras.formatting import format_currency_br, format_currency_br_array
+from obras.theme import ALL_GANTT_COLORS, COLORS
+from obras.timing import SectionTimer
+
+# Junção dos PDFs gerados em paralelo
+try:
+    from pypdf import PdfReader, PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+# Linhas por página nas tabelas
+CHUNK_SIZE = 25
+CHUNK_SIZE_EXTENDED = 15
+
+ALL_DISPLAY_COLUMNS = [
+    "ID", "Empresa desenvolvedora", "Sócia", "Projeto", "Tipologia", "Cidade", "UF", "Etapa",
+    "Custo Raso Meta", "Custo Fluxo", "Percentual Incorrido do Fluxo%", "ago/25", "set/25", "out/25",
+    "Média dos Próximos Meses", "Saldo", "Índice Ômega", "% Avanço Físico", "%Avanço Financeiro",
+    "Tempo de Obra", "Início Obra", "Fim Obra", "Meses Restantes Pós Out/25", "Lotes"
+]
+
+
+def _setup_matplotlib():
+    # Configurar matplotlib para português
+    plt.rcParams["font.family"] = "DejaVu Sans"
+    plt.rcParams["font.size"] = 8
+
+
+def _save(pdf, fig):
+    plt.tight_layout()
+    pdf.savefig(fig, bbox_inches="tight")
+    plt.close(fig)
+
+
+def _reais(valores):
+    """Rótulos 'R$ 1.234' para uma sequência de valores"""
+    return [f"R$ {v:,.0f}".replace(",", ".") for v in valores]
+
+
+def _page_kpis(pdf, view, df_sheet2):
+    # Página 1: KPIs Principais e Filtros Aplicados
+    selected_obras = view["selected_obras"]
+    selected_cidades = view["selected_cidades"]
+    show_cents = view["show_cents"]
+    kpis = view["kpis"]
+
+    fig = plt.figure(figsize=(11, 8))
+    fig.suptitle("Dashboard de Obras - Relatório Completo", fontsize=16, fontweight="bold")
+
+    # Informações dos filtros aplicados
+    gs = fig.add_gridspec(4, 3, height_ratios=[0.5, 1, 1, 0.3])
+
+    # Filtros aplicados
+    ax_filtros = fig.add_subplot(gs[0, :])
+    ax_filtros.axis("off")
+    filtros_text = f"Filtros Aplicados:\nObras: {', '.join(selected_obras[:3])}{'...' if len(selected_obras) > 3 else ''}\n"
+    filtros_text += f"Cidades: {', '.join(selected_cidades[:3])}{'...' if len(selected_cidades) > 3 else ''}"
+    ax_filtros.text(0.5, 0.5, filtros_text, ha="center", va="center", fontsize=10,
+                   bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.7))
+
+    # KPIs principais (2x3 grid)
+    kpis_data = [
+        ("Total de Obras", kpis["total_obras"], "lightblue"),
+        ("Custo Fluxo Projetos", format_currency_br(kpis["investimento_exec_projetos"], show_cents), "lightgreen"),
+        ("Total de Lotes", f"{kpis['total_lotes']:,}".replace(",", "."), "lightyellow"),
+        ("Saldo Projetos", format_currency_br(kpis["saldo_projetos"], show_cents), "lightcoral"),
+        ("Média Próximos Meses", format_currency_br(kpis["media_proximos_meses_projetos"], show_cents), "lightpink"),
+        ("Custo Geral (Proporcional)", format_currency_br(kpis["custo_geral_exec_proporcional"], show_cents), "lightcyan")
+    ]
+
+    for i, (label, valor, cor) in enumerate(kpis_data):
+        row, col = divmod(i, 3)
+        ax = fig.add_subplot(gs[row + 1, col])
+        ax.text(0.5, 0.5, f"{label}\n{valor}", ha="center", va="center", fontsize=12,
+                fontweight="bold", bbox=dict(boxstyle="round,pad=0.3", facecolor=cor))
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis("off")
+
+    # Indicadores de custos totais na parte inferior
+    ax_custos_totais = fig.add_subplot(gs[3, :])
+    ax_custos_totais.axis("off")
+    custos_text = f"Indicadores Totais: Custo Total Fluxo: {format_currency_br(kpis['custo_total_fluxo_obras'], show_cents)} | "
+    custos_text += f"Ago/25: {format_currency_br(kpis['custo_ago_25'], show_cents)} | "
+    custos_text += f"Set/25: {format_currency_br(kpis['custo_set_25'], show_cents)} | "
+    custos_text += f"Out/25: {format_currency_br(kpis['custo_out_25'], show_cents)}"
+    ax_custos_totais.text(0.5, 0.5, custos_text, ha="center", va="center", fontsize=9,
+                        bbox=dict(boxstyle="round,pad=0.3", facecolor="lavender"))
+
+    _save(pdf, fig)
+
+
+def _page_custo_fluxo(pdf, view, df_sheet2):
+    # Página 2: Custo Fluxo por Projeto
+    df_filtered_projetos = view["df_filtered_projetos"]
+    fig, ax = plt.subplots(figsize=(11, 8))
+    projetos = df_filtered_projetos["Projeto"].tolist()
+    custos = df_filtered_projetos["Custo Fluxo"].to_numpy()
+
+    bars = ax.bar(np.arange(len(projetos)), custos, color=COLORS["primary"])
+    ax.set_xlabel("Projetos", fontweight="bold")
+    ax.set_ylabel("Custo (R$)", fontweight="bold")
+    ax.set_title("Custo Fluxo por Projeto", fontsize=14, fontweight="bold")
+    ax.set_xticks(np.arange(len(projetos)))
+    ax.set_xticklabels(projetos, rotation=45, ha="right")
+
+    # Adicionar valores nas barras (todos os rótulos de uma vez)
+    ax.bar_label(bars, labels=_reais(custos), fontsize=8)
+
+    # Formatação do eixo y
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+    _save(pdf, fig)
+
+
+def _page_tipologia_saldo(pdf, view, df_sheet2):
+    # Página 3: Distribuição por Tipologia e Saldo
+    df_filtered_projetos = view["df_filtered_projetos"]
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11, 8))
+    fig.suptitle("Distribuição por Tipologia e Saldo por Projeto", fontsize=14, fontweight="bold")
+
+    # Gráfico de tipologia
+    tipologia_counts = df_filtered_projetos["Tipologia"].value_counts()
+    if not tipologia_counts.empty:
+        ax1.pie(tipologia_counts.values, labels=tipologia_counts.index, autopct="%1.1f%%", startangle=90)
+        ax1.set_title("Obras por Tipologia")
+
+    # Gráfico de saldo por projeto
+    saldo_por_projeto = df_filtered_projetos.groupby("Projeto")["Saldo"].sum().reset_index()
+    saldo_por_projeto = saldo_por_projeto[saldo_por_projeto["Saldo"] > 0]
+
+    if not saldo_por_projeto.empty:
+        ax2.pie(saldo_por_projeto["Saldo"], labels=saldo_por_projeto["Projeto"], autopct="%1.1f%%", startangle=90)
+        ax2.set_title("Saldo por Projeto")
+    else:
+        ax2.text(0.5, 0.5, "Não há dados de saldo\npara exibir", ha="center", va="center")
+        ax2.set_xlim(0, 1)
+        ax2.set_ylim(0, 1)
+
+    _save(pdf, fig)
+
+
+def _gantt_data(df_filtered_projetos):
+    return df_filtered_projetos[["Projeto", "Início Obra", "Fim Obra"]].dropna()
+
+
+def _page_cronograma(pdf, view, df_sheet2):
+    # Página 4: Cronograma (Gantt) das Obras
+    gantt_data = _gantt_data(view["df_filtered_projetos"])
+    fig, ax = plt.subplots(figsize=(11, 8))
+
+    # Filtrar para começar a visualização em 2024
+    inicio = gantt_data["Início Obra"].clip(lower=pd.Timestamp("2024-01-01"))
+    fim = gantt_data["Fim Obra"]
+
+    # Uma única chamada barh para todas as obras
+    n = len(gantt_data)
+    cores = [ALL_GANTT_COLORS[i % len(ALL_GANTT_COLORS)] for i in range(n)]
+    ax.barh(np.arange(n), (fim - inicio).dt.days.to_numpy(), left=mdates.date2num(inicio), color=cores, alpha=0.7)
+    ax.xaxis_date()
+
+    ax.set_yticks(np.arange(n))
+    ax.set_yticklabels(gantt_data["Projeto"], fontsize=8)
+    ax.set_xlabel("Timeline", fontweight="bold")
+    ax.set_title("Cronograma das Obras", fontsize=14, fontweight="bold")
+
+    # Formatação das datas
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%Y'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=3))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+
+    _save(pdf, fig)
+
+
+def _page_valores_mensais(pdf, view, df_sheet2):
+    # Página 5: Valores Mensais e Despesas Fixas
+    kpis = view["kpis"]
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(11, 8))
+    fig.suptitle("Valores Mensais e Despesas Fixas", fontsize=14, fontweight="bold")
+
+    # Gráfico de valores mensais
+    meses = ["Ago/25", "Set/25", "Out/25", "Média Próximos"]
+    valores_mensais = [kpis["custo_ago_25"], kpis["custo_set_25"], kpis["custo_out_25"], kpis["valor_restante_pagar_media"]]
+
+    ax1.plot(meses, valores_mensais, marker='o', linewidth=3, markersize=8, color=COLORS["support7"])
+    ax1.set_title("Valores a Pagar por Mês")
+    ax1.set_ylabel("Valor (R$)")
+    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+
+    # Adicionar valores nos pontos
+    for i, valor in enumerate(valores_mensais):
+        ax1.annotate(format_currency_br(valor, False), (i, valor),
+                    textcoords="offset points", xytext=(0,10), ha='center')
+
+    # Gráfico de despesas fixas (se houver dados da Sheet2)
+    if not df_sheet2.empty:
+        diesel_data = df_sheet2[df_sheet2["Tipologia"].str.contains("Diesel", na=False)]
+        mecanica_data = df_sheet2[df_sheet2["Tipologia"].str.contains("Mecanica", na=False)]
+
+        despesas_labels = []
+        despesas_valores = []
+
+        if not diesel_data.empty:
+            despesas_labels.append("Diesel")
+            despesas_valores.append(diesel_data["Custo Fluxo"].iloc[0])
+
+        if not mecanica_data.empty:
+            despesas_labels.append("Mecânica")
+            despesas_valores.append(mecanica_data["Custo Fluxo"].iloc[0])
+
+        if despesas_labels:
+            bars = ax2.bar(despesas_labels, despesas_valores, color=[COLORS["support7"], COLORS["support8"]])
+            ax2.set_title("Despesas Fixas (Diesel e Mecânica)")
+            ax2.set_ylabel("Valor (R$)")
+            ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+
+            # Adicionar valores nas barras
+            ax2.bar_label(bars, labels=[format_currency_br(v, False) for v in despesas_valores], fontweight="bold")
+    else:
+        ax2.text(0.5, 0.5, "Não há dados de despesas fixas\npara exibir",
+                ha="center", va="center", transform=ax2.transAxes)
+
+    _save(pdf, fig)
+
+
+def _page_cidade_empresa(pdf, view, df_sheet2):
+    # Página 6: Obras por Cidade e Empresa
+    df_filtered_projetos = view["df_filtered_projetos"]
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(11, 8))
+    fig.suptitle("Distribuição por Cidade e Empresa", fontsize=14, fontweight="bold")
+
+    # Obras por cidade
+    obras_por_cidade = df_filtered_projetos["Cidade"].value_counts()
+    if not obras_por_cidade.empty:
+        ax1.bar(obras_por_cidade.index, obras_por_cidade.values, color=COLORS["support6"])
+        ax1.set_title("Número de Obras por Cidade")
+        ax1.set_xlabel("Cidade")
+        ax1.set_ylabel("Número de Obras")
+        plt.setp(ax1.get_xticklabels(), rotation=45, ha="right")
+
+    # Custo médio por empresa
+    if "Empresa desenvolvedora" in df_filtered_projetos.columns:
+        empresa_custo = df_filtered_projetos.groupby("Empresa desenvolvedora")["Custo Fluxo"].mean()
+        if not empresa_custo.empty:
+            ax2.bar(empresa_custo.index, empresa_custo.values, color=COLORS["support5"])
+            ax2.set_title("Custo Fluxo Médio por Empresa Desenvolvedora")
+            ax2.set_xlabel("Empresa")
+            ax2.set_ylabel("Custo Médio (R$)")
+            ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+            plt.setp(ax2.get_xticklabels(), rotation=45, ha="right")
+
+    _save(pdf, fig)
+
+
+def _format_percent(serie):
+    return serie.map(lambda x: f"{x:.1f}%" if pd.notna(x) else "N/A")
+
+
+def _page_tabela_obras(pdf, view, df_sheet2, chunk_num, start_idx, end_idx):
+    # Página 7: Tabela Detalhada das Obras (Principal) - um bloco de CHUNK_SIZE linhas
+    df_filtered_projetos = view["df_filtered_projetos"]
+    colunas_tabela = ["Projeto", "Cidade", "Tipologia", "Custo Fluxo", "Saldo", "Lotes", "% Avanço Físico"]
+
+    # Filtrar apenas colunas que existem
+    colunas_existentes = [col for col in colunas_tabela if col in df_filtered_projetos.columns]
+
+    # Formata apenas as linhas desta página
+    chunk_data = df_filtered_projetos[colunas_existentes].iloc[start_idx:end_idx].copy()
+
+    # Formatação das colunas monetárias
+    for col in ["Custo Fluxo", "Saldo"]:
+        if col in chunk_data.columns:
+            chunk_data[col] = format_currency_br_array(chunk_data[col], False)
+
+    # Formatação da coluna de lotes
+    if "Lotes" in chunk_data.columns:
+        chunk_data["Lotes"] = chunk_data["Lotes"].apply(lambda x: f"{x:,}".replace(",", "."))
+
+    # Formatação da coluna de avanço físico
+    if "% Avanço Físico" in chunk_data.columns:
+        chunk_data["% Avanço Físico"] = _format_percent(chunk_data["% Avanço Físico"])
+
+    fig, ax = plt.subplots(figsize=(11, 8))
+    ax.axis("tight")
+    ax.axis("off")
+
+    table = ax.table(cellText=chunk_data.values, colLabels=chunk_data.columns,
+                   cellLoc="center", loc="center")
+
+    table.auto_set_font_size(False)
+    table.set_fontsize(7)
+    table.scale(1.0, 1.2)
+
+    # Colorir cabeçalho
+    for i in range(len(chunk_data.columns)):
+        table[(0, i)].set_facecolor('#4472C4')
+        table[(0, i)].set_text_props(weight='bold', color='white')
+
+    titulo_pagina = f"Tabela Detalhada das Obras - Página {chunk_num + 1}"
+    if len(df_filtered_projetos) > CHUNK_SIZE:
+        titulo_pagina += f" (Linhas {start_idx + 1} a {end_idx})"
+
+    ax.set_title(titulo_pagina, fontsize=12, fontweight="bold", pad=20)
+
+    _save(pdf, fig)
+
+
+def _page_tabela_sheet2(pdf, view, df_sheet2):
+    # Página 8: Tabela de Despesas Fixas (Sheet2)
+    fig, ax = plt.subplots(figsize=(11, 8))
+    ax.axis("tight")
+    ax.axis("off")
+
+    # Preparar dados da Sheet2 para exibição
+    df_sheet2_display = df_sheet2.copy()
+
+    # Formatação das colunas monetárias da Sheet2
+    cols_monetarias_sheet2 = ["Custo Fluxo", "ago/25", "set/25", "out/25", "Média dos Próximos Meses"]
+    for col in cols_monetarias_sheet2:
+        if col in df_sheet2_display.columns:
+            df_sheet2_display[col] = format_currency_br_array(df_sheet2_display[col], False)
+
+    # Selecionar colunas mais relevantes para o PDF
+    colunas_sheet2 = ["Projeto", "Tipologia", "Custo Fluxo", "ago/25", "set/25", "out/25"]
+    colunas_sheet2_existentes = [col for col in colunas_sheet2 if col in df_sheet2_display.columns]
+
+    if colunas_sheet2_existentes:
+        df_sheet2_filtered = df_sheet2_display[colunas_sheet2_existentes]
+
+        table = ax.table(cellText=df_sheet2_filtered.values,
+                       colLabels=df_sheet2_filtered.columns,
+                       cellLoc="center", loc="center")
+
+        table.auto_set_font_size(False)
+        table.set_fontsize(9)
+        table.scale(1.2, 1.5)
+
+        # Colorir cabeçalho
+        for i in range(len(df_sheet2_filtered.columns)):
+            table[(0, i)].set_facecolor('#70AD47')
+            table[(0, i)].set_text_props(weight='bold', color='white')
+
+    ax.set_title("Despesas Fixas Detalhadas (Diesel e Mecânica)",
+                fontsize=12, fontweight="bold", pad=20)
+
+    _save(pdf, fig)
+
+
+def _page_estatisticas(pdf, view, df_sheet2):
+    # Página 9: Estatísticas Complementares
+    df_filtered_projetos = view["df_filtered_projetos"]
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(11, 8))
+    fig.suptitle("Estatísticas Complementares", fontsize=14, fontweight="bold")
+
+    # Percentual de avanço físico por projeto
+    if "% Avanço Físico" in df_filtered_projetos.columns:
+        avanco_fisico = df_filtered_projetos[df_filtered_projetos["% Avanço Físico"] > 0]
+        if not avanco_fisico.empty:
+            ax1.bar(np.arange(len(avanco_fisico)), avanco_fisico["% Avanço Físico"],
+                   color=COLORS["support1"], alpha=0.7)
+            ax1.set_title("% Avanço Físico por Projeto")
+            ax1.set_ylabel("Avanço (%)")
+            ax1.set_xticks(np.arange(len(avanco_fisico)))
+            ax1.set_xticklabels([proj[:15] + "..." if len(proj) > 15 else proj
+                                for proj in avanco_fisico["Projeto"]],
+                               rotation=45, ha="right", fontsize=8)
+
+    # Distribuição de lotes por tipologia
+    if "Tipologia" in df_filtered_projetos.columns and "Lotes" in df_filtered_projetos.columns:
+        lotes_por_tip = df_filtered_projetos.groupby("Tipologia")["Lotes"].sum()
+        if not lotes_por_tip.empty:
+            ax2.pie(lotes_por_tip.values, labels=lotes_por_tip.index, autopct="%1.1f%%")
+            ax2.set_title("Distribuição de Lotes por Tipologia")
+
+    # Tempo de obra vs Custo (scatter plot)
+    if "Tempo de Obra" in df_filtered_projetos.columns:
+        tempo_obra = df_filtered_projetos[df_filtered_projetos["Tempo de Obra"] > 0]
+        if not tempo_obra.empty:
+            ax3.scatter(tempo_obra["Tempo de Obra"], tempo_obra["Custo Fluxo"],
+                      color=COLORS["support3"], alpha=0.6, s=60)
+            ax3.set_xlabel("Tempo de Obra (meses)")
+            ax3.set_ylabel("Custo Fluxo (R$)")
+            ax3.set_title("Relação Tempo vs Custo")
+            ax3.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+
+    # Saldo restante por etapa
+    if "Etapa" in df_filtered_projetos.columns:
+        saldo_por_etapa = df_filtered_projetos.groupby("Etapa")["Saldo"].sum()
+        saldo_por_etapa = saldo_por_etapa[saldo_por_etapa > 0]
+        if not saldo_por_etapa.empty:
+            ax4.bar(saldo_por_etapa.index, saldo_por_etapa.values, color=COLORS["support2"])
+            ax4.set_title("Saldo Restante por Etapa")
+            ax4.set_ylabel("Saldo (R$)")
+            ax4.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"R$ {x:,.0f}".replace(",", ".")))
+            plt.setp(ax4.get_xticklabels(), rotation=45, ha="right")
+
+    _save(pdf, fig)
+
+
+def _colunas_tabela_completa(df_filtered_projetos):
+    return [col for col in ALL_DISPLAY_COLUMNS if col in df_filtered_projetos.columns]
+
+
+def _page_tabela_completa(pdf, view, df_sheet2, chunk_num, start_idx, end_idx):
+    # Página 10: Tabela Completa com Todas as Colunas - um bloco de CHUNK_SIZE_EXTENDED linhas
+    df_filtered_projetos = view["df_filtered_projetos"]
+    colunas_existentes_completas = _colunas_tabela_completa(df_filtered_projetos)
+    chunk_data = df_filtered_projetos[colunas_existentes_completas].iloc[start_idx:end_idx].copy()
+
+    # Formatação das colunas
+    currency_cols = ["Custo Raso Meta", "Custo Fluxo", "ago/25", "set/25", "out/25",
+                   "Média dos Próximos Meses", "Saldo"]
+    for col in currency_cols:
+        if col in chunk_data.columns:
+            chunk_data[col] = format_currency_br_array(chunk_data[col], False)
+
+    # Formatação de percentuais
+    percent_cols = ["Percentual Incorrido do Fluxo%", "% Avanço Físico", "%Avanço Financeiro"]
+    for col in percent_cols:
+        if col in chunk_data.columns:
+            chunk_data[col] = _format_percent(chunk_data[col])
+
+    # Formatação de datas
+    date_cols = ["Início Obra", "Fim Obra"]
+    for col in date_cols:
+        if col in chunk_data.columns:
+            chunk_data[col] = pd.to_datetime(chunk_data[col], errors="coerce").dt.strftime('%d/%m/%Y').fillna('N/A')
+
+    # Dividir colunas em duas tabelas se necessário
+    mid_col = len(chunk_data.columns) // 2
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(11, 8))
+    fig.suptitle(f"Tabela Completa das Obras - Página {chunk_num + 1}", fontsize=12, fontweight="bold")
+
+    # Primeira metade das colunas
+    chunk_data_1 = chunk_data.iloc[:, :mid_col]
+    table1 = ax1.table(cellText=chunk_data_1.values, colLabels=chunk_data_1.columns,
+                      cellLoc="center", loc="center")
+    table1.auto_set_font_size(False)
+    table1.set_fontsize(6)
+    table1.scale(1.0, 1.1)
+    ax1.set_title(f"Colunas 1-{mid_col}", fontsize=10)
+    ax1.axis("off")
+
+    # Segunda metade das colunas
+    if mid_col < len(chunk_data.columns):
+        chunk_data_2 = chunk_data.iloc[:, mid_col:]
+        table2 = ax2.table(cellText=chunk_data_2.values, colLabels=chunk_data_2.columns,
+                          cellLoc="center", loc="center")
+        table2.auto_set_font_size(False)
+        table2.set_fontsize(6)
+        table2.scale(1.0, 1.1)
+        ax2.set_title(f"Colunas {mid_col+1}-{len(chunk_data.columns)}", fontsize=10)
+    ax2.axis("off")
+
+    _save(pdf, fig)
+
+
+def _chunks(total, chunk_size):
+    return [(chunk_num, start, min(start + chunk_size, total))
+            for chunk_num, start in enumerate(range(0, total, chunk_size))]
+
+
+def _existing(df, cols):
+    return df[[col for col in cols if col in df.columns]]
+
+
+def plan_pages(view, df_sheet2):
+    """Lista ordenada de (seção, função da página, argumentos extras, entradas) do relatório
+
+    As entradas são só os dados que a página usa; o hash delas é a chave da
+    página no cache.
+    """
+    df_filtered_projetos = view["df_filtered_projetos"]
+    kpis = view["kpis"]
+    tem_obras = not df_filtered_projetos.empty
+    pages = [("kpis", _page_kpis, (), (view["selected_obras"], view["selected_cidades"], view["show_cents"], kpis))]
+    if tem_obras:
+        pages.append(("custo_fluxo", _page_custo_fluxo, (), (df_filtered_projetos[["Projeto", "Custo Fluxo"]],)))
+        pages.append(("tipologia_saldo", _page_tipologia_saldo, (), (df_filtered_projetos[["Tipologia", "Projeto", "Saldo"]],)))
+        gantt_data = _gantt_data(df_filtered_projetos)
+        if not gantt_data.empty:
+            pages.append(("cronograma", _page_cronograma, (), (gantt_data,)))
+    valores_mensais = [kpis["custo_ago_25"], kpis["custo_set_25"], kpis["custo_out_25"], kpis["valor_restante_pagar_media"]]
+    pages.append(("valores_mensais", _page_valores_mensais, (), (valores_mensais, df_sheet2)))
+    if tem_obras:
+        pages.append(("cidade_empresa", _page_cidade_empresa, (),
+                      (_existing(df_filtered_projetos, ["Cidade", "Empresa desenvolvedora", "Custo Fluxo"]),)))
+        for chunk in _chunks(len(df_filtered_projetos), CHUNK_SIZE):
+            _, start_idx, end_idx = chunk
+            pages.append(("tabela_obras", _page_tabela_obras, chunk,
+                          (len(df_filtered_projetos) > CHUNK_SIZE, df_filtered_projetos.iloc[start_idx:end_idx])))
+    if not df_sheet2.empty:
+        pages.append(("tabela_sheet2", _page_tabela_sheet2, (), (df_sheet2,)))
+    if tem_obras:
+        pages.append(("estatisticas", _page_estatisticas, (), (df_filtered_projetos,)))
+    # Tabela completa só quando há muitas colunas (tabela extendida)
+    if tem_obras and len(df_filtered_projetos.columns) > 15 and len(_colunas_tabela_completa(df_filtered_projetos)) > 7:
+        for chunk in _chunks(len(df_filtered_projetos), CHUNK_SIZE_EXTENDED):
+            _, start_idx, end_idx = chunk
+            pages.append(("tabela_completa", _page_tabela_completa, chunk, (df_filtered_projetos.iloc[start_idx:end_idx],)))
+    return pages
+
+
+# Pool de processos reaproveitado entre as exportações (criado na primeira exportação paralela)
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Pool com `workers` processos; recriado só quando o número muda"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # "spawn" evita herdar as threads do servidor (Streamlit) no fork
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_setup_matplotlib,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Dados da exportação atual em cada worker: lidos do arquivo uma vez por exportação
+_worker_data = (None, None)
+
+
+def _render_page_bytes(page_func, view, df_sheet2, args):
+    """Renderiza uma página isolada em um PDF próprio"""
+    inicio = time.perf_counter()
+    buffer = BytesIO()
+    with PdfPages(buffer) as pdf:
+        page_func(pdf, view, df_sheet2, *args)
+    return buffer.getvalue(), time.perf_counter() - inicio
+
+
+def _render_page(data_path, page_func, args):
+    # Executado no worker; `data_path` identifica a exportação
+    global _worker_data
+    if _worker_data[0] != data_path:
+        with open(data_path, "rb") as f:
+            _worker_data = (data_path, pickle.load(f))
+    view, df_sheet2 = _worker_data[1]
+    return _render_page_bytes(page_func, view, df_sheet2, args)
+
+
+def _render_parallel(view, df_sheet2, pages, workers):
+    """[(bytes, segundos)] das `pages`, renderizadas no pool"""
+    with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as f:
+        pickle.dump((view, df_sheet2), f, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        executor = _get_pool(workers)
+        futures = [executor.submit(_render_page, f.name, page_func, args) for _, page_func, args, _ in pages]
+        return [future.result() for future in futures]
+    finally:
+        os.remove(f.name)
+
+
+def create_pdf_report(view, df_sheet2, timings=None, workers=1, cache=REPORT_CACHE):
+    """Cria um relatório PDF completo com todos os dados do dashboard respeitando os filtros
+
+    Com `workers` > 1 (e o pypdf instalado) as páginas são renderizadas em
+    paralelo, num pool de processos reaproveitado, e juntadas na ordem
+    original. `cache` (um `obras.cache.SectionCache`; None desliga) guarda o
+    relatório inteiro e as páginas renderizadas separadamente; com páginas
+    em cache, só as que mudaram são renderizadas de novo.
+    """
+    timer = SectionTimer(timings)
+    pages = plan_pages(view, df_sheet2)
+    keys = [hash_inputs("matplotlib", section, args, *inputs) for section, _, args, inputs in pages]
+    doc_key = hash_inputs("matplotlib_doc", *keys)
+    timer.lap("plano")
+
+    data = cache.get(doc_key) if cache is not None else None
+    if data is None:
+        page_bytes = [cache.get(key) if cache is not None else None for key in keys]
+        timer.lap("cache")
+        paralelo = workers and workers > 1 and sum(b is None for b in page_bytes) > 1
+        # A junção só compensa em paralelo ou reaproveitando páginas já renderizadas
+        if PYPDF_AVAILABLE and (paralelo or any(b is not None for b in page_bytes)):
+            data = _create_pdf_report_pages(view, df_sheet2, pages, keys, page_bytes, timings, timer, workers, cache)
+        else:
+            data = _create_pdf_report_serial(view, df_sheet2, pages, timer)
+        if cache is not None:
+            cache.put(doc_key, data)
+    return BytesIO(data)
+
+
+def _create_pdf_report_serial(view, df_sheet2, pages, timer):
+    """Todas as páginas num único PdfPages, em sequência"""
+    _setup_matplotlib()
+    buffer = BytesIO()
+    with PdfPages(buffer) as pdf:
+        for section, page_func, args, _ in pages:
+            page_func(pdf, view, df_sheet2, *args)
+            timer.lap(section)
+    timer.lap("build")
+    return buffer.getvalue()
+
+
+def _create_pdf_report_pages(view, df_sheet2, pages, keys, page_bytes, timings, timer, workers, cache):
+    """Renderiza as páginas fora do cache, cada uma em um PDF próprio (em série ou em paralelo), e junta tudo"""
+    pendentes = [i for i, data in enumerate(page_bytes) if data is None]
+    if workers and workers > 1 and len(pendentes) > 1:
+        rendered = _render_parallel(view, df_sheet2, [pages[i] for i in pendentes], workers)
+        timer.lap("render_paralelo")
+        sufixo = " (worker)"
+    else:
+        _setup_matplotlib()
+        rendered = [_render_page_bytes(pages[i][1], view, df_sheet2, pages[i][2]) for i in pendentes]
+        timer.lap("render")
+        sufixo = ""
+
+    for i, (data, elapsed) in zip(pendentes, rendered):
+        page_bytes[i] = data
+        if cache is not None:
+            cache.put(keys[i], data)
+        if timings is not None:
+            # Tempo de cada seção (somado entre os workers, no modo paralelo)
+            section = pages[i][0] + sufixo
+            timings[section] = timings.get(section, 0.0) + elapsed
+
+    writer = PdfWriter()
+    for data in page_bytes:
+        for page in PdfReader(BytesIO(data)).pages:
+            writer.add_page(page)
+    # Cada página traz sua cópia das fontes; remove as duplicadas
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    buffer = BytesIO()
+    writer.write(buffer)
+    timer.lap("build")
+    return buffer.getvalue()
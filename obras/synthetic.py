@@ -0,0 +1,106 @@
+"""Carteiras sintéticas de obras para benchmarks e testes de carga.
+
+Gera planilhas com as mesmas colunas de `cadastro_obras_simplificado.xlsx`,
+com valores aleatórios porém plausíveis e reprodutíveis (semente fixa).
+"""
+
+import numpy as np
+import pandas as pd
+
+from obras.data import CUSTOS_GERAIS_IDS, Snapshot, build_custos_gerais
+
+EMPRESAS = ["Abecker Loteamentos", "Parceira Sul", "Construtora Litoral", "Urbaniza SC"]
+SOCIAS = ["Abecker", "Sócio A", "Sócio B"]
+TIPOLOGIAS = ["Loteamento Aberto", "Condomínio Fechado", "Loteamento Industrial"]
+ETAPAS = ["1. Em aprovação", "2. Obras a iniciar", "3. Obras iniciadas", "4. Obras concluídas"]
+CIDADES = [
+    ("Joinville", "SC"),
+    ("Itajaí", "SC"),
+    ("Blumenau", "SC"),
+    ("Balneário Camboriú", "SC"),
+    ("Jaraguá do Sul", "SC"),
+    ("Curitiba", "PR"),
+    ("São José dos Pinhais", "PR"),
+    ("Araquari", "SC"),
+]
+
+
+def make_sheets(n_obras, seed=0):
+    """Retorna (df_sheet1, df_sheet2) crus, como seriam lidos do Excel"""
+    rng = np.random.default_rng(seed)
+    cidades_idx = rng.integers(0, len(CIDADES), n_obras)
+    custo_raso = rng.uniform(1e6, 12e6, n_obras).round(2)
+    custo_fluxo = (custo_raso * rng.uniform(0.75, 0.95, n_obras)).round(2)
+    incorrido = rng.uniform(0, 1, n_obras)
+    inicio = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 1000, n_obras), unit="D")
+    tempo_obra = rng.integers(6, 36, n_obras)
+
+    df = pd.DataFrame(
+        {
+            "ID": np.arange(1, n_obras + 1),
+            "Empresa desenvolvedora": rng.choice(EMPRESAS, n_obras),
+            "Sócia": rng.choice(SOCIAS, n_obras),
+            "Projeto": [f"Residencial {i:04d}" for i in range(1, n_obras + 1)],
+            "Tipologia": rng.choice(TIPOLOGIAS, n_obras),
+            "Cidade": [CIDADES[i][0] for i in cidades_idx],
+            "UF": [CIDADES[i][1] for i in cidades_idx],
+            "Etapa": rng.choice(ETAPAS, n_obras),
+            "Custo Raso Meta": custo_raso,
+            "Custo Fluxo": custo_fluxo,
+            "Percentual Incorrido do Fluxo%": incorrido.round(4),
+            "ago/25": (custo_fluxo * rng.uniform(0, 0.06, n_obras)).round(2),
+            "set/25": (custo_fluxo * rng.uniform(0, 0.06, n_obras)).round(2),
+            "out/25": (custo_fluxo * rng.uniform(0, 0.06, n_obras)).round(2),
+            "Média dos Próximos Meses": (custo_fluxo * rng.uniform(0, 0.05, n_obras)).round(2),
+            "Saldo": (custo_fluxo * (1 - incorrido)).round(2),
+            "Índice Ômega": rng.uniform(0.8, 1.2, n_obras).round(3),
+            "% Avanço Físico": (rng.uniform(0, 100, n_obras)).round(1),
+            "%Avanço Financeiro": (incorrido * 100).round(1),
+            "Tempo de Obra": tempo_obra,
+            "Início Obra": inicio,
+            "Fim Obra": inicio + pd.to_timedelta(tempo_obra * 30, unit="D"),
+            "Meses Restantes Pós Out/25": rng.integers(0, 24, n_obras),
+            "Lotes": rng.integers(40, 800, n_obras),
+        }
+    )
+
+    # Linhas de custos gerais (IDs 900 e 901), como na planilha real
+    custos_gerais = pd.DataFrame(
+        {
+            "ID": CUSTOS_GERAIS_IDS,
+            "Projeto": ["Diesel dos Equipamentos", "Custo de Operação da Mecanica"],
+            "Custo Fluxo": [0.0, 0.0],
+        }
+    )
+    df_sheet1 = pd.concat([df, custos_gerais], ignore_index=True)
+
+    df_sheet2 = pd.DataFrame(
+        {
+            "ID": CUSTOS_GERAIS_IDS,
+            "Projeto": ["Diesel dos Equipamentos", "Custo de Operação da Mecanica"],
+            "Tipologia": ["Diesel", "Mecanica"],
+            "Custo Fluxo": [779000.0, 641891.0],
+            "ago/25": [59923.08, 49376.23],
+            "set/25": [59923.08, 49376.23],
+            "out/25": [59923.08, 49376.23],
+            "Média dos Próximos Meses": [59923.08, 49376.23],
+        }
+    )
+    return df_sheet1, df_sheet2
+
+
+def make_snapshot(n_obras, seed=0):
+    """Snapshot sintético equivalente a `obras.data.load_snapshot`, sem passar pelo Excel"""
+    df_sheet1, df_sheet2 = make_sheets(n_obras, seed)
+    df_custos_gerais_from_excel = df_sheet1[df_sheet1["ID"].isin(CUSTOS_GERAIS_IDS)].copy()
+    df_projetos = df_sheet1[~df_sheet1["ID"].isin(CUSTOS_GERAIS_IDS)].copy()
+    return Snapshot(df_projetos, build_custos_gerais(df_custos_gerais_from_excel), df_sheet2)
+
+
+def write_workbook(path, n_obras, seed=0):
+    """Grava uma planilha sintética no formato de `cadastro_obras_simplificado.xlsx`"""
+    df_sheet1, df_sheet2 = make_sheets(n_obras, seed)
+    with pd.ExcelWriter(path) as writer:
+        df_sheet1.to_excel(writer, sheet_name="Sheet1", index=False)
+        df_sheet2.to_excel(writer, sheet_name="Sheet2", index=False)
+    return path
@@ -0,0 +1,99 @@
+"""Tabela detalhada paginada no servidor.
+
+O índice é montado uma vez por versão dos dados: ordens de classificação
+por coluna (calculadas na primeira vez em que a coluna é usada) e um texto
+de busca por linha, sem acentos e em minúsculas. A cada rerun só a página
+visível é recortada e enviada ao navegador.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Colunas de texto consideradas na busca
+SEARCH_COLUMNS = ["Projeto", "Empresa desenvolvedora", "Sócia", "Tipologia", "Cidade", "UF", "Etapa"]
+PAGE_SIZES = [25, 50, 100, 200]
+
+# Resultados de busca guardados por termo
+_MAX_SEARCH_CACHE = 64
+
+
+def normalize_text(serie):
+    """Minúsculas e sem acentos, para a busca não depender da grafia"""
+    return (
+        serie.astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+    )
+
+
+class TableIndex:
+    """Índices de ordenação e busca sobre `df` (as linhas de todas as obras).
+
+    As posições devolvidas são posições de linha em `df`; o filtro de obras e
+    cidades entra como máscara booleana alinhada a `df`.
+    """
+
+    def __init__(self, df, search_columns=SEARCH_COLUMNS):
+        self.df = df
+        colunas = [col for col in search_columns if col in df.columns]
+        if colunas:
+            partes = [df[col].fillna("").astype(str) for col in colunas]
+            texto = partes[0].str.cat(partes[1:], sep=" ")
+            self.search_text = normalize_text(texto).reset_index(drop=True)
+        else:
+            self.search_text = pd.Series([""] * len(df))
+        self._orders = {}
+        self._searches = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    def order(self, column, ascending=True):
+        """Posições de `df` ordenadas por `column` (estável; vazios sempre no fim)"""
+        chave = (column, ascending)
+        with self._lock:
+            ordem = self._orders.get(chave)
+        if ordem is None:
+            serie = self.df[column].reset_index(drop=True)
+            ordem = serie.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+            with self._lock:
+                self._orders[chave] = ordem
+        return ordem
+
+    def _matches(self, termo):
+        with self._lock:
+            encontrado = self._searches.get(termo)
+        if encontrado is None:
+            encontrado = self.search_text.str.contains(termo, regex=False).to_numpy(dtype=bool)
+            with self._lock:
+                if len(self._searches) >= _MAX_SEARCH_CACHE:
+                    self._searches.pop(next(iter(self._searches)))
+                self._searches[termo] = encontrado
+        return encontrado
+
+    def positions(self, mask=None, search="", sort_by=None, ascending=True):
+        """Posições das linhas visíveis, já ordenadas
+
+        `mask` (booleano, alinhado a `df`) restringe às obras filtradas; `search`
+        exige que todas as palavras apareçam no texto de busca da linha.
+        """
+        selecionadas = np.ones(len(self.df), dtype=bool) if mask is None else np.asarray(mask, dtype=bool).copy()
+        termos = normalize_text(pd.Series([search])).iloc[0].split() if search else []
+        for termo in termos:
+            selecionadas &= self._matches(termo)
+        ordem = self.order(sort_by, ascending) if sort_by else np.arange(len(self.df))
+        return ordem[selecionadas[ordem]]
+
+    def page(self, positions, page, page_size):
+        """Recorte da página `page` (começando em 1) das posições informadas"""
+        inicio = (page - 1) * page_size
+        return self.df.iloc[positions[inicio:inicio + page_size]]
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
@@ -0,0 +1,33 @@
+"""Cores da identidade visual usadas nos gráficos e relatórios."""
+
+# Cores da identidade visual
+COLORS = {
+    "primary": "#00497A",
+    "secondary": "#FFD700",
+    "support1": "#008DDE",
+    "support2": "#00609B",
+    "support3": "#FFB81C",
+    "support4": "#C99900",
+    "support5": "#00BF6F",
+    "support6": "#A9BE00",
+    "support7": "#F2913D",
+    "support8": "#EB634C",
+    "support9": "#5B2D82",
+    "support10": "#806EAF",
+}
+
+# Adicionando mais 10 cores para o gráfico de Gantt
+ADDITIONAL_COLORS = [
+    "#FF6347",
+    "#4682B4",
+    "#DAA520",
+    "#8A2BE2",
+    "#3CB371",
+    "#FFDAB9",
+    "#CD5C5C",
+    "#40E0D0",
+    "#EE82EE",
+    "#7B68EE",
+]
+
+ALL_GANTT_COLORS = list(COLORS.values()) + ADDITIONAL_COLORS
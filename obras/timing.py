@@ -0,0 +1,52 @@
+"""Medição de tempo por seção/etapa."""
+
+import json
+import os
+import threading
+import time
+
+# Log em JSON lines das medições do dashboard (uma linha por rerun medido)
+PERF_LOG_PATH = os.environ.get("OBRAS_PERF_LOG", "logs/performance.jsonl")
+
+_LOG_LOCK = threading.Lock()
+
+
+class SectionTimer:
+    """Mede o tempo entre marcações consecutivas, acumulando em `timings`.
+
+    Com `timings=None` as marcações não fazem nada, então os relatórios podem
+    chamar `lap()` sempre, sem custo quando ninguém está medindo.
+    """
+
+    def __init__(self, timings=None):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        if self.timings is None:
+            return
+        agora = time.perf_counter()
+        self.timings[name] = self.timings.get(name, 0.0) + agora - self._last
+        self._last = agora
+
+    def mark(self):
+        """Recomeça a contagem sem registrar o intervalo (já medido por outro timer)"""
+        if self.timings is not None:
+            self._last = time.perf_counter()
+
+
+def accumulate(totals, timings):
+    """Soma as medições de um rerun (`timings`) aos totais acumulados (`totals`)"""
+    for name, seconds in timings.items():
+        totals[name] = totals.get(name, 0.0) + seconds
+    return totals
+
+
+def append_jsonl(path, record):
+    """Acrescenta `record` como uma linha JSON em `path` (seguro entre threads)"""
+    pasta = os.path.dirname(path)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    linha = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _LOG_LOCK, open(path, "a", encoding="utf-8") as f:
+        f.write(linha)
@@ -0,0 +1,121 @@
+"""Aquecimento dos caches do dashboard na partida do servidor.
+
+Escolher uma única obra é o detalhamento mais comum. Com
+`OBRAS_WARMUP_OBRAS=N`, o dashboard calcula em segundo plano a visão padrão
+e a de cada uma das N obras mais escolhidas recentemente (segundo o log de
+uso), para que o clique do usuário já encontre o resultado em cache.
+
+Com o aquecimento ligado, o log de uso (`OBRAS_USAGE_LOG`) recebe uma linha
+JSON a cada filtro escolhido numa sessão, na forma canônica de
+`obras.filters.encode_filters`; na partida, as linhas mais antigas que a
+janela de uso são descartadas. Sem a variável, nada é gravado.
+"""
+
+import json
+import os
+import threading
+import traceback
+from collections import Counter
+
+import pandas as pd
+
+from obras.timing import append_jsonl
+
+USAGE_LOG_PATH = os.environ.get("OBRAS_USAGE_LOG", "logs/uso_filtros.jsonl")
+
+# Obras aquecidas na partida (0 desliga o aquecimento)
+WARMUP_OBRAS = int(os.environ.get("OBRAS_WARMUP_OBRAS", "0"))
+
+# Só o uso destes últimos dias conta para a ordem do aquecimento
+USAGE_WINDOW_DAYS = 30
+
+
+def record_usage(params, path=USAGE_LOG_PATH):
+    """Registra no log de uso o filtro `params` (forma canônica) escolhido agora; só com o aquecimento ligado"""
+    if not WARMUP_OBRAS:
+        return
+    append_jsonl(path, {"ts": pd.Timestamp.now().isoformat(timespec="seconds"), "filtro": params})
+
+
+def obra_usage(path=USAGE_LOG_PATH, days=USAGE_WINDOW_DAYS, now=None, prune=True):
+    """Counter {obra: vezes} das seleções de uma única obra nos últimos `days` dias.
+
+    Com `prune`, regrava o log só com as linhas dentro da janela.
+    """
+    desde = (pd.Timestamp.now() if now is None else pd.Timestamp(now)) - pd.Timedelta(days=days)
+    uso = Counter()
+    recentes = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            linhas = f.readlines()
+    except OSError:
+        return uso
+    for linha in linhas:
+        try:
+            registro = json.loads(linha)
+            filtro = registro["filtro"]
+            if pd.Timestamp(registro["ts"]) < desde:
+                continue
+        except (ValueError, KeyError, TypeError):
+            # Linha truncada ou de outro formato
+            continue
+        recentes.append(linha if linha.endswith("\n") else linha + "\n")
+        obras = filtro.get("obra") or []
+        if len(filtro) == 1 and len(obras) == 1:
+            uso[obras[0]] += 1
+    if prune and len(recentes) < len(linhas):
+        try:
+            temporario = f"{path}.{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                f.writelines(recentes)
+            os.replace(temporario, path)
+        except OSError:
+            pass
+    return uso
+
+
+def warmup_order(obras, uso):
+    """`obras` da mais usada para a menos usada (empates na ordem original)"""
+    return sorted(obras, key=lambda obra: -uso.get(obra, 0))
+
+
+class Warmup:
+    """Thread em segundo plano que chama `aquecer(item)` para cada item, em ordem.
+
+    Erros de um item são contados (`errors`, com a mensagem do último em
+    `last_error`), impressos com o traceback e não interrompem os demais;
+    `stop()` encerra depois do item atual.
+    """
+
+    def __init__(self, aquecer, itens):
+        self.aquecer = aquecer
+        self.itens = list(itens)
+        self.total = len(self.itens)
+        self.done = 0
+        self.errors = 0
+        self.last_error = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="obras-warmup", daemon=True)
+
+    def _run(self):
+        for item in self.itens:
+            if self._parar.is_set():
+                break
+            try:
+                self.aquecer(item)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"❌ Aquecimento de {item!r:.80}: {self.last_error}", flush=True)
+                traceback.print_exc()
+            self.done += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._parar.set()
+
+    def running(self):
+        return self._thread.is_alive()
@@ -0,0 +1,65 @@
+"""Curva de carga da carteira: obras ativas, lotes ativos e custo mensal comprometido.
+
+Calculada numa única varredura (sweep line) sobre os intervalos
+"Início Obra"/"Fim Obra": cada obra gera um evento de entrada no mês de
+início e um de saída no mês seguinte ao fim; os eventos são ordenados uma
+vez (O(n log n)) e as somas acumuladas dão o valor de cada mês, sem filtrar
+a carteira mês a mês. O custo comprometido de uma obra é o seu Custo Fluxo
+distribuído igualmente pelos meses da obra, em centavos: o centavo que sobra
+da divisão vai para os primeiros meses, e a soma da curva fecha com o total.
+"""
+
+import numpy as np
+import pandas as pd
+
+from obras.money import to_centavos, to_reais
+
+WORKLOAD_COLUMNS = ["Mês", "Obras ativas", "Lotes ativos", "Custo mensal comprometido"]
+
+
+def _month_number(datas):
+    """Mês como inteiro contínuo (ano * 12 + mês - 1)"""
+    return (datas.dt.year * 12 + datas.dt.month - 1).to_numpy(dtype=np.int64)
+
+
+def workload_curve(df_projetos, centavos=None):
+    """DataFrame com uma linha por mês, do primeiro início ao último fim das obras.
+
+    `centavos`: as colunas em reais de `df_projetos` já em centavos (como a
+    visão de `obras.model.build_view` traz); sem ela, o custo é convertido aqui.
+    """
+    datas = df_projetos[["Início Obra", "Fim Obra"]]
+    valida = (datas["Início Obra"].notna() & datas["Fim Obra"].notna() & (datas["Fim Obra"] >= datas["Início Obra"])).to_numpy()
+    if not valida.any():
+        return pd.DataFrame({col: [] for col in WORKLOAD_COLUMNS})
+
+    inicio = _month_number(datas["Início Obra"][valida])
+    fim = _month_number(datas["Fim Obra"][valida])
+    lotes = df_projetos["Lotes"].to_numpy(dtype=float)[valida]
+    custo = to_centavos(df_projetos["Custo Fluxo"]) if centavos is None else centavos["Custo Fluxo"].to_numpy()
+    custo_mensal, resto = np.divmod(custo[valida], fim - inicio + 1)
+
+    # Entradas no mês de início, saídas no mês seguinte ao fim
+    instantes = np.concatenate([inicio, fim + 1])
+    ordem = np.argsort(instantes, kind="stable")
+    instantes = instantes[ordem]
+    obras = np.cumsum(np.concatenate([np.ones(len(inicio)), -np.ones(len(fim))])[ordem])
+    lotes_ativos = np.cumsum(np.concatenate([lotes, -lotes])[ordem])
+
+    # Custo em centavos: a parcela de cada mês, mais um centavo nos `resto` primeiros meses
+    com_resto = resto > 0
+    instantes_custo = np.concatenate([inicio, fim + 1, inicio[com_resto], (inicio + resto)[com_resto]])
+    ordem_custo = np.argsort(instantes_custo, kind="stable")
+    um = np.ones(int(com_resto.sum()), dtype=np.int64)
+    custo = np.cumsum(np.concatenate([custo_mensal, -custo_mensal, um, -um])[ordem_custo])
+
+    # Valor de cada mês = soma acumulada do último evento até ele
+    meses = np.arange(inicio.min(), fim.max() + 1)
+    ultimo = np.searchsorted(instantes, meses, side="right") - 1
+    ultimo_custo = np.searchsorted(instantes_custo[ordem_custo], meses, side="right") - 1
+    return pd.DataFrame({
+        "Mês": pd.to_datetime({"year": meses // 12, "month": meses % 12 + 1, "day": 1}),
+        "Obras ativas": obras[ultimo].round().astype(np.int64),
+        "Lotes ativos": lotes_ativos[ultimo].round(6),
+        "Custo mensal comprometido": to_reais(custo[ultimo_custo]),
+    })